@@ -0,0 +1,25 @@
+"""
+In-memory MongoDB for benchmarks, backed by mongomock-motor.
+
+Install it with ``pip install mongomock-motor``. It is only used by the
+benchmark scripts, never by the bot.
+"""
+
+from src.database.connection import MongoDatabase
+
+
+def mock_database() -> MongoDatabase:
+    """Return a connected MongoDatabase whose client is an in-memory mock"""
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError as exc:
+        raise SystemExit(
+            "This benchmark needs mongomock-motor: pip install mongomock-motor"
+        ) from exc
+
+    db = MongoDatabase()
+    db.client = AsyncMongoMockClient()
+    db.db = db.client["hearhear_benchmark"]
+    db.tabby_db = db.client["hearhear_benchmark_tabby"]
+    db.is_connected = True
+    return db
@@ -0,0 +1,187 @@
+"""
+Join Pipeline Benchmark
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Measures join throughput of JoinPipeline against a fake guild. Settings
+reads, ``add_roles`` and the side effects are stubs that sleep for a
+configurable Discord/MongoDB latency, so the numbers show how many round
+trips a join costs and how well joins overlap. The old design is modelled
+as independent listeners: each one reads its own settings and makes its
+own ``add_roles`` call.
+
+Run from the repository root:
+    python -m benchmarks.join_pipeline [--joins 500] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.utils.join_pipeline import JoinPipeline
+
+STICKY_EVERY = 3  # every third member rejoins with sticky roles
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.position = role_id
+        self.managed = False
+
+    def is_default(self) -> bool:
+        return self.id == 0
+
+    def __ge__(self, other: "FakeRole") -> bool:
+        return self.position >= other.position
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int = 1):
+        self.id = guild_id
+        self.roles = {role_id: FakeRole(role_id) for role_id in range(50)}
+        self.me = type("Me", (), {"top_role": FakeRole(1000)})()
+
+    def get_role(self, role_id: int):
+        return self.roles.get(role_id)
+
+
+class Counters:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.add_roles = 0
+        self.settings_reads = 0
+
+
+class FakeMember:
+    def __init__(self, guild: FakeGuild, member_id: int, counters: Counters):
+        self.guild = guild
+        self.id = member_id
+        self.roles = [guild.roles[0]]
+        self.counters = counters
+
+    async def add_roles(self, *roles, reason=None):
+        self.counters.add_roles += 1
+        await asyncio.sleep(self.counters.latency)
+
+
+class FakeSettings:
+    """Guild settings cache stub: cached reads cost nothing"""
+
+    DOCUMENTS = {
+        "guilds": {"autorole": 5},
+        "guild_configs": {"autorole_ids": [6, 7]},
+        "logging_configs": {"enabled": True},
+    }
+
+    def __init__(self, counters: Counters):
+        self.counters = counters
+        self.loaded = set()
+
+    async def get(self, collection: str, guild_id: int):
+        if (collection, guild_id) not in self.loaded:
+            self.loaded.add((collection, guild_id))
+            self.counters.settings_reads += 1
+            await asyncio.sleep(self.counters.latency)
+        return self.DOCUMENTS[collection]
+
+    async def get_language(self, guild_id: int) -> str:
+        return "en"
+
+
+def sticky_roles(member_id: int):
+    return (8, 9) if member_id % STICKY_EVERY == 0 else ()
+
+
+async def run_pipeline(joins: int, latency: float) -> Counters:
+    """Joins through the shared pipeline"""
+    counters = Counters(latency)
+    bot = type("Bot", (), {})()
+    bot.guild_settings = FakeSettings(counters)
+    pipeline = JoinPipeline(bot)
+
+    async def effect(context):
+        await asyncio.sleep(latency)
+
+    pipeline.register(
+        "sticky",
+        roles=lambda c: [c.add_role(r, "Sticky") for r in sticky_roles(c.member.id)],
+    )
+    pipeline.register(
+        "auto",
+        roles=lambda c: [c.add_role(r, "Auto") for r in c.config["autorole_ids"]],
+    )
+    pipeline.register(
+        "legacy", roles=lambda c: c.add_role(c.settings.get("autorole"), "Legacy")
+    )
+    pipeline.register("welcome", effect=effect)
+    pipeline.register("log", effect=effect)
+
+    guild = FakeGuild()
+    await asyncio.gather(
+        *(pipeline.handle(FakeMember(guild, i, counters)) for i in range(joins))
+    )
+    return counters
+
+
+async def run_listeners(joins: int, latency: float) -> Counters:
+    """Previous design: every cog handles the join on its own"""
+    counters = Counters(latency)
+
+    async def read_settings():
+        counters.settings_reads += 1
+        await asyncio.sleep(latency)
+
+    async def sticky(member):
+        await read_settings()
+        roles = [member.guild.get_role(r) for r in sticky_roles(member.id)]
+        if roles:
+            await member.add_roles(*roles)
+
+    async def autoroles(member):
+        await read_settings()
+        await member.add_roles(*(member.guild.get_role(r) for r in (6, 7)))
+
+    async def legacy_autorole(member):
+        await read_settings()
+        await member.add_roles(member.guild.get_role(5))
+
+    async def welcome(member):
+        await read_settings()
+        await asyncio.sleep(latency)
+
+    async def join_log(member):
+        await read_settings()
+        await asyncio.sleep(latency)
+
+    guild = FakeGuild()
+    listeners = (sticky, autoroles, legacy_autorole, welcome, join_log)
+    await asyncio.gather(
+        *(
+            listener(FakeMember(guild, i, counters))
+            for i in range(joins)
+            for listener in listeners
+        )
+    )
+    return counters
+
+
+async def main(joins: int, latency: float):
+    print(f"{joins} concurrent joins, {latency * 1000:.0f} ms stub latency")
+    print(f"{'design':<10} {'joins/s':>9} {'add_roles':>10} {'reads':>6}")
+    for name, runner in (("pipeline", run_pipeline), ("listeners", run_listeners)):
+        started = time.perf_counter()
+        counters = await runner(joins, latency)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<10} {joins / elapsed:>9,.0f} "
+            f"{counters.add_roles:>10} {counters.settings_reads:>6}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--joins", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.joins, args.latency_ms / 1000))
@@ -0,0 +1,122 @@
+"""
+Message Cache Benchmark
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Feeds one minute of traffic at 1k messages/s (60k fake messages, half of
+them from one busy guild) into MessageCache and into the dict the logging
+cog used before. The old dict stored a fresh dict per message and, once
+past 10,000 entries, sorted every key to drop the oldest 1,000. For each
+design the script reports the throughput, the share of one core that 1k
+msgs/s would use, the slowest single insert and the memory held once the
+minute is over.
+
+Run from the repository root:
+    python -m benchmarks.message_cache [--rate 1000] [--seconds 60]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from config.settings import Config
+from src.utils.message_cache import MessageCache
+
+GUILDS = 50
+
+
+def fake_messages(count: int):
+    """Messages spread over ``GUILDS`` guilds, half from the first one"""
+    guilds = [SimpleNamespace(id=guild_id) for guild_id in range(GUILDS)]
+    messages = []
+    for index in range(count):
+        guild = guilds[0] if random.random() < 0.5 else random.choice(guilds)
+        messages.append(
+            SimpleNamespace(
+                id=(1 << 60) + index,
+                guild=guild,
+                channel=SimpleNamespace(id=guild.id * 10 + index % 5),
+                author=SimpleNamespace(id=index % 500),
+                content="x" * random.randint(5, 200),
+                created_at=None,
+                attachments=[],
+                embeds=[],
+            )
+        )
+    return messages
+
+
+class LegacyCache:
+    """The logging cog's cache before MessageCache"""
+
+    def __init__(self):
+        self.message_cache = {}
+
+    def add(self, message):
+        self.message_cache[message.id] = {
+            "content": message.content,
+            "author_id": message.author.id,
+            "channel_id": message.channel.id,
+            "guild_id": message.guild.id,
+            "created_at": message.created_at,
+            "attachments": [att.url for att in message.attachments],
+            "embeds": len(message.embeds),
+        }
+        if len(self.message_cache) > 10000:
+            oldest_keys = sorted(self.message_cache.keys())[:1000]
+            for key in oldest_keys:
+                del self.message_cache[key]
+
+
+def measure(make_cache, messages):
+    """Return (seconds, slowest insert, bytes held afterwards)"""
+    cache = make_cache()
+    slowest = 0.0
+    started = time.perf_counter()
+    for message in messages:
+        before = time.perf_counter()
+        cache.add(message)
+        slowest = max(slowest, time.perf_counter() - before)
+    elapsed = time.perf_counter() - started
+
+    # Memory is traced on a second run so tracing does not skew the timings
+    tracemalloc.start()
+    cache = make_cache()
+    for message in messages:
+        cache.add(message)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, slowest, held
+
+
+def main(rate: int, seconds: int):
+    messages = fake_messages(rate * seconds)
+    print(f"{len(messages):,} messages ({seconds} s at {rate:,} msgs/s)")
+    print(
+        f"{'design':<13} {'msgs/s':>10} {'cpu@rate':>9} {'worst ms':>9} {'held MB':>8}"
+    )
+    for name, make_cache in (
+        (
+            "MessageCache",
+            lambda: MessageCache(
+                Config.LOG_MESSAGE_CACHE_SIZE, Config.LOG_MESSAGE_CACHE_PER_GUILD
+            ),
+        ),
+        ("legacy dict", LegacyCache),
+    ):
+        elapsed, slowest, held = measure(make_cache, messages)
+        throughput = len(messages) / elapsed
+        print(
+            f"{name:<13} {throughput:>10,.0f} {rate / throughput:>8.1%} "
+            f"{slowest * 1000:>9.2f} {held / 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rate", type=int, default=1000)
+    parser.add_argument("--seconds", type=int, default=60)
+    args = parser.parse_args()
+    main(args.rate, args.seconds)
@@ -0,0 +1,182 @@
+"""
+Motion Store Benchmark
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Builds a synthetic motion bank (100k motions by default, with topic tags,
+some info slides and a Zipf-like vocabulary) into MotionStore and into the
+list of {"text", "info", "topics"} dicts the language manager kept before.
+For each layout the script reports the memory held by the bank, not
+counting the motion texts both layouts share, and the latency of a plain
+random draw, a topic draw and word searches for a rare, a common and a
+two-word query. The list layout answers topic draws and searches by
+scanning every motion, stopping a search once ``limit`` matches are found.
+
+Run from the repository root:
+    python -m benchmarks.motion_store [--motions 100000] [--seed 1]
+"""
+
+import argparse
+import random
+import timeit
+import tracemalloc
+
+from src.utils.motion_store import MotionStore, tokenize
+
+TOPICS = [
+    "Politics",
+    "Economics",
+    "Education",
+    "Environment",
+    "Feminism",
+    "Health",
+    "International Relations",
+    "Religion",
+    "Technology",
+    "Sports",
+    "Art & Culture",
+    "Media",
+    "Law",
+    "Philosophy",
+    "Minorities",
+    "Military",
+    "Development",
+    "Science",
+    "Children",
+    "Business",
+]
+VOCABULARY = 8000
+LIMIT = 10
+
+
+def synthetic_rows(count: int, seed: int):
+    """CSV-like rows: (text, info, comma-separated topics)"""
+    rng = random.Random(seed)
+    words = [f"w{index}" for index in range(VOCABULARY)]
+    # Zipf-like weights: a few words are in many motions, most in a handful
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    rows = []
+    for _ in range(count):
+        body = " ".join(rng.choices(words, weights, k=rng.randint(8, 20)))
+        info = " ".join(rng.choices(words, weights, k=40)) if rng.random() < 0.2 else ""
+        topics = ", ".join(rng.sample(TOPICS, rng.randint(1, 3)))
+        rows.append((f"This House would {body}", info, topics))
+    return rows
+
+
+def build_store(rows):
+    store = MotionStore()
+    for text, info, topics in rows:
+        store.add(text, info, topics.split(","))
+    return store
+
+
+def build_list(rows):
+    return [
+        {
+            "text": text,
+            "info": info or None,
+            "topics": [topic.strip() for topic in topics.split(",") if topic.strip()],
+        }
+        for text, info, topics in rows
+    ]
+
+
+def list_topic_draw(bank, topic):
+    key = topic.lower()
+    matches = [
+        motion
+        for motion in bank
+        if any(name.lower() == key for name in motion["topics"])
+    ]
+    return random.choice(matches) if matches else None
+
+
+def list_search(bank, query):
+    words = set(tokenize(query))
+    results = []
+    for motion in bank:
+        text = set(tokenize(motion["text"]))
+        if words <= text:
+            results.append(motion)
+            if len(results) == LIMIT:
+                break
+    return results
+
+
+def held_memory(build, rows) -> int:
+    """Bytes still allocated by ``build(rows)`` once it has returned"""
+    tracemalloc.start()
+    bank = build(rows)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del bank
+    return held
+
+
+def per_call_us(func, number: int) -> float:
+    """Best of three runs, in microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main(motions: int, seed: int):
+    rows = synthetic_rows(motions, seed)
+    store = build_store(rows)
+    bank = build_list(rows)
+
+    # Queries picked from the bank so every search has matches
+    ranked = sorted(store._word_index, key=lambda word: len(store._word_index[word]))
+    rare = ranked[len(ranked) // 10]
+    common = ranked[-30]
+    pair = f"{common} {ranked[-200]}"
+    topic = "international relations"
+
+    print(f"{motions:,} motions, {len(store._word_index):,} indexed words")
+    print("latencies in microseconds per call")
+    print(
+        f"{'layout':<13} {'held MB':>8}  "
+        f"{'random':>9} {'topic':>11} {'rare word':>11} {'common':>11} {'two words':>11}"
+    )
+    for name, build, calls, slow in (
+        (
+            "MotionStore",
+            build_store,
+            (
+                lambda: store.entry(store.random_id()),
+                lambda: store.entry(store.random_id(topic)),
+                lambda: store.search(rare, LIMIT),
+                lambda: store.search(common, LIMIT),
+                lambda: store.search(pair, LIMIT),
+            ),
+            False,
+        ),
+        (
+            "list of dicts",
+            build_list,
+            (
+                lambda: random.choice(bank),
+                lambda: list_topic_draw(bank, topic),
+                lambda: list_search(bank, rare),
+                lambda: list_search(bank, common),
+                lambda: list_search(bank, pair),
+            ),
+            True,
+        ),
+    ):
+        held = held_memory(build, rows)
+        timings = [
+            per_call_us(call, 1 if slow and index else 1000)
+            for index, call in enumerate(calls)
+        ]
+        print(
+            f"{name:<13} {held / 1e6:>8.1f}  {timings[0]:>9.1f} "
+            + " ".join(f"{timing:>11,.1f}" for timing in timings[1:])
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--motions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args.motions, args.seed)
@@ -0,0 +1,127 @@
+"""
+Sticky Role Startup Benchmark
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Time-to-ready with a large sticky role collection. The old cog pulled
+every sticky role document of every guild into a dict at cog load. Now
+StickyRoleStore only creates its indexes at startup and loads a guild the
+first time one of its members rejoins.
+
+MongoDB is mongomock, which runs in-process. Its cursors get slower per
+document as a result set grows, so the eager time is much worse than a
+real server would be. The document counts are the portable number: the
+old load reads the whole collection before the bot is ready, while the
+store reads nothing at startup and one guild per first use.
+
+Run from the repository root (needs mongomock-motor):
+    python -m benchmarks.sticky_role_startup [--guilds 200] [--members 500] [--memory]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks._mongomock import mock_database
+from src.database.models import COLLECTIONS
+from src.database.sticky_role_store import StickyRoleStore
+
+USED_GUILDS = 5  # guilds with a rejoin shortly after startup
+
+
+async def seed(db, guilds: int, members: int):
+    """Insert ``guilds * members`` sticky role documents"""
+    collection = await db.get_collection(COLLECTIONS["sticky_roles"])
+    now = datetime.utcnow()
+    await collection.insert_many(
+        [
+            {
+                "guild_id": guild_id,
+                "user_id": user_id,
+                "role_ids": [random.getrandbits(62) for _ in range(3)],
+                "added_at": now,
+            }
+            for guild_id in range(guilds)
+            for user_id in range(members)
+        ]
+    )
+    return collection
+
+
+async def eager_load(collection) -> dict:
+    """The old cog_load: every document of every guild"""
+    cache: dict = {}
+    for role_data in await collection.find().to_list(length=None):
+        cache.setdefault(role_data["guild_id"], {})[role_data["user_id"]] = role_data[
+            "role_ids"
+        ]
+    return cache
+
+
+async def run_eager(collection, measure_memory: bool):
+    """Time (or trace) the old startup load"""
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    cache = await eager_load(collection)
+    ready = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+    tracemalloc.stop()
+    del cache
+    return ready, peak
+
+
+async def run_lazy(db, measure_memory: bool):
+    """Time (or trace) startup and first use of a few guilds with the store"""
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    store = StickyRoleStore(db)
+    await store.ensure_indexes()
+    ready = time.perf_counter() - started
+    started = time.perf_counter()
+    for guild_id in range(USED_GUILDS):
+        await store.get(guild_id, 0)
+    first_load = (time.perf_counter() - started) / USED_GUILDS
+    peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+    tracemalloc.stop()
+    return ready, first_load, peak
+
+
+def megabytes(peak) -> str:
+    return "-" if peak is None else f"{peak / 1e6:.1f} MB"
+
+
+async def main(guilds: int, members: int, measure_memory: bool):
+    db = mock_database()
+    collection = await seed(db, guilds, members)
+    print(f"{guilds * members:,} sticky role documents in {guilds} guilds")
+
+    eager_ready, eager_peak = await run_eager(collection, measure_memory)
+    lazy_ready, first_load, lazy_peak = await run_lazy(db, measure_memory)
+    print(
+        f"eager: ready after {eager_ready * 1000:,.0f} ms "
+        f"({guilds * members:,} documents read), peak {megabytes(eager_peak)}"
+    )
+    print(
+        f"lazy:  ready after {lazy_ready * 1000:,.0f} ms (0 documents read), "
+        f"first use of a guild {first_load * 1000:,.0f} ms "
+        f"({members:,} documents read), "
+        f"peak after {USED_GUILDS} guilds {megabytes(lazy_peak)}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="trace peak memory (tracemalloc slows mongomock down a lot)",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.guilds, args.members, args.memory))
@@ -0,0 +1,111 @@
+"""
+Timer Render Benchmark
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Compares the per-tick cost of the timer display before and after
+TimerRenderer. The old display built a fresh ``discord.Embed`` with every
+field and a new progress bar string each second. The renderer updates one
+embed in place and only touches the parts that changed. Each countdown is
+rendered second by second, like a running timer.
+
+CPU is measured with ``timeit``. Memory is measured with ``tracemalloc``
+while the payload of every tick that needs an edit is kept alive, so it
+shows what a countdown hands to the edit queue.
+
+Run from the repository root:
+    python -m benchmarks.timer_render [--seconds 420] [--repeat 20]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+import discord
+
+from src.utils.timer_render import TimerRenderer
+
+OWNER = "<@123456789012345678>"
+CHANNEL = "<#876543210987654321>"
+
+
+def legacy_embed(total_seconds: int, total_time: int) -> discord.Embed:
+    """The embed the timer loop built every second before TimerRenderer"""
+    if total_seconds > 300:
+        color, status_emoji, status_text = 0x00FF00, "🟢", "RUNNING"
+    elif total_seconds > 60:
+        color, status_emoji, status_text = 0xFFFF00, "🟡", "RUNNING"
+    elif total_seconds > 30:
+        color, status_emoji, status_text = 0xFF8800, "🟠", "HURRY UP!"
+    else:
+        color, status_emoji, status_text = 0xFF0000, "🔴", "FINAL COUNTDOWN!"
+
+    progress = max(0, (total_time - total_seconds) / total_time)
+    bar_length = 20
+    filled_blocks = int(progress * bar_length)
+    progress_bar = "█" * filled_blocks + "░" * (bar_length - filled_blocks)
+
+    embed = discord.Embed(
+        title="⏰ Interactive Timer",
+        description=f"```\n⏱️  {total_seconds // 60:02d}:{total_seconds % 60:02d}  ⏱️\n```",
+        color=color,
+    )
+    embed.add_field(name="👤 Timer Owner", value=OWNER, inline=True)
+    embed.add_field(
+        name="🎯 Status", value=f"{status_emoji} **{status_text}**", inline=True
+    )
+    embed.add_field(name="📍 Channel", value=CHANNEL, inline=True)
+    embed.add_field(name="📊 Progress", value=f"{progress_bar}", inline=False)
+    if total_seconds <= 30:
+        embed.set_footer(text="⚡ Time is running out! ⚡")
+        embed.set_thumbnail(
+            url="https://cdn.discordapp.com/emojis/755774680633016380.gif"
+        )
+    else:
+        embed.set_footer(text="Use the buttons below to control your timer!")
+    return embed
+
+
+def run_legacy(seconds: int, keep=None):
+    """Render one countdown the old way"""
+    for left in range(seconds, 0, -1):
+        embed = legacy_embed(left, seconds)
+        if keep is not None:
+            keep.append(embed.to_dict())
+
+
+def run_renderer(seconds: int, keep=None):
+    """Render one countdown with TimerRenderer"""
+    renderer = TimerRenderer(OWNER, CHANNEL)
+    for left in range(seconds, 0, -1):
+        embed = renderer.render(left, (seconds - left) / seconds, False)
+        if keep is not None and embed is not None:
+            keep.append(embed.to_dict())
+
+
+def allocated_per_tick(runner, seconds: int):
+    """Bytes kept per tick and the number of edits a countdown needs"""
+    runner(seconds)  # warm caches and imports
+    keep: list = []
+    tracemalloc.start()
+    runner(seconds, keep)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / seconds, len(keep)
+
+
+def main(seconds: int, repeat: int):
+    print(f"{seconds}-second countdown, best of {repeat} runs")
+    print(f"{'design':<10} {'us/tick':>9} {'bytes/tick':>11} {'edits':>6}")
+    for name, runner in (("legacy", run_legacy), ("renderer", run_renderer)):
+        best = min(timeit.repeat(lambda: runner(seconds), number=1, repeat=repeat))
+        allocated, edits = allocated_per_tick(runner, seconds)
+        print(f"{name:<10} {best / seconds * 1e6:>9.2f} {allocated:>11.0f} {edits:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=int, default=420)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.seconds, args.repeat)
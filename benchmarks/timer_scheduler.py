@@ -0,0 +1,110 @@
+"""
+Timer Scheduler Benchmark
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Runs batches of short fake timers through TimerScheduler and counts event
+loop wakeups and CPU time, next to the old design of one
+``while total_seconds > 0: sleep(1)`` task per timer. Handlers are no-ops,
+so the numbers show scheduling overhead only.
+
+Run from the repository root:
+    python -m benchmarks.timer_scheduler [--duration 3] [--counts 10 100 1000 5000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from src.utils.timer import ScheduledTimer, TimerScheduler
+
+
+class NullHandler:
+    """Timer handler that does nothing"""
+
+    def __init__(self):
+        self.finished = 0
+
+    def on_tick(self, timer, seconds_left):
+        pass
+
+    async def on_milestone(self, timer, seconds_left):
+        pass
+
+    async def on_finish(self, timer):
+        self.finished += 1
+
+
+async def run_scheduler(count: int, duration: float) -> dict:
+    """Run ``count`` timers on one shared scheduler"""
+    scheduler = TimerScheduler()
+    handler = NullHandler()
+    cpu, wall = time.process_time(), time.perf_counter()
+    for index in range(count):
+        # Stagger the starts like timers started by different users
+        scheduler.add(
+            ScheduledTimer(
+                f"{index}_0",
+                1,
+                index,
+                index,
+                duration + random.random(),
+                handler,
+            )
+        )
+    while scheduler.active_timers or scheduler._callbacks:
+        await asyncio.sleep(0.05)
+    stats = scheduler.get_stats()
+    scheduler.stop()
+    return {
+        "wakeups": stats["wakeups"],
+        "cpu_s": time.process_time() - cpu,
+        "wall_s": time.perf_counter() - wall,
+        "finished": handler.finished,
+    }
+
+
+async def run_per_timer_loops(count: int, duration: float) -> dict:
+    """Previous design: one sleeping countdown task per timer"""
+    wakeups = 0
+
+    async def countdown(total_seconds: int):
+        nonlocal wakeups
+        while total_seconds > 0:
+            await asyncio.sleep(1)
+            wakeups += 1
+            total_seconds -= 1
+
+    cpu, wall = time.process_time(), time.perf_counter()
+    await asyncio.gather(
+        *(countdown(int(duration + random.random())) for _ in range(count))
+    )
+    return {
+        "wakeups": wakeups,
+        "cpu_s": time.process_time() - cpu,
+        "wall_s": time.perf_counter() - wall,
+        "finished": count,
+    }
+
+
+async def main(counts, duration: float):
+    print(f"{'timers':>7} {'design':<16} {'wakeups':>8} {'cpu s':>7} {'wall s':>7}")
+    for count in counts:
+        for name, runner in (
+            ("scheduler", run_scheduler),
+            ("per-timer loop", run_per_timer_loops),
+        ):
+            result = await runner(count, duration)
+            print(
+                f"{count:>7} {name:<16} {result['wakeups']:>8} "
+                f"{result['cpu_s']:>7.3f} {result['wall_s']:>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+    asyncio.run(main(args.counts, args.duration))
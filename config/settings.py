@@ -135,6 +135,58 @@ class Config:
     TOPGG_TOKEN: str = os.getenv("TOPGG_TOKEN", "")
     TABBYCAT_API_KEY: str = os.getenv("TABBYCAT_API_KEY", "")
 
+    # Tabbycat HTTP client tuning
+    TABBYCAT_REQUEST_TIMEOUT: float = float(os.getenv("TABBYCAT_REQUEST_TIMEOUT", "10"))
+    TABBYCAT_CONNECT_TIMEOUT: float = float(os.getenv("TABBYCAT_CONNECT_TIMEOUT", "5"))
+    TABBYCAT_MAX_CONNECTIONS_PER_HOST: int = int(
+        os.getenv("TABBYCAT_MAX_CONNECTIONS_PER_HOST", "8")
+    )
+    TABBYCAT_KEEPALIVE_TIMEOUT: float = float(
+        os.getenv("TABBYCAT_KEEPALIVE_TIMEOUT", "30")
+    )
+    # Seconds a cached rounds/pairings/standings response is served as-is
+    TABBYCAT_CACHE_TTL: float = float(os.getenv("TABBYCAT_CACHE_TTL", "15"))
+    TABBYCAT_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("TABBYCAT_CACHE_MAX_ENTRIES", "1024")
+    )
+    # Background tournament sync (seconds)
+    TABBYCAT_SYNC_INTERVAL: float = float(os.getenv("TABBYCAT_SYNC_INTERVAL", "60"))
+    TABBYCAT_SYNC_MAX_BACKOFF: float = float(
+        os.getenv("TABBYCAT_SYNC_MAX_BACKOFF", "900")
+    )
+
+    # ==================== TIMER SETTINGS ====================
+    # Seconds timer state changes are batched before being checkpointed
+    TIMER_CHECKPOINT_DELAY: float = float(os.getenv("TIMER_CHECKPOINT_DELAY", "2"))
+
+    # ==================== GUILD SETTINGS CACHE ====================
+    # Guild settings documents kept in memory, and seconds before one is re-read
+    GUILD_SETTINGS_CACHE_SIZE: int = int(
+        os.getenv("GUILD_SETTINGS_CACHE_SIZE", "20000")
+    )
+    GUILD_SETTINGS_CACHE_TTL: float = float(
+        os.getenv("GUILD_SETTINGS_CACHE_TTL", "600")
+    )
+    # Guilds whose reaction roles / sticky roles stay loaded (least recent evicted)
+    LAZY_GUILD_CACHE_SIZE: int = int(os.getenv("LAZY_GUILD_CACHE_SIZE", "2000"))
+    # Seconds sticky role saves are batched, and days they are kept (0 = forever)
+    STICKY_ROLE_FLUSH_DELAY: float = float(os.getenv("STICKY_ROLE_FLUSH_DELAY", "2"))
+    STICKY_ROLE_RETENTION_DAYS: int = int(os.getenv("STICKY_ROLE_RETENTION_DAYS", "90"))
+
+    # ==================== SERVER LOGS ====================
+    # Messages kept for edit/delete logs, overall and per guild
+    LOG_MESSAGE_CACHE_SIZE: int = int(os.getenv("LOG_MESSAGE_CACHE_SIZE", "10000"))
+    LOG_MESSAGE_CACHE_PER_GUILD: int = int(
+        os.getenv("LOG_MESSAGE_CACHE_PER_GUILD", "2000")
+    )
+    # Seconds log embeds are collected before a batch is sent
+    LOG_BATCH_WINDOW: float = float(os.getenv("LOG_BATCH_WINDOW", "2"))
+    # Log embeds queued per channel before ordinary logs are dropped
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "200"))
+    # Seconds joins wait to share one invite refetch, and parallel warm-up fetches
+    INVITE_REFETCH_DELAY: float = float(os.getenv("INVITE_REFETCH_DELAY", "1.5"))
+    INVITE_WARMUP_CONCURRENCY: int = int(os.getenv("INVITE_WARMUP_CONCURRENCY", "5"))
+
     # ==================== BOT METADATA ====================
     BOT_NAME: str = "AldinnBot"
     BOT_AUTHOR: str = "aldinn"
@@ -168,11 +220,24 @@ class Config:
     MOTIONS_CSV_URL_COMBINED: str = os.getenv("MOTIONS_CSV_URL_COMBINED", "")
     MOTIONS_CSV_URL_ENGLISH: str = os.getenv("MOTIONS_CSV_URL_ENGLISH", "")
     MOTIONS_CSV_URL_BANGLA: str = os.getenv("MOTIONS_CSV_URL_BANGLA", "")
+    # Seconds between background refreshes of the sheets (0 = fetch once)
+    MOTIONS_REFRESH_INTERVAL: int = int(os.getenv("MOTIONS_REFRESH_INTERVAL", "3600"))
+    # Parsed motion bank reused by the next start (relative to the project; "" = off)
+    MOTIONS_SNAPSHOT_PATH: str = os.getenv(
+        "MOTIONS_SNAPSHOT_PATH", "data/motions.snapshot"
+    )
+    # Seconds motion deck positions are batched before they are saved
+    MOTION_DECK_FLUSH_DELAY: float = float(os.getenv("MOTION_DECK_FLUSH_DELAY", "5"))
 
     # ==================== PERFORMANCE SETTINGS ====================
     MAX_MESSAGE_CACHE: int = int(os.getenv("MAX_MESSAGE_CACHE", "1000"))
     COMMAND_TIMEOUT: int = int(os.getenv("COMMAND_TIMEOUT", "30"))  # seconds
     API_RATE_LIMIT: int = int(os.getenv("API_RATE_LIMIT", "100"))  # requests per minute
+    # Threads rendering feedback/ballot images, and renders allowed to wait for one
+    IMAGE_RENDER_WORKERS: int = int(
+        os.getenv("IMAGE_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+    IMAGE_RENDER_QUEUE: int = int(os.getenv("IMAGE_RENDER_QUEUE", "500"))
 
     # ==================== LOGGING CONFIGURATION ====================
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -19,6 +19,19 @@ from discord import app_commands
 
 from config.settings import Config
 from src.database.connection import database
+from src.database.guild_settings import guild_settings
+from src.database.motion_deck_store import motion_deck_store
+from src.database.sticky_role_store import sticky_role_store
+from src.database.timer_store import timer_store
+from src.utils.command_metrics import InstrumentedCommandTree, command_metrics
+from src.utils.edit_coalescer import EditCoalescer
+from src.utils.expiry_scheduler import expiry_scheduler
+from src.utils.image_generator import image_generator
+from src.utils.join_pipeline import JoinPipeline
+from src.utils.language import language_manager
+from src.utils.log_dispatcher import LogDispatcher
+from src.utils.tabbycat_client import TabbycatClient
+from src.utils.timer import timer_scheduler
 from src.utils.topgg_poster import TopGGPoster
 
 # Configure module logger
@@ -92,16 +105,37 @@ class HearHearBot(commands.AutoShardedBot):
             chunk_guilds_at_startup=False,
             member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
             max_messages=1000,  # Limit message cache for memory efficiency
+            # Command latency instrumentation
+            tree_cls=InstrumentedCommandTree,
+            http_trace=command_metrics.http_trace(),
         )
 
         # Initialize components
         self.database = database
+        self.guild_settings = guild_settings
         self.metrics = BotMetrics()
+        self.command_metrics = command_metrics
         self.web_server = None
         self.topgg_poster = TopGGPoster(self)
+        self.tabbycat = TabbycatClient()
+        self.timer_store = timer_store
+        self.timer_manager = timer_scheduler
+        self.timer_manager.store = timer_store
+        self.edit_coalescer = EditCoalescer()
+        self.join_pipeline = JoinPipeline(self)
+        self.log_dispatcher = LogDispatcher()
+        self.expiry_scheduler = expiry_scheduler
+        self.sticky_role_store = sticky_role_store
+        self.language_manager = language_manager
+        self.motion_decks = motion_deck_store
+        self.image_generator = image_generator
         self._bot_ready: bool = False
         self._shutdown_requested: bool = False
 
+        # Time prefix commands from the first hook to the last
+        self.before_invoke(self._start_command_timing)
+        self.after_invoke(self._finish_command_timing)
+
         # Extension tracking
         self.loaded_extensions: List[str] = []
         self.failed_extensions: List[str] = []
@@ -114,14 +148,26 @@ class HearHearBot(commands.AutoShardedBot):
         logger.info("🔧 Bot setup hook initiated")
 
         try:
+            # Queue stored expiry jobs so cogs can see them while loading
+            await self.expiry_scheduler.load()
+
             # Load all extensions
             await self.load_extensions()
 
+            # Resume timers checkpointed before the last shutdown
+            timer_cog = self.get_cog("Timer")
+            if timer_cog:
+                await timer_cog.restore_timers()
+
             # Sync slash commands
             await self.sync_commands()
 
             # Start background tasks
             self.loop.create_task(self.heartbeat_task())
+            self.loop.create_task(self.start_expiry_scheduler())
+
+            # Load the motion bank and keep remote sheets refreshed
+            self.language_manager.start()
 
             # Setup and start top.gg poster if configured
             bot_id = str(self.user.id) if self.user else os.getenv("BOT_ID", "")
@@ -266,6 +312,13 @@ class HearHearBot(commands.AutoShardedBot):
         ) as e:
             logger.error("💥 Critical error in sync_commands: %s", e, exc_info=True)
 
+    async def start_expiry_scheduler(self):
+        """Run scheduled jobs once the guild cache is filled"""
+        # Jobs that came due while the bot was offline fire right away, and
+        # their handlers should see a connected bot with every guild cached
+        await self.wait_until_ready()
+        self.expiry_scheduler.start()
+
     async def heartbeat_task(self):
         """Background task to monitor bot health"""
         await self.wait_until_ready()
@@ -364,6 +417,26 @@ class HearHearBot(commands.AutoShardedBot):
         else:
             await ctx.send("❌ An unexpected error occurred. Please try again later.")
 
+    async def _start_command_timing(self, ctx: commands.Context):
+        """Begin timing a prefix command"""
+        ctx.command_timing = self.command_metrics.start(
+            ctx.command.qualified_name, "prefix"
+        )
+
+    async def _finish_command_timing(self, ctx: commands.Context):
+        """Record a prefix command once it has run"""
+        timing = getattr(ctx, "command_timing", None)
+        if timing is not None:
+            self.command_metrics.finish(timing, failed=ctx.command_failed)
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: Union[app_commands.Command, app_commands.ContextMenu],
+    ):  # pylint: disable=unused-argument
+        """Record a slash command that finished without an error"""
+        self.command_metrics.finish_interaction(interaction, failed=False)
+
     async def on_app_command_error(
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ):
@@ -382,6 +455,14 @@ class HearHearBot(commands.AutoShardedBot):
         except (discord.HTTPException, discord.NotFound) as e:
             logger.error("Failed to send error response: %s", e)
 
+    async def get_language(self, guild_id: int) -> str:
+        """Get the language code configured for a guild"""
+        return await self.guild_settings.get_language(guild_id)
+
+    async def set_language(self, guild_id: int, language: str) -> bool:
+        """Set the language for a guild; returns False if it was not persisted"""
+        return await self.guild_settings.set_language(guild_id, language)
+
     def get_latency_ms(self) -> int:
         """Get bot latency in milliseconds"""
         return round(self.latency * 1000)
@@ -401,6 +482,47 @@ class HearHearBot(commands.AutoShardedBot):
             "is_ready": self._bot_ready,
         }
 
+        # Add per-command latency histograms
+        stats["commands"] = self.command_metrics.get_stats()
+
+        # Add guild settings cache counters
+        stats["guild_settings"] = self.guild_settings.get_stats()
+
+        # Add expiry scheduler counters
+        stats["scheduled_jobs"] = self.expiry_scheduler.get_stats()
+
+        # Add sticky role store counters
+        stats["sticky_roles"] = self.sticky_role_store.get_stats()
+
+        # Add member join pipeline counters
+        stats["member_joins"] = self.join_pipeline.get_stats()
+
+        # Add message log cache counters
+        logging_cog = self.get_cog("LoggingSystem")
+        if logging_cog:
+            stats["message_cache"] = logging_cog.message_cache.get_stats()
+            stats["invites"] = logging_cog.invite_tracker.get_stats()
+
+        # Add motion bank counters
+        stats["motions"] = self.language_manager.get_stats()
+        stats["motion_decks"] = self.motion_decks.get_stats()
+
+        # Add image render pool counters
+        stats["image_rendering"] = self.image_generator.get_stats()
+
+        # Add server log delivery counters
+        stats["log_delivery"] = self.log_dispatcher.get_stats()
+
+        # Add Tabbycat client and response cache counters
+        if self.tabbycat:
+            stats["tabbycat"] = self.tabbycat.get_stats()
+
+        # Add timer scheduler counters
+        if self.timer_manager:
+            stats["timers"] = self.timer_manager.get_stats()
+            stats["timer_edits"] = self.edit_coalescer.get_stats()
+            stats["timer_checkpoints"] = self.timer_store.get_stats()
+
         # Add top.gg status if available
         if self.topgg_poster:
             stats["topgg"] = self.topgg_poster.get_status()
@@ -436,6 +558,31 @@ class HearHearBot(commands.AutoShardedBot):
                 self.topgg_poster.stop()
                 logger.info("📊 Top.gg poster stopped")
 
+            # Deliver queued server logs
+            await self.log_dispatcher.drain()
+
+            # Stop the expiry loop; pending jobs stay stored
+            await self.expiry_scheduler.stop()
+
+            # Write sticky roles still waiting in the write-behind buffer
+            await self.sticky_role_store.close()
+
+            # Stop the shared timer loop and checkpoint what is still running
+            if self.timer_manager:
+                self.timer_manager.stop()
+                await self.timer_store.close()
+
+            # Stop motion sheet refreshes and save motion deck positions
+            await self.language_manager.close()
+            await self.motion_decks.close()
+
+            # Stop the image render threads
+            self.image_generator.close()
+
+            # Close pooled Tabbycat sessions
+            if self.tabbycat:
+                await self.tabbycat.close()
+
             # Stop background tasks
             for task in asyncio.all_tasks():
                 if task != asyncio.current_task() and not task.done():
@@ -11,6 +11,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
+from src.database.guild_settings import LANGUAGE_NAMES
+
 logger = logging.getLogger(__name__)
 
 
@@ -138,18 +140,12 @@ class AdminCommands(commands.Cog):
 
         # Save to database
         try:
-            if not await self.bot.database.ensure_connected():
-                await ctx.send("❌ Database connection error.")
-                return
-
-            collection = await self.bot.database.get_collection("guilds")
-            if not collection:
+            if not await self.bot.guild_settings.update(
+                "guilds", ctx.guild.id, {"autorole": role.id}
+            ):
                 await ctx.send("❌ Database connection error.")
                 return
 
-            await collection.update_one(
-                {"_id": ctx.guild.id}, {"$set": {"autorole": role.id}}, upsert=True
-            )
             await ctx.send(f"✅ Auto-role set to **{role.name}**")
         except (AttributeError, ConnectionError, OSError) as e:
             await ctx.send("❌ Failed to set auto-role.")
@@ -160,18 +156,12 @@ class AdminCommands(commands.Cog):
     async def removeautorole(self, ctx):
         """Remove automatic role assignment"""
         try:
-            if not await self.bot.database.ensure_connected():
-                await ctx.send("❌ Database connection error.")
-                return
-
-            collection = await self.bot.database.get_collection("guilds")
-            if not collection:
+            if not await self.bot.guild_settings.update(
+                "guilds", ctx.guild.id, {}, unset=["autorole"]
+            ):
                 await ctx.send("❌ Database connection error.")
                 return
 
-            await collection.update_one(
-                {"_id": ctx.guild.id}, {"$unset": {"autorole": ""}}, upsert=True
-            )
             await ctx.send("✅ Auto-role removed")
         except (AttributeError, ConnectionError, OSError) as e:
             await ctx.send("❌ Failed to remove auto-role.")
@@ -194,14 +184,11 @@ class AdminCommands(commands.Cog):
                 await ctx.send("❌ Database connection error.")
                 return
 
-            main_collection = await self.bot.database.get_collection("guilds")
+            await self.bot.guild_settings.delete("guilds", ctx.guild.id)
             tabby_collection = await self.bot.database.get_collection(
                 "tournaments", use_tabby_db=True
             )
 
-            if main_collection:
-                await main_collection.delete_one({"_id": ctx.guild.id})
-
             if tabby_collection:
                 await tabby_collection.delete_one({"_id": ctx.guild.id})
 
@@ -222,14 +209,11 @@ class AdminCommands(commands.Cog):
 
         # Get language setting
         language = await self.bot.get_language(guild.id)
+        language = LANGUAGE_NAMES.get(language, language)
 
         # Get autorole setting
         try:
-            guild_data = None
-            if await self.bot.database.ensure_connected():
-                collection = await self.bot.database.get_collection("guilds")
-                if collection:
-                    guild_data = await collection.find_one({"_id": guild.id})
+            guild_data = await self.bot.guild_settings.get("guilds", guild.id)
             autorole_id = guild_data.get("autorole") if guild_data else None
             autorole = guild.get_role(autorole_id) if autorole_id else None
         except (AttributeError, KeyError, TypeError):
@@ -12,8 +12,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from src.database.connection import database
-from src.database.models import COLLECTIONS
+from src.database.guild_settings import LANGUAGE_NAMES
 
 logger = logging.getLogger(__name__)
 
@@ -23,46 +22,22 @@ class ConfigurationCommands(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.db = database  # database is already the Database instance
-        self.guild_configs = {}  # Cache guild configurations
+        self.settings = bot.guild_settings  # Shared guild settings cache
 
     async def cog_load(self):
-        """Load guild configurations on startup"""
-        if not await self.db.ensure_connected():
-            logger.warning(
-                "Configuration system disabled - MongoDB connection unavailable."
-            )
-            return
-        try:
-            await self.load_guild_configs()
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to load guild configs: %s", exc)
+        """Hook auto roles into the member join pipeline"""
+        self.bot.join_pipeline.register("autoroles", roles=self.add_autoroles)
 
-    async def load_guild_configs(self):
-        """Load all guild configurations"""
-        if not await self.db.ensure_connected():
-            return
-        try:
-            collection = await self.db.get_collection(COLLECTIONS["guild_configs"])
-            if not collection:
-                logger.warning("Guild configuration collection not available")
-                return
-            configs = await collection.find().to_list(length=None)
-            for config in configs:
-                self.guild_configs[config["guild_id"]] = config
-            logger.info(
-                "Loaded configurations for %d guilds",
-                len(self.guild_configs),
-            )
-        except Exception:  # pylint: disable=broad-exception-caught
-            # Already logged in cog_load
-            pass
+    async def cog_unload(self):
+        """Remove the auto role join handler"""
+        self.bot.join_pipeline.unregister("autoroles")
 
     async def get_guild_config(self, guild_id: int) -> dict:
         """Get or create guild configuration"""
-        if guild_id not in self.guild_configs:
+        config = await self.settings.get("guild_configs", guild_id)
+        if config is None:
             # Create default config
-            default_config = {
+            config = {
                 "guild_id": guild_id,
                 "prefix": [".", "?"],
                 "language": "english",
@@ -73,31 +48,15 @@ class ConfigurationCommands(commands.Cog):
                 "farewell_channel_id": None,
                 "autorole_ids": [],
             }
+            await self.settings.replace("guild_configs", guild_id, config)
+            config = self.settings.peek("guild_configs", guild_id) or config
 
-            # Save to database
-            if await self.db.ensure_connected():
-                collection = await self.db.get_collection(COLLECTIONS["guild_configs"])
-                if collection:
-                    await collection.insert_one(default_config)
-            self.guild_configs[guild_id] = default_config
-
-        return self.guild_configs[guild_id]
+        return config
 
     async def update_guild_config(self, guild_id: int, updates: dict):
         """Update guild configuration"""
-        config = await self.get_guild_config(guild_id)
-        config.update(updates)
-
-        # Save to database
-        if await self.db.ensure_connected():
-            collection = await self.db.get_collection(COLLECTIONS["guild_configs"])
-            if collection:
-                await collection.replace_one(
-                    {"guild_id": guild_id}, config, upsert=True
-                )
-
-        # Update cache
-        self.guild_configs[guild_id] = config
+        await self.get_guild_config(guild_id)
+        await self.settings.update("guild_configs", guild_id, updates)
 
     @app_commands.command(name="config", description="View server configuration")
     @app_commands.default_permissions(administrator=True)
@@ -122,9 +81,10 @@ class ConfigurationCommands(commands.Cog):
             )
 
             # Basic settings
+            language = await self.bot.get_language(interaction.guild.id)
             embed.add_field(
                 name="🔤 Language",
-                value=config.get("language", "english").title(),
+                value=LANGUAGE_NAMES.get(language, language).title(),
                 inline=True,
             )
 
@@ -669,35 +629,12 @@ class ConfigurationCommands(commands.Cog):
                 f"❌ Failed to manage prefixes: {str(e)}", ephemeral=True
             )
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        """Handle new member auto roles"""
-        try:
-            config = await self.get_guild_config(member.guild.id)
-            autorole_ids = config.get("autorole_ids", [])
-
-            if not autorole_ids:
-                return
-
-            # Get roles that still exist and bot can manage
-            roles_to_add = []
-            for role_id in autorole_ids:
-                role = member.guild.get_role(role_id)
-                if role and role < member.guild.me.top_role:
-                    roles_to_add.append(role)
-
-            if roles_to_add:
-                await member.add_roles(*roles_to_add, reason="Auto role assignment")
-                logger.info(
-                    "Added {len(roles_to_add)} auto roles to {member}",
-                )
-
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error(
-                "Failed to assign auto roles to %s: %s",
-                member,
-                exc,
-            )
+    def add_autoroles(self, context):
+        """Queue the configured auto roles in the join pipeline"""
+        if not context.config:
+            return
+        for role_id in context.config.get("autorole_ids", []):
+            context.add_role(role_id, "Auto role assignment")
 
 
 async def setup(bot):
@@ -9,6 +9,9 @@ from discord.ext import commands
 from discord import app_commands
 import random
 import logging
+from typing import List, Optional
+from src.database.guild_settings import LANGUAGE_NAMES
+from src.database.motion_deck_store import DeckKey
 from src.utils.language import language_manager
 
 logger = logging.getLogger(__name__)
@@ -19,17 +22,83 @@ class DebateCommands(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.decks = bot.motion_decks  # Non-repeating draws per guild/channel
+
+    async def cog_load(self):
+        """Create the motion deck indexes"""
+        if await self.bot.database.ensure_connected():
+            await self.decks.ensure_indexes()
+
+    async def deck_key(self, guild, channel, language) -> DeckKey:
+        """The deck a draw in this channel uses (per channel if configured)"""
+        config = await self.bot.guild_settings.get("guild_configs", guild.id) or {}
+        per_channel = config.get("motion_deck_scope") == "channel"
+        return (channel.id if per_channel and channel else 0, language)
+
+    async def draw_motion(self, guild, channel, language, topic=None):
+        """
+        Draw a motion entry without repeats until the guild's deck runs out.
+
+        Topic draws, DMs and an unavailable database fall back to a plain
+        random draw.
+        """
+        if topic or guild is None:
+            return language_manager.get_random_motion_entry(language, topic)
+        channel_id, language = await self.deck_key(guild, channel, language)
+        try:
+            motion_id = await self.decks.draw(
+                guild.id,
+                channel_id,
+                language,
+                language_manager.get_motion_count(language),
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Motion deck unavailable for %s: %s", guild.id, e)
+            return language_manager.get_random_motion_entry(language)
+        if motion_id is None:
+            return None
+        return language_manager.get_motion_entry(language, motion_id)
+
+    async def guild_motion_language(self, guild_id):
+        """Motion language matching the guild's language setting (English in DMs)"""
+        if guild_id is None:
+            return "english"
+        code = await self.bot.get_language(guild_id)
+        language = LANGUAGE_NAMES.get(code, code)
+        if language not in language_manager.get_available_languages():
+            return "english"
+        return language
+
+    @staticmethod
+    def search_embed(language: str, query: str, results: List[dict]) -> discord.Embed:
+        """Embed listing the motions found by a search"""
+        embed = discord.Embed(
+            title=f"🔎 Motions matching “{query}”",
+            color=discord.Color.gold(),
+        )
+        if not results:
+            embed.description = "No motions contain all of those words."
+            return embed
+        lines = []
+        for index, entry in enumerate(results, 1):
+            text = entry["text"]
+            if len(text) > 300:
+                text = text[:297] + "..."
+            lines.append(f"**{index}.** {text}")
+        embed.description = "\n\n".join(lines)[:4096]
+        embed.set_footer(text=f"{language.title()} • showing {len(results)} result(s)")
+        return embed
 
     @commands.command()
-    async def randommotion(self, ctx, language=None):
+    async def randommotion(self, ctx, language=None, *, topic=None):
         """Get a random debate motion
 
-        Usage: .randommotion [language]
+        Usage: .randommotion [language] [topic]
         Languages: english, bangla
         """
         # Get guild language if not specified
         if not language:
-            language = await self.bot.get_language(ctx.guild.id)
+            language = await self.guild_motion_language(ctx.guild.id)
         else:
             language = language.lower()
 
@@ -40,9 +109,12 @@ class DebateCommands(commands.Cog):
             return
 
         # Get random motion (with optional info slide)
-        entry = language_manager.get_random_motion_entry(language)
+        entry = await self.draw_motion(ctx.guild, ctx.channel, language, topic)
         if not entry:
-            await ctx.send("No motions available for this language.")
+            if topic:
+                await ctx.send(f"No motions found for topic **{topic}**.")
+            else:
+                await ctx.send("No motions available for this language.")
             return
         motion = entry.get("text")
         info = entry.get("info")
@@ -62,6 +134,11 @@ class DebateCommands(commands.Cog):
             inline=True,
         )
 
+        if entry.get("topics"):
+            embed.add_field(
+                name="Topics", value=", ".join(entry["topics"]), inline=False
+            )
+
         # Include Info Slide if present
         if info:
             embed.add_field(name="Info Slide", value=info, inline=False)
@@ -74,7 +151,10 @@ class DebateCommands(commands.Cog):
         await ctx.send(embed=embed)
 
     @app_commands.command(name="randommotion", description="Get a random debate motion")
-    @app_commands.describe(language="Language for the motion (english/bangla)")
+    @app_commands.describe(
+        language="Language for the motion (english/bangla)",
+        topic="Only draw motions tagged with this topic",
+    )
     @app_commands.choices(
         language=[
             app_commands.Choice(name="English", value="english"),
@@ -82,7 +162,10 @@ class DebateCommands(commands.Cog):
         ]
     )
     async def slash_randommotion(
-        self, interaction: discord.Interaction, language: str = "english"
+        self,
+        interaction: discord.Interaction,
+        language: str = "english",
+        topic: Optional[str] = None,
     ):
         """Slash command version of randommotion"""
         # Defer to avoid interaction timeout and allow time for data fetch/processing
@@ -98,7 +181,7 @@ class DebateCommands(commands.Cog):
                 use_channel_fallback = True
         # Get guild language if not specified
         if not language:
-            language = await self.bot.get_language(interaction.guild.id)
+            language = await self.guild_motion_language(interaction.guild.id)
         else:
             language = language.lower()
 
@@ -131,9 +214,15 @@ class DebateCommands(commands.Cog):
                 return
 
         # Get random motion (with optional info slide)
-        entry = language_manager.get_random_motion_entry(language)
+        entry = await self.draw_motion(
+            interaction.guild, interaction.channel, language, topic
+        )
         if not entry:
-            msg = "No motions available for this language."
+            msg = (
+                f"No motions found for topic **{topic}**."
+                if topic
+                else "No motions available for this language."
+            )
             sent = False
             if use_channel_fallback:
                 await interaction.channel.send(msg)
@@ -173,6 +262,11 @@ class DebateCommands(commands.Cog):
             inline=True,
         )
 
+        if entry.get("topics"):
+            embed.add_field(
+                name="Topics", value=", ".join(entry["topics"]), inline=False
+            )
+
         # Include Info Slide if present (truncate if too long for Discord)
         if info:
             # Discord embed field values have a 1024 character limit
@@ -204,6 +298,19 @@ class DebateCommands(commands.Cog):
                     await interaction.channel.send(embed=embed)
                     sent = True
 
+    @slash_randommotion.autocomplete("topic")
+    async def topic_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        """Suggest the topic tags of the chosen language"""
+        language = getattr(interaction.namespace, "language", None) or "english"
+        current = current.lower()
+        return [
+            app_commands.Choice(name=topic, value=topic)
+            for topic in language_manager.get_topics(language)
+            if current in topic.lower()
+        ][:25]
+
     @commands.command(aliases=["dice", "roll"])
     async def diceroll(self, ctx, sides: int = 6):
         """Roll a dice with specified number of sides (default: 6)"""
@@ -700,6 +807,16 @@ class DebateCommands(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.command(aliases=["findmotion"])
+    async def searchmotion(self, ctx, *, query: str):
+        """Search motions for every word of a query
+
+        Usage: .searchmotion <words>
+        """
+        language = await self.guild_motion_language(ctx.guild and ctx.guild.id)
+        results = language_manager.search_motions(language, query)
+        await ctx.send(embed=self.search_embed(language, query, results))
+
     # Slash command versions for remaining commands
     @app_commands.command(
         name="diceroll", description="Roll a dice with specified number of sides"
@@ -936,6 +1053,71 @@ class DebateCommands(commands.Cog):
                 except discord.NotFound:
                     await interaction.channel.send(embed=embed)
 
+    @app_commands.command(
+        name="motiondeck", description="Choose how motions avoid repeating"
+    )
+    @app_commands.describe(
+        action="Share one deck per server or per channel, or start a new pass"
+    )
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="One deck for the server", value="server"),
+            app_commands.Choice(name="One deck per channel", value="channel"),
+            app_commands.Choice(name="Reshuffle all decks", value="reshuffle"),
+        ]
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.guild_only()
+    async def slash_motiondeck(self, interaction: discord.Interaction, action: str):
+        """Configure the non-repeating motion decks of a server"""
+        guild_id = interaction.guild.id
+        if action == "reshuffle":
+            try:
+                await self.decks.reset(guild_id)
+            except ConnectionError:
+                await interaction.response.send_message(
+                    "❌ Motion decks are unavailable right now.", ephemeral=True
+                )
+                return
+            message = "🔀 Motion decks reshuffled; every motion is back in play."
+        else:
+            await self.bot.guild_settings.update(
+                "guild_configs", guild_id, {"motion_deck_scope": action}
+            )
+            message = (
+                "✅ Each channel now draws from its own motion deck."
+                if action == "channel"
+                else "✅ The whole server now shares one motion deck."
+            )
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @app_commands.command(
+        name="searchmotion", description="Search debate motions by words"
+    )
+    @app_commands.describe(
+        query="Words the motion must contain",
+        language="Language to search (defaults to the server language)",
+    )
+    @app_commands.choices(
+        language=[
+            app_commands.Choice(name="English", value="english"),
+            app_commands.Choice(name="Bangla", value="bangla"),
+        ]
+    )
+    async def slash_searchmotion(
+        self,
+        interaction: discord.Interaction,
+        query: str,
+        language: Optional[str] = None,
+    ):
+        """Slash command version of searchmotion"""
+        if not language:
+            language = await self.guild_motion_language(interaction.guild_id)
+        results = language_manager.search_motions(language, query)
+        await interaction.response.send_message(
+            embed=self.search_embed(language, query, results)
+        )
+
 
 async def setup(bot):
     await bot.add_cog(DebateCommands(bot))
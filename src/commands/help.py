@@ -197,7 +197,9 @@ class HelpSystem(commands.Cog):
         embed.add_field(
             name="📋 **Motion Commands**",
             value=(
-                "`/randommotion [language]` - Get a random debate motion\n"
+                "`/randommotion [language] [topic]` - Get a random debate motion\n"
+                "`/searchmotion <query>` - Find motions containing your words\n"
+                "`/motiondeck` - Draw motions without repeats per server or channel\n"
                 "`/motionstats` - View motion usage statistics\n"
                 "• Loads from Google Sheets, CSV, or text files\n"
                 "• Supports info slides for complex motions\n"
@@ -4,6 +4,7 @@ Author: aldinn
 Email: kferdoush617@gmail.com
 """
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
@@ -12,7 +13,9 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from src.database.connection import database
+from config.settings import Config
+from src.utils.invite_tracker import InviteTracker
+from src.utils.message_cache import MessageCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,103 +25,52 @@ class LoggingSystem(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.db = database  # database is already the Database instance
-        self.logging_configs = {}  # Cache guild logging configurations
-        self.message_cache = {}  # Cache messages for edit/delete logging
-        self.invite_cache = {}  # Cache invites for tracking
-        self._db_warning_logged = False
+        self.settings = bot.guild_settings  # Shared guild settings cache
+        # Cache messages for edit/delete logging
+        self.message_cache = MessageCache(
+            Config.LOG_MESSAGE_CACHE_SIZE, Config.LOG_MESSAGE_CACHE_PER_GUILD
+        )
+        self.invite_tracker = InviteTracker()  # Invite state for join attribution
+        self._invite_warmup: Optional[asyncio.Task] = None
 
     async def cog_load(self):
-        """Load logging configurations on startup"""
-        await self.load_logging_configs()
-        await self.cache_guild_invites()
-
-    async def _ensure_db(self) -> bool:
-        """Ensure the MongoDB connection is available for logging."""
-
-        if self.db is None:
-            if not self._db_warning_logged:
-                logger.error("Database instance not configured - logging disabled")
-                self._db_warning_logged = True
-            return False
-
-        try:
-            if await self.db.ensure_connected():
-                self._db_warning_logged = False
-                return True
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            if not self._db_warning_logged:
-                logger.error("Logging database connection failed: %s", exc)
-                self._db_warning_logged = True
-            return False
-
-        if not self._db_warning_logged:
-            logger.warning("Database not available - logging features disabled")
-            self._db_warning_logged = True
-        return False
-
-    async def load_logging_configs(self):
-        """Load all guild logging configurations"""
-        if not await self._ensure_db():
+        """Cache invites on startup"""
+        self.bot.join_pipeline.register("join_log", effect=self.log_member_join)
+        self.settings.subscribe("logging_configs", self._on_logging_config_change)
+        self._invite_warmup = asyncio.create_task(self.cache_guild_invites())
+
+    async def cog_unload(self):
+        """Remove the join log handler"""
+        self.bot.join_pipeline.unregister("join_log")
+        self.settings.unsubscribe("logging_configs", self._on_logging_config_change)
+        if self._invite_warmup and not self._invite_warmup.done():
+            self._invite_warmup.cancel()
+
+    def _on_logging_config_change(self, guild_id: int, config: Optional[dict]):
+        """Stop holding messages and invites of guilds that turned them off"""
+        if config is None:
             return
-
-        try:
-            collection = await self.db.get_collection("logging_configs")
-            if collection is None:
-                logger.info("Logging config collection not available yet")
-                return
-
-            self.logging_configs.clear()
-            async for document in collection.find({}):
-                guild_id = document.get("guild_id")
-                if guild_id is None:
-                    continue
-
-                # Normalize config dictionary and remove Mongo _id
-                document.pop("_id", None)
-                self.logging_configs[int(guild_id)] = document
-
-            logger.info(
-                "Loaded logging configuration for %d guild(s)",
-                len(self.logging_configs),
-            )
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to load logging configs: %s", exc)
+        if not config.get("message_logs_channel"):
+            self.message_cache.drop_guild(guild_id)
+        if not config.get("invite_tracking"):
+            self.invite_tracker.forget(guild_id)
 
     async def cache_guild_invites(self):
-        """Cache guild invites for invite tracking"""
-        for guild in self.bot.guilds:
-            try:
-                invites = await guild.invites()
-                self.invite_cache[guild.id] = {
-                    invite.code: invite.uses for invite in invites
-                }
-            except discord.Forbidden:
-                pass  # No permission to view invites
+        """Cache invites of the guilds that have invite tracking enabled"""
+        await self.bot.wait_until_ready()
+        tracked = set(
+            await self.settings.find_guild_ids(
+                "logging_configs", {"invite_tracking": True}
+            )
+        )
+        guilds = [guild for guild in self.bot.guilds if guild.id in tracked]
+        if guilds:
+            loaded = await self.invite_tracker.warm_up(guilds)
+            logger.info("🔗 Cached invites of %d/%d guild(s)", loaded, len(guilds))
 
     async def get_logging_config(self, guild_id: int) -> Optional[dict]:
         """Get logging configuration for a guild"""
-        if guild_id in self.logging_configs:
-            return self.logging_configs[guild_id]
-
-        if not await self._ensure_db():
-            return None
-
-        try:
-            collection = await self.db.get_collection("logging_configs")
-            if collection is None:
-                return None
-
-            document = await collection.find_one({"guild_id": guild_id})
-            if document:
-                document.pop("_id", None)
-                self.logging_configs[guild_id] = document
-                return document
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error(
-                "Failed to fetch logging config for guild %s: %s", guild_id, exc
-            )
-        return None
+        return await self.settings.get("logging_configs", guild_id)
 
     async def should_log_event(self, guild_id: int, event_type: str, **kwargs) -> bool:
         """Check if an event should be logged based on configuration"""
@@ -148,7 +100,7 @@ class LoggingSystem(commands.Cog):
         return True
 
     async def send_log(self, guild_id: int, channel_type: str, embed: discord.Embed):
-        """Send a log embed to the appropriate channel"""
+        """Queue a log embed for the appropriate channel"""
         config = await self.get_logging_config(guild_id)
         if not config:
             return
@@ -160,36 +112,32 @@ class LoggingSystem(commands.Cog):
         try:
             channel = self.bot.get_channel(channel_id)
             if channel and channel.permissions_for(channel.guild.me).send_messages:
-                await channel.send(embed=embed)
-        except (discord.HTTPException, discord.Forbidden, AttributeError) as e:
+                # Batched per channel by the shared log dispatcher
+                self.bot.log_dispatcher.submit(channel, embed)
+        except AttributeError as e:
             logger.error("Failed to send log to %s: %s", channel_type, e)
 
     # Message Logging Events
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """Cache messages for edit/delete tracking"""
-        if message.guild and not message.author.bot:
-            # Cache the message
-            self.message_cache[message.id] = {
-                "content": message.content,
-                "author_id": message.author.id,
-                "channel_id": message.channel.id,
-                "guild_id": message.guild.id,
-                "created_at": message.created_at,
-                "attachments": [att.url for att in message.attachments],
-                "embeds": len(message.embeds),
-            }
-
-            # Keep cache size manageable (last 10,000 messages)
-            if len(self.message_cache) > 10000:
-                # Remove oldest 1000 messages
-                oldest_keys = sorted(self.message_cache.keys())[:1000]
-                for key in oldest_keys:
-                    del self.message_cache[key]
+        if not message.guild or message.author.bot:
+            return
+
+        # Only guilds that log messages need them cached
+        if await self.should_log_event(
+            message.guild.id,
+            "message",
+            channel_id=message.channel.id,
+            user_id=message.author.id,
+            content=message.content,
+        ):
+            self.message_cache.add(message)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
         """Log deleted messages"""
+        self.message_cache.pop(message.id)
         if not message.guild or message.author.bot:
             return
 
@@ -272,6 +220,10 @@ class LoggingSystem(commands.Cog):
         if not before.guild or before.author.bot:
             return
 
+        cached = self.message_cache.get(after.id)
+        if cached is not None:
+            cached.content = after.content
+
         # Skip if content didn't actually change
         if before.content == after.content:
             return
@@ -336,10 +288,127 @@ class LoggingSystem(commands.Cog):
 
         await self.send_log(before.guild.id, "message", embed)
 
-    # Member Logging Events
     @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        """Log member joins and track invites"""
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Log deletes of messages discord.py no longer has cached"""
+        if payload.cached_message is not None or payload.guild_id is None:
+            return  # on_message_delete handles it
+
+        cached = self.message_cache.pop(payload.message_id)
+        if cached is None:
+            return
+
+        if not await self.should_log_event(
+            cached.guild_id,
+            "message",
+            channel_id=cached.channel_id,
+            user_id=cached.author_id,
+            content=cached.content,
+        ):
+            return
+
+        embed = discord.Embed(
+            title="🗑️ Message Deleted",
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow(),
+        )
+        embed.add_field(
+            name="👤 Author",
+            value=f"<@{cached.author_id}> ({cached.author_id})",
+            inline=True,
+        )
+        embed.add_field(
+            name="📍 Channel",
+            value=f"<#{cached.channel_id}> ({cached.channel_id})",
+            inline=True,
+        )
+        embed.add_field(
+            name="🕒 Created",
+            value=f"<t:{int(cached.created_at.timestamp())}:R>",
+            inline=True,
+        )
+
+        if cached.content:
+            embed.add_field(
+                name="💬 Content", value=f"```{cached.content[:1024]}```", inline=False
+            )
+
+        if cached.attachments:
+            embed.add_field(
+                name="📎 Attachments",
+                value="\n".join(cached.attachments)[:1024],
+                inline=False,
+            )
+
+        if cached.embeds:
+            embed.add_field(
+                name="📄 Embeds", value=f"{cached.embeds} embed(s)", inline=True
+            )
+
+        embed.set_footer(text=f"Message ID: {cached.id}")
+        await self.send_log(cached.guild_id, "message", embed)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Log edits of messages discord.py no longer has cached"""
+        if payload.cached_message is not None or payload.guild_id is None:
+            return  # on_message_edit handles it
+
+        cached = self.message_cache.get(payload.message_id)
+        content = payload.data.get("content")
+        if cached is None or content is None or content == cached.content:
+            return
+
+        before, cached.content = cached.content, content
+        if not await self.should_log_event(
+            cached.guild_id,
+            "message",
+            channel_id=cached.channel_id,
+            user_id=cached.author_id,
+            content=before,
+        ):
+            return
+
+        embed = discord.Embed(
+            title="✏️ Message Edited",
+            color=discord.Color.orange(),
+            timestamp=datetime.utcnow(),
+        )
+        embed.add_field(
+            name="👤 Author",
+            value=f"<@{cached.author_id}> ({cached.author_id})",
+            inline=True,
+        )
+        embed.add_field(
+            name="📍 Channel",
+            value=f"<#{cached.channel_id}> ({cached.channel_id})",
+            inline=True,
+        )
+        embed.add_field(
+            name="🔗 Jump to Message",
+            value=(
+                f"[Click here](https://discord.com/channels/"
+                f"{cached.guild_id}/{cached.channel_id}/{cached.id})"
+            ),
+            inline=True,
+        )
+
+        if before:
+            embed.add_field(
+                name="📝 Before", value=f"```{before[:512]}```", inline=False
+            )
+        if content:
+            embed.add_field(
+                name="📝 After", value=f"```{content[:512]}```", inline=False
+            )
+
+        embed.set_footer(text=f"Message ID: {cached.id}")
+        await self.send_log(cached.guild_id, "message", embed)
+
+    # Member Logging Events
+    async def log_member_join(self, context):
+        """Log member joins and track invites (run by the join pipeline)"""
+        member = context.member
         if not await self.should_log_event(
             member.guild.id, "join_leave", user_id=member.id
         ):
@@ -364,13 +433,13 @@ class LoggingSystem(commands.Cog):
         )
 
         # Try to determine which invite was used
-        config = await self.get_logging_config(member.guild.id)
+        config = context.logging_config
         if config and config.get("invite_tracking"):
-            invite_used = await self.track_invite_usage(member.guild)
+            invite_used = await self.invite_tracker.resolve(member.guild)
             if invite_used:
                 embed.add_field(
                     name="🔗 Invite Used",
-                    value=f"**{invite_used['code']}** (by {invite_used['inviter']})",
+                    value=f"**{invite_used.code}** (by {invite_used.inviter})",
                     inline=False,
                 )
 
@@ -582,31 +651,21 @@ class LoggingSystem(commands.Cog):
 
         await self.send_log(role.guild.id, "server", embed)
 
-    async def track_invite_usage(self, guild: discord.Guild) -> Optional[dict]:
-        """Track which invite was used when someone joins"""
-        try:
-            current_invites = await guild.invites()
-            current_uses = {invite.code: invite.uses for invite in current_invites}
-
-            cached_uses = self.invite_cache.get(guild.id, {})
-
-            # Find the invite with increased usage
-            for code, uses in current_uses.items():
-                if code in cached_uses and uses > cached_uses[code]:
-                    # This invite was used
-                    invite = discord.utils.get(current_invites, code=code)
-                    if invite:
-                        # Update cache
-                        self.invite_cache[guild.id] = current_uses
-                        return {"code": code, "inviter": invite.inviter, "uses": uses}
-
-            # Update cache even if no specific invite was found
-            self.invite_cache[guild.id] = current_uses
+    # Invite Tracking Events
+    @commands.Cog.listener()
+    async def on_invite_create(self, invite: discord.Invite):
+        """Keep tracked invite state current"""
+        self.invite_tracker.on_create(invite)
 
-        except discord.Forbidden:
-            pass  # No permission to view invites
+    @commands.Cog.listener()
+    async def on_invite_delete(self, invite: discord.Invite):
+        """Keep tracked invite state current"""
+        self.invite_tracker.on_delete(invite)
 
-        return None
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Forget the invites of guilds the bot left"""
+        self.invite_tracker.forget(guild.id)
 
     # Configuration Commands
     @app_commands.command(
@@ -617,6 +676,7 @@ class LoggingSystem(commands.Cog):
         member_logs="Channel for member logs (roles, nicknames)",
         server_logs="Channel for server logs (channels, roles, emojis)",
         join_leave="Channel for join/leave logs",
+        moderation_logs="Channel for moderation logs (bans, kicks, mutes)",
         invite_tracking="Enable invite tracking",
     )
     @app_commands.default_permissions(administrator=True)
@@ -627,6 +687,7 @@ class LoggingSystem(commands.Cog):
         member_logs: Optional[discord.TextChannel] = None,
         server_logs: Optional[discord.TextChannel] = None,
         join_leave: Optional[discord.TextChannel] = None,
+        moderation_logs: Optional[discord.TextChannel] = None,
         invite_tracking: Optional[bool] = False,
     ):
         """Set up logging channels for the server"""
@@ -653,22 +714,17 @@ class LoggingSystem(commands.Cog):
                 config["server_logs_channel"] = server_logs.id
             if join_leave:
                 config["join_leave_channel"] = join_leave.id
+            if moderation_logs:
+                config["moderation_logs_channel"] = moderation_logs.id
             if invite_tracking is not None:
                 config["invite_tracking"] = invite_tracking
 
-            # Save to database - disabled for PostgreSQL compatibility
-            # NOTE: PostgreSQL-compatible logging configuration storage needed
-            if self.db is not None and self.db.is_connected:
-                logger.info(
-                    "Logging config saving disabled - requires PostgreSQL migration"
-                )
-
-            # Update cache
-            self.logging_configs[guild_id] = config
+            # Update cache and save to database
+            await self.settings.replace("logging_configs", guild_id, config)
 
-            # If invite tracking is enabled, cache invites
+            # If invite tracking is enabled, cache this guild's invites
             if invite_tracking:
-                await self.cache_guild_invites()
+                await self.invite_tracker.load(interaction.guild)
 
             embed = discord.Embed(
                 title="✅ Logging Configuration Updated",
@@ -696,6 +752,13 @@ class LoggingSystem(commands.Cog):
                     name="📥📤 Join/Leave Logs", value=join_leave.mention, inline=True
                 )
 
+            if moderation_logs:
+                embed.add_field(
+                    name="🛡️ Moderation Logs",
+                    value=moderation_logs.mention,
+                    inline=True,
+                )
+
             embed.add_field(
                 name="🔗 Invite Tracking",
                 value="✅ Enabled" if invite_tracking else "❌ Disabled",
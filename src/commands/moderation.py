@@ -7,18 +7,97 @@ Email: kferdoush617@gmail.com
 import logging
 import re
 from datetime import datetime, timedelta
-from typing import Optional, Union
-import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 
+from src.database.case_store import case_store
 from src.database.connection import database
-from src.database.models import COLLECTIONS, ModerationLog, StickyRole
+from src.database.models import COLLECTIONS, ModerationLog
 
 logger = logging.getLogger(__name__)
 
+# Expiry scheduler job kinds
+TEMP_ROLE_JOB = "temporary_role"
+TEMP_BAN_JOB = "temporary_ban"
+TIMED_MUTE_JOB = "timed_mute"
+
+# Longest timeout Discord accepts; longer mutes are extended when it ends
+MAX_TIMEOUT = timedelta(days=28)
+
+# Loads the page of cases at a cursor and returns it with the next cursor
+CasePageLoader = Callable[
+    [Optional[Any]], Awaitable[Tuple[List[Dict[str, Any]], Optional[Any]]]
+]
+
+
+def format_case(case: Dict[str, Any]) -> str:
+    """One line summary of a stored case"""
+    created_at = case.get("created_at")
+    when = f" · <t:{int(created_at.timestamp())}:R>" if created_at else ""
+    reason = (case.get("reason") or "No reason provided")[:100]
+    return (
+        f"**#{case.get('case_id')}** · {case.get('action', 'unknown')} · "
+        f"<@{case.get('user_id')}> by <@{case.get('moderator_id')}>{when}\n{reason}"
+    )
+
+
+class CasePageView(discord.ui.View):
+    """Newer/older buttons for a cursor-paginated case list"""
+
+    def __init__(self, owner_id: int, title: str, load_page: CasePageLoader):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.title = title
+        self.load_page = load_page
+        self.cursors: List[Optional[Any]] = [None]  # cursor of every page seen
+        self.next_cursor: Optional[Any] = None
+        self.page = 0
+
+    async def render(self) -> discord.Embed:
+        """Load the current page and build its embed"""
+        cases, self.next_cursor = await self.load_page(self.cursors[self.page])
+        self.newer_button.disabled = self.page == 0
+        self.older_button.disabled = self.next_cursor is None
+
+        embed = discord.Embed(
+            title=self.title,
+            description="\n\n".join(format_case(case) for case in cases)
+            or "No cases found.",
+            color=discord.Color.blurple(),
+        )
+        embed.set_footer(text=f"Page {self.page + 1}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the moderator who ran the command may turn pages."""
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message(
+                "🚫 Run the command yourself to browse cases.", ephemeral=True
+            )
+            return False
+        return True
+
+    @discord.ui.button(label="Newer", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def newer_button(
+        self, interaction: discord.Interaction, _button: discord.ui.Button
+    ):
+        """Show the previous (newer) page"""
+        self.page -= 1
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
+    @discord.ui.button(label="Older", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def older_button(
+        self, interaction: discord.Interaction, _button: discord.ui.Button
+    ):
+        """Show the next (older) page"""
+        del self.cursors[self.page + 1 :]
+        self.cursors.append(self.next_cursor)
+        self.page += 1
+        await interaction.response.edit_message(embed=await self.render(), view=self)
+
 
 class ModerationSystem(commands.Cog):
     """Advanced moderation system with Carl-bot features"""
@@ -26,127 +105,130 @@ class ModerationSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = database  # database is already the Database instance
-        self.sticky_roles_cache = {}  # Cache sticky roles
-        self.temp_actions = {}  # Track temporary actions
-        self.check_temp_actions.start()  # Start the cleanup task
+        self.case_store = case_store  # Numbered moderation cases
+        self.sticky_roles = bot.sticky_role_store  # Loaded per guild on first use
+        self.expiry = bot.expiry_scheduler  # Temporary roles, bans and mutes
 
     async def cog_load(self):
         """Load moderation data on startup"""
+        self.bot.join_pipeline.register("sticky_roles", roles=self.add_sticky_roles)
+        self.expiry.register(TEMP_ROLE_JOB, self.handle_expired_temp_role)
+        self.expiry.register(TEMP_BAN_JOB, self.lift_temporary_ban)
+        self.expiry.register(TIMED_MUTE_JOB, self.extend_timed_mute)
         if not await self.db.ensure_connected():
             logger.warning(
                 "Moderation system disabled - MongoDB connection unavailable."
             )
             return
-        await self.load_sticky_roles()
-        await self.load_temporary_actions()
+        await self.ensure_indexes()
+        await self.migrate_temporary_roles()
+
+    async def ensure_indexes(self):
+        """Create the indexes used by sticky role loads and case lookups"""
+        await self.case_store.ensure_indexes()
+        await self.sticky_roles.ensure_indexes()
 
     async def cog_unload(self):
         """Clean up when cog unloads"""
-        self.check_temp_actions.cancel()
+        self.bot.join_pipeline.unregister("sticky_roles")
+        for kind in (TEMP_ROLE_JOB, TEMP_BAN_JOB, TIMED_MUTE_JOB):
+            self.expiry.unregister(kind)
 
-    async def load_sticky_roles(self):
-        """Load sticky roles from database"""
-        if not await self.db.ensure_connected():
-            return
-        try:
-            collection = await self.db.get_collection(COLLECTIONS["sticky_roles"])
-            if not collection:
-                return
-            sticky_roles = await collection.find().to_list(length=None)
-            for role_data in sticky_roles:
-                guild_id = role_data["guild_id"]
-                user_id = role_data["user_id"]
-
-                if guild_id not in self.sticky_roles_cache:
-                    self.sticky_roles_cache[guild_id] = {}
-
-                self.sticky_roles_cache[guild_id][user_id] = role_data["role_ids"]
-
-            logger.info(
-                "Loaded sticky roles for %d guilds", len(self.sticky_roles_cache)
-            )
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to load sticky roles: %s", exc)
-
-    async def load_temporary_actions(self):
-        """Load temporary actions from database"""
-        if not await self.db.ensure_connected():
-            return
+    async def migrate_temporary_roles(self):
+        """Move temporary roles stored by older versions into the scheduler"""
         try:
             collection = await self.db.get_collection(COLLECTIONS["temporary_roles"])
-            if not collection:
+            if collection is None:
                 return
             temp_roles = await collection.find().to_list(length=None)
             for role_data in temp_roles:
-                key = f"{role_data['guild_id']}_{role_data['user_id']}_{role_data['role_id']}"
-                self.temp_actions[key] = {
-                    "type": "role",
-                    "expires_at": role_data["expires_at"],
-                    "data": role_data,
-                }
-
-            logger.info("Loaded %d temporary actions", len(self.temp_actions))
+                await self.schedule_temp_role(
+                    role_data["guild_id"],
+                    role_data["user_id"],
+                    role_data["role_id"],
+                    role_data["expires_at"],
+                )
+            if temp_roles:
+                await collection.delete_many(
+                    {"_id": {"$in": [role_data["_id"] for role_data in temp_roles]}}
+                )
+                logger.info(
+                    "Moved %d temporary role(s) to the scheduler", len(temp_roles)
+                )
         except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to load temporary actions: %s", exc)
-
-    @tasks.loop(minutes=1)
-    async def check_temp_actions(self):
-        """Check and handle expired temporary actions"""
-        now = datetime.utcnow()
-        expired_actions = []
+            logger.error("Failed to migrate temporary roles: %s", exc)
 
-        for key, action in self.temp_actions.items():
-            if action["expires_at"] <= now:
-                expired_actions.append((key, action))
-
-        for key, action in expired_actions:
-            try:
-                if action["type"] == "role":
-                    await self.handle_expired_temp_role(action["data"])
-
-                # Remove from cache and database
-                del self.temp_actions[key]
-                if await self.db.ensure_connected():
-                    collection = await self.db.get_collection(
-                        COLLECTIONS["temporary_roles"]
-                    )
-                    if collection:
-                        await collection.delete_one(
-                            {
-                                "guild_id": action["data"]["guild_id"],
-                                "user_id": action["data"]["user_id"],
-                                "role_id": action["data"]["role_id"],
-                            }
-                        )
-
-            except Exception as exc:  # pylint: disable=broad-exception-caught
-                logger.error("Failed to handle expired action %s: %s", key, exc)
-
-    @check_temp_actions.before_loop
-    async def before_check_temp_actions(self):
-        """Wait for bot to be ready before starting the task"""
-        await self.bot.wait_until_ready()
-
-    async def handle_expired_temp_role(self, role_data: dict):
+    async def schedule_temp_role(
+        self, guild_id: int, user_id: int, role_id: int, expires_at: datetime
+    ):
+        """Remove a role from a member once ``expires_at`` has passed"""
+        await self.expiry.schedule(
+            TEMP_ROLE_JOB,
+            f"{guild_id}:{user_id}:{role_id}",
+            expires_at,
+            {"guild_id": guild_id, "user_id": user_id, "role_id": role_id},
+        )
+
+    async def handle_expired_temp_role(self, job):
         """Handle expired temporary role"""
+        # Straight over HTTP, so the job does not depend on the member cache;
+        # other errors propagate and the scheduler retries the job
         try:
-            guild = self.bot.get_guild(role_data["guild_id"])
-            if not guild:
-                return
-
-            member = guild.get_member(role_data["user_id"])
-            if not member:
-                return
-
-            role = guild.get_role(role_data["role_id"])
-            if not role or role not in member.roles:
-                return
+            await self.bot.http.remove_role(
+                job.data["guild_id"],
+                job.data["user_id"],
+                job.data["role_id"],
+                reason="Temporary role expired",
+            )
+            logger.info(
+                "Removed expired temporary role %s from %s",
+                job.data["role_id"],
+                job.data["user_id"],
+            )
+        except discord.NotFound:
+            pass  # Member left or role deleted
+        except discord.Forbidden:
+            logger.warning("Cannot remove expired temporary role - no permission")
 
-            await member.remove_roles(role, reason="Temporary role expired")
-            logger.info("Removed expired temporary role %s from %s", role.name, member)
+    async def lift_temporary_ban(self, job):
+        """Unban a member whose temporary ban has expired"""
+        try:
+            await self.bot.http.unban(
+                job.data["user_id"], job.data["guild_id"], reason=job.data["reason"]
+            )
+            logger.info(
+                "Lifted temporary ban of %s in %s",
+                job.data["user_id"],
+                job.data["guild_id"],
+            )
+        except discord.NotFound:
+            pass  # Already unbanned
+
+    async def extend_timed_mute(self, job):
+        """Renew the timeout of a mute longer than Discord allows"""
+        ends_at = job.data["ends_at"]
+        remaining = ends_at - datetime.utcnow()
+        if remaining.total_seconds() <= 0:
+            return
+        until = discord.utils.utcnow() + min(remaining, MAX_TIMEOUT)
+        try:
+            await self.bot.http.edit_member(
+                job.data["guild_id"],
+                job.data["user_id"],
+                reason=job.data["reason"],
+                communication_disabled_until=until.isoformat(),
+            )
+        except discord.NotFound:
+            return  # Member left; the mute is reapplied on rejoin, if at all
+        if remaining > MAX_TIMEOUT:
+            await self.expiry.schedule(
+                TIMED_MUTE_JOB, job.key, datetime.utcnow() + MAX_TIMEOUT, job.data
+            )
 
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to remove expired temporary role: %s", exc)
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        """A manual unban replaces a pending temporary ban"""
+        await self.expiry.cancel(TEMP_BAN_JOB, f"{guild.id}:{user.id}")
 
     async def log_moderation_action(
         self,
@@ -162,8 +244,6 @@ class ModerationSystem(commands.Cog):
             reason = "No reason provided"
 
         try:
-            case_id = str(uuid.uuid4())[:8]
-
             mod_log = ModerationLog(
                 guild_id=guild_id,
                 user_id=target_user.id,
@@ -176,18 +256,15 @@ class ModerationSystem(commands.Cog):
                     if duration
                     else None
                 ),
-                case_id=case_id,
             )
 
+            # Allocate the next case number and store the case
+            case_id = None
             if await self.db.ensure_connected():
-                collection = await self.db.get_collection(
-                    COLLECTIONS["moderation_logs"]
-                )
-                if collection:
-                    await collection.insert_one(mod_log.__dict__)
+                case_id = await self.case_store.create_case(mod_log)
 
             # Send to moderation log channel if configured
-            # ... (implement modlog channel sending)
+            await self.send_moderation_log(mod_log)
 
             return case_id
 
@@ -195,6 +272,45 @@ class ModerationSystem(commands.Cog):
             logger.error("Failed to log moderation action: %s", exc)
             return None
 
+    async def send_moderation_log(self, mod_log: ModerationLog):
+        """Queue a moderation action for the guild's moderation log channel"""
+        config = await self.bot.guild_settings.get("logging_configs", mod_log.guild_id)
+        channel_id = config.get("moderation_logs_channel") if config else None
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if (
+            channel is None
+            or not channel.permissions_for(channel.guild.me).send_messages
+        ):
+            return
+
+        embed = discord.Embed(
+            title=f"🛡️ {mod_log.action.replace('_', ' ').title()}",
+            color=discord.Color.dark_red(),
+            timestamp=mod_log.created_at,
+        )
+        embed.add_field(
+            name="👤 User",
+            value=f"<@{mod_log.user_id}> ({mod_log.user_id})",
+            inline=True,
+        )
+        embed.add_field(
+            name="👮 Moderator",
+            value=f"<@{mod_log.moderator_id}> ({mod_log.moderator_id})",
+            inline=True,
+        )
+        if mod_log.duration:
+            embed.add_field(
+                name="⏰ Duration",
+                value=self.format_duration(mod_log.duration),
+                inline=True,
+            )
+        embed.add_field(name="📝 Reason", value=mod_log.reason, inline=False)
+        if mod_log.case_id is not None:
+            embed.set_footer(text=f"Case #{mod_log.case_id}")
+
+        # Moderation logs are sent ahead of other queued logs
+        self.bot.log_dispatcher.submit(channel, embed, priority=True)
+
     # Moderation Commands
     @app_commands.command(
         name="mute", description="Mute a member for a specified duration"
@@ -252,8 +368,24 @@ class ModerationSystem(commands.Cog):
 
             # Apply timeout
             if timeout_duration:
-                until = datetime.utcnow() + timedelta(seconds=timeout_duration)
-                await member.timeout(until, reason=reason)
+                ends_at = datetime.utcnow() + timedelta(seconds=timeout_duration)
+                await member.timeout(
+                    min(timedelta(seconds=timeout_duration), MAX_TIMEOUT),
+                    reason=reason,
+                )
+                if timedelta(seconds=timeout_duration) > MAX_TIMEOUT:
+                    # Renew the timeout when Discord's maximum runs out
+                    await self.expiry.schedule(
+                        TIMED_MUTE_JOB,
+                        f"{interaction.guild.id}:{member.id}",
+                        datetime.utcnow() + MAX_TIMEOUT,
+                        {
+                            "guild_id": interaction.guild.id,
+                            "user_id": member.id,
+                            "ends_at": ends_at,
+                            "reason": reason,
+                        },
+                    )
             else:
                 # Permanent mute using timeout for 28 days (max)
                 until = datetime.utcnow() + timedelta(days=28)
@@ -307,7 +439,7 @@ class ModerationSystem(commands.Cog):
             embed.add_field(name="📝 Reason", value=reason, inline=False)
 
             if case_id:
-                embed.set_footer(text=f"Case ID: {case_id}")
+                embed.set_footer(text=f"Case #{case_id}")
 
             await interaction.followup.send(embed=embed)
 
@@ -360,6 +492,9 @@ class ModerationSystem(commands.Cog):
 
             # Remove timeout
             await member.timeout(None, reason=reason)
+            await self.expiry.cancel(
+                TIMED_MUTE_JOB, f"{interaction.guild.id}:{member.id}"
+            )
 
             # Log the action
             case_id = await self.log_moderation_action(
@@ -385,7 +520,7 @@ class ModerationSystem(commands.Cog):
             embed.add_field(name="📝 Reason", value=reason, inline=False)
 
             if case_id:
-                embed.set_footer(text=f"Case ID: {case_id}")
+                embed.set_footer(text=f"Case #{case_id}")
 
             await interaction.followup.send(embed=embed)
 
@@ -477,7 +612,7 @@ class ModerationSystem(commands.Cog):
             embed.add_field(name="📝 Reason", value=reason, inline=False)
 
             if case_id:
-                embed.set_footer(text=f"Case ID: {case_id}")
+                embed.set_footer(text=f"Case #{case_id}")
 
             await interaction.followup.send(embed=embed)
 
@@ -584,17 +719,20 @@ class ModerationSystem(commands.Cog):
 
             # Schedule unban if temporary
             if ban_duration:
-                # Add to temporary actions tracking
-                key = f"{interaction.guild.id}_{member.id}_ban"
-                self.temp_actions[key] = {
-                    "type": "ban",
-                    "expires_at": datetime.utcnow() + timedelta(seconds=ban_duration),
-                    "data": {
+                await self.expiry.schedule(
+                    TEMP_BAN_JOB,
+                    f"{interaction.guild.id}:{member.id}",
+                    datetime.utcnow() + timedelta(seconds=ban_duration),
+                    {
                         "guild_id": interaction.guild.id,
                         "user_id": member.id,
                         "reason": f"Temporary ban expired (original reason: {reason})",
                     },
-                }
+                )
+            else:
+                await self.expiry.cancel(
+                    TEMP_BAN_JOB, f"{interaction.guild.id}:{member.id}"
+                )
 
             # Log the action
             case_id = await self.log_moderation_action(
@@ -650,7 +788,7 @@ class ModerationSystem(commands.Cog):
             embed.add_field(name="📝 Reason", value=reason, inline=False)
 
             if case_id:
-                embed.set_footer(text=f"Case ID: {case_id}")
+                embed.set_footer(text=f"Case #{case_id}")
 
             await interaction.followup.send(embed=embed)
 
@@ -664,73 +802,103 @@ class ModerationSystem(commands.Cog):
                 f"❌ Failed to ban member: {str(exc)}", ephemeral=True
             )
 
-    async def save_sticky_roles(self, member: discord.Member):
-        """Save member's roles for sticky role restoration"""
-        try:
-            # Only save roles that aren't @everyone and aren't higher than bot's role
-            roles_to_save = [
-                role.id
-                for role in member.roles[1:]  # Exclude @everyone
-                if role < member.guild.me.top_role  # Only roles bot can manage
-            ]
-
-            if not roles_to_save:
-                return
-
-            sticky_role = StickyRole(
-                guild_id=member.guild.id, user_id=member.id, role_ids=roles_to_save
+    @app_commands.command(
+        name="cases", description="Browse this server's moderation cases"
+    )
+    @app_commands.describe(case="Show a single case by its number")
+    @app_commands.default_permissions(moderate_members=True)
+    async def cases_command(
+        self, interaction: discord.Interaction, case: Optional[int] = None
+    ):
+        """List moderation cases, newest first"""
+        if not interaction.guild:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server.", ephemeral=True
             )
+            return
 
-            # Save to database
-            if await self.db.ensure_connected():
-                collection = await self.db.get_collection(COLLECTIONS["sticky_roles"])
-                if collection:
-                    await collection.replace_one(
-                        {"guild_id": member.guild.id, "user_id": member.id},
-                        sticky_role.__dict__,
-                        upsert=True,
-                    )
+        guild_id = interaction.guild.id
+        if case is not None:
+            stored = await self.case_store.get_case(guild_id, case)
+            if stored is None:
+                await interaction.response.send_message(
+                    f"❌ Case #{case} was not found.", ephemeral=True
+                )
+                return
+            embed = discord.Embed(
+                title=f"🛡️ Case #{case}",
+                description=format_case(stored),
+                color=discord.Color.blurple(),
+            )
+            if stored.get("duration"):
+                embed.add_field(
+                    name="⏰ Duration",
+                    value=self.format_duration(stored["duration"]),
+                    inline=True,
+                )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
 
-            # Update cache
-            if member.guild.id not in self.sticky_roles_cache:
-                self.sticky_roles_cache[member.guild.id] = {}
+        view = CasePageView(
+            interaction.user.id,
+            f"🛡️ Moderation Cases — {interaction.guild.name}",
+            lambda cursor: self.case_store.guild_cases(guild_id, before=cursor),
+        )
+        await interaction.response.send_message(
+            embed=await view.render(), view=view, ephemeral=True
+        )
 
-            self.sticky_roles_cache[member.guild.id][member.id] = roles_to_save
+    @app_commands.command(
+        name="history", description="Show a member's moderation history"
+    )
+    @app_commands.describe(member="Member whose cases to show")
+    @app_commands.default_permissions(moderate_members=True)
+    async def history_command(
+        self,
+        interaction: discord.Interaction,
+        member: Union[discord.Member, discord.User],
+    ):
+        """List one member's moderation cases, newest first"""
+        if not interaction.guild:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server.", ephemeral=True
+            )
+            return
 
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to save sticky roles for %s: %s", member, exc)
+        guild_id = interaction.guild.id
+        view = CasePageView(
+            interaction.user.id,
+            f"📜 Moderation History — {member}",
+            lambda cursor: self.case_store.user_history(
+                guild_id, member.id, before=cursor
+            ),
+        )
+        await interaction.response.send_message(
+            embed=await view.render(), view=view, ephemeral=True
+        )
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        """Restore sticky roles when member rejoins"""
+    async def save_sticky_roles(self, member: discord.Member):
+        """Save member's roles for sticky role restoration"""
+        # Only save roles that aren't @everyone and aren't higher than bot's role
+        roles_to_save = [
+            role.id
+            for role in member.roles[1:]  # Exclude @everyone
+            if role < member.guild.me.top_role  # Only roles bot can manage
+        ]
+
+        if roles_to_save:
+            # Written to the database in the next batched flush
+            self.sticky_roles.save(member.guild.id, member.id, roles_to_save)
+
+    async def add_sticky_roles(self, context):
+        """Queue a rejoining member's sticky roles in the join pipeline"""
         try:
-            guild_id = member.guild.id
-            user_id = member.id
-
-            # Check if we have sticky roles for this user
-            if (
-                guild_id in self.sticky_roles_cache
-                and user_id in self.sticky_roles_cache[guild_id]
-            ):
-                role_ids = self.sticky_roles_cache[guild_id][user_id]
-
-                # Get roles that still exist
-                roles_to_add = []
-                for role_id in role_ids:
-                    role = member.guild.get_role(role_id)
-                    if role and role < member.guild.me.top_role:
-                        roles_to_add.append(role)
-
-                if roles_to_add:
-                    await member.add_roles(
-                        *roles_to_add, reason="Sticky roles restoration"
-                    )
-                    logger.info(
-                        "Restored %d sticky roles to %s", len(roles_to_add), member
-                    )
-
+            role_ids = await self.sticky_roles.get(context.guild.id, context.member.id)
         except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to restore sticky roles for %s: %s", member, exc)
+            logger.error("Failed to load sticky roles for %s: %s", context.guild, exc)
+            return
+        for role_id in role_ids or ():
+            context.add_role(role_id, "Sticky roles restoration")
 
     def parse_duration(self, duration: str) -> Optional[int]:
         """Parse duration string into seconds"""
@@ -6,18 +6,27 @@ Email: kferdoush617@gmail.com
 
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from config.settings import Config
 from src.database.connection import database
 from src.database.models import COLLECTIONS, ReactionRole, ReactionRoleConfig
+from src.utils.guild_cache import LazyGuildCache
 
 logger = logging.getLogger(__name__)
 
+# Expiry scheduler job kind for self-destructing messages
+SELF_DESTRUCT_JOB = "reaction_role_self_destruct"
+TEMPORARY_ROLE_JOB = "reaction_role_expiry"
+
+# How long a role from a temporary mode message lasts unless configured
+DEFAULT_TEMPORARY_ROLE_MINUTES = 60
+
 
 class ReactionRolesSystem(commands.Cog):
     """Advanced reaction roles system with Carl-bot features"""
@@ -26,10 +35,23 @@ class ReactionRolesSystem(commands.Cog):
         self.bot = bot
         self.db = database  # database is already the Database instance
         self.reaction_roles_cache = {}  # Cache for active reaction role messages
-        self.self_destruct_tasks = {}  # Track self-destructing messages
+        # guild id -> IDs of its reaction role messages, loaded on first use
+        self.guild_messages = LazyGuildCache(
+            "reaction_roles",
+            self.load_guild_reaction_roles,
+            Config.LAZY_GUILD_CACHE_SIZE,
+            on_evict=self._evict_guild,
+        )
+        self.role_counts = {}  # role id -> members holding it (max_uses roles)
+        # (role id, member id) counted above but not yet seen in a member update
+        self.pending_holders = set()
+        self._counting = {}  # guild id -> task counting its limited roles
+        self.expiry = bot.expiry_scheduler  # Runs self-destructs and role expiry
 
     async def cog_load(self):
         """Load existing reaction role configurations on startup"""
+        self.expiry.register(SELF_DESTRUCT_JOB, self.self_destruct)
+        self.expiry.register(TEMPORARY_ROLE_JOB, self.expire_temporary_role)
         # Check if database supports MongoDB operations
         if not hasattr(self.db, "__getitem__"):
             logger.warning(
@@ -37,86 +59,199 @@ class ReactionRolesSystem(commands.Cog):
                 "Current database is PostgreSQL. This feature needs migration."
             )
             return
-        await self.load_reaction_roles()
+        await self.ensure_indexes()
+        await self.queue_self_destructs()
 
-    async def load_reaction_roles(self):
-        """Load all reaction role configurations from database"""
-        if not hasattr(self.db, "__getitem__"):
-            return
+    async def ensure_indexes(self):
+        """Create the indexes used by per-guild loads"""
         try:
-            # pylint: disable=unsubscriptable-object
-            config_collection = self.db[COLLECTIONS["reaction_role_configs"]]  # type: ignore[index]
-            configs = await config_collection.find().to_list(length=None)
-
-            role_collection = self.db[COLLECTIONS["reaction_roles"]]  # type: ignore[index]
-            roles = await role_collection.find().to_list(length=None)
-            # pylint: enable=unsubscriptable-object
-
-            # Group roles by message ID
-            roles_by_message = {}
-            for role in roles:
-                msg_id = role["message_id"]
-                if msg_id not in roles_by_message:
-                    roles_by_message[msg_id] = []
-                roles_by_message[msg_id].append(role)
-
-            # Build cache
-            for config in configs:
-                msg_id = config["message_id"]
-                self.reaction_roles_cache[msg_id] = {
-                    "config": config,
-                    "roles": roles_by_message.get(msg_id, []),
-                }
-
-                # Set up self-destruct if needed
-                if config.get("self_destruct"):
-                    await self.schedule_self_destruct(msg_id, config["self_destruct"])
+            configs = await self.db.get_collection(COLLECTIONS["reaction_role_configs"])
+            roles = await self.db.get_collection(COLLECTIONS["reaction_roles"])
+            if configs is None or roles is None:
+                return
+            await configs.create_index([("guild_id", 1)], name="guild_id")
+            await roles.create_index([("message_id", 1)], name="message_id")
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to create reaction role indexes: %s", exc)
 
-            logger.info(
-                "Loaded %d reaction role messages", len(self.reaction_roles_cache)
+    async def cog_unload(self):
+        """Stop running self-destructs for this cog"""
+        self.expiry.unregister(SELF_DESTRUCT_JOB)
+        self.expiry.unregister(TEMPORARY_ROLE_JOB)
+
+    async def queue_self_destructs(self):
+        """Queue self-destructs created before they were persisted"""
+        try:
+            collection = await self.db.get_collection(
+                COLLECTIONS["reaction_role_configs"]
             )
+            if collection is None:
+                return
+            async for config in collection.find({"self_destruct": {"$gt": 0}}):
+                if not self.expiry.get(SELF_DESTRUCT_JOB, config["message_id"]):
+                    await self.schedule_self_destruct(config)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to queue reaction role self-destructs: %s", exc)
+
+    async def load_guild_reaction_roles(self, guild_id: int) -> set:
+        """Load one guild's reaction role messages; returns their message IDs"""
+        config_collection = await self.db.get_collection(
+            COLLECTIONS["reaction_role_configs"]
+        )
+        role_collection = await self.db.get_collection(COLLECTIONS["reaction_roles"])
+        if config_collection is None or role_collection is None:
+            raise ConnectionError("MongoDB connection unavailable")
+
+        configs = await config_collection.find({"guild_id": guild_id}).to_list(
+            length=None
+        )
+        message_ids = {config["message_id"] for config in configs}
+
+        # Group roles by message ID
+        roles_by_message = {}
+        if message_ids:
+            async for role in role_collection.find(
+                {"message_id": {"$in": list(message_ids)}}
+            ):
+                roles_by_message.setdefault(role["message_id"], []).append(role)
+
+        for config in configs:
+            msg_id = config["message_id"]
+            self.cache_message(config, roles_by_message.get(msg_id, []))
+
+        guild = self.bot.get_guild(guild_id)
+        if guild is not None and self.limited_roles(guild_id):
+            self.warm_holder_counts(guild)
+        return message_ids
+
+    def _evict_guild(self, guild_id: int, message_ids: set):
+        """Drop the cached messages of a cold guild"""
+        for msg_id in message_ids:
+            self.reaction_roles_cache.pop(msg_id, None)
 
+    async def get_message_data(self, guild_id: int, message_id: int):
+        """Return a cached reaction role message, loading its guild if needed"""
+        try:
+            await self.guild_messages.get(guild_id)
         except Exception as exc:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to load reaction roles: %s", exc)
+            logger.error("Failed to load reaction roles for %s: %s", guild_id, exc)
+            return None
+        return self.reaction_roles_cache.get(message_id)
+
+    def cache_message(self, config: dict, roles: list) -> dict:
+        """Cache a reaction role message with its emoji -> role index"""
+        data = {
+            "config": config,
+            "roles": roles,  # display order
+            "emojis": {role_data["emoji"]: role_data for role_data in roles},
+        }
+        self.reaction_roles_cache[config["message_id"]] = data
+        return data
+
+    def limited_roles(self, guild_id: int) -> set:
+        """IDs of a guild's cached reaction roles that have ``max_uses``"""
+        return {
+            role_data["role_id"]
+            for data in self.reaction_roles_cache.values()
+            if data["config"].get("guild_id") == guild_id
+            for role_data in data["roles"]
+            if role_data.get("max_uses")
+        }
+
+    def _pending_count(self, role_id: int) -> int:
+        """Members given ``role_id`` whose member update has not arrived yet"""
+        return sum(
+            1 for pending_role, _ in self.pending_holders if pending_role == role_id
+        )
+
+    def holder_count(self, role: discord.Role) -> int:
+        """Number of members with ``role``, counted once and then kept current"""
+        count = self.role_counts.get(role.id)
+        if count is not None:
+            return count
+        count = len(role.members) + self._pending_count(role.id)
+        if role.guild.chunked:
+            self.role_counts[role.id] = count
+        else:
+            # Never make a reaction wait on a member download: go with the
+            # members cached so far until the background count is in
+            self.warm_holder_counts(role.guild)
+        return count
+
+    def warm_holder_counts(self, guild: discord.Guild):
+        """Count the holders of a guild's limited roles in the background"""
+        task = self._counting.get(guild.id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._count_holders(guild))
+            self._counting[guild.id] = task
+            task.add_done_callback(lambda _: self._counting.pop(guild.id, None))
+
+    async def _count_holders(self, guild: discord.Guild):
+        """Fetch a guild's members, then count its limited roles"""
+        try:
+            if not guild.chunked:
+                await guild.chunk()
+        except discord.DiscordException as exc:
+            logger.warning("Could not fetch the members of %s: %s", guild, exc)
+            return
+        for role_id in self.limited_roles(guild.id):
+            role = guild.get_role(role_id)
+            if role is not None and role_id not in self.role_counts:
+                self.role_counts[role_id] = len(role.members) + self._pending_count(
+                    role_id
+                )
 
-    async def schedule_self_destruct(self, message_id: int, delay: int):
-        """Schedule a message for self-destruction"""
+    async def schedule_self_destruct(self, config: dict):
+        """Queue a reaction role message for self-destruction"""
+        created_at = config.get("created_at") or datetime.utcnow()
+        await self.expiry.schedule(
+            SELF_DESTRUCT_JOB,
+            config["message_id"],
+            created_at + timedelta(seconds=config["self_destruct"]),
+            {"channel_id": config["channel_id"], "guild_id": config.get("guild_id")},
+        )
+
+    async def self_destruct(self, job):
+        """Delete a self-destructing message (run by the expiry scheduler)"""
+        message_id = int(job.key)
+        channel = self.bot.get_partial_messageable(
+            job.data["channel_id"], guild_id=job.data.get("guild_id")
+        )
+        try:
+            await channel.get_partial_message(message_id).delete()
+            logger.info("Self-destructed reaction role message %d", message_id)
+        except discord.NotFound:
+            pass  # already deleted by hand
+        except discord.Forbidden:
+            logger.warning(
+                "Cannot delete self-destructing message %d - no permission",
+                message_id,
+            )
 
-        async def self_destruct():
-            await asyncio.sleep(delay)
-            try:
-                # Get the message and delete it
-                for guild in self.bot.guilds:
-                    for channel in guild.text_channels:
-                        try:
-                            message = await channel.fetch_message(message_id)
-                            await message.delete()
-                            logger.info(
-                                "Self-destructed reaction role message %d", message_id
-                            )
-                            break
-                        except discord.NotFound:
-                            continue
-                        except discord.Forbidden:
-                            continue
-
-                # Clean up from database and cache
-                await self.remove_reaction_role_message(message_id)
-
-            except Exception as exc:  # pylint: disable=broad-exception-caught
-                logger.error("Failed to self-destruct message %d: %s", message_id, exc)
-            finally:
-                # Clean up task reference
-                if message_id in self.self_destruct_tasks:
-                    del self.self_destruct_tasks[message_id]
-
-        # Cancel existing task if any
-        if message_id in self.self_destruct_tasks:
-            self.self_destruct_tasks[message_id].cancel()
-
-        # Schedule new task
-        task = asyncio.create_task(self_destruct())
-        self.self_destruct_tasks[message_id] = task
+        # Clean up from database and cache
+        await self.remove_reaction_role_message(message_id)
+
+    async def expire_temporary_role(self, job):
+        """Take back a role from a temporary mode message (run by the scheduler)"""
+        # Over HTTP rather than the member cache; other errors are retried
+        try:
+            await self.bot.http.remove_role(
+                job.data["guild_id"],
+                job.data["user_id"],
+                job.data["role_id"],
+                reason="Temporary reaction role expired",
+            )
+            logger.info(
+                "Temporary role %s expired for %s",
+                job.data["role_id"],
+                job.data["user_id"],
+            )
+        except discord.NotFound:
+            pass  # Member left or role deleted
+        except discord.Forbidden:
+            logger.warning(
+                "Cannot remove temporary role %s - no permission", job.data["role_id"]
+            )
 
     @app_commands.command(
         name="reactionrole", description="Create a reaction role message"
@@ -126,6 +261,7 @@ class ReactionRolesSystem(commands.Cog):
         description="Description for the reaction role embed",
         mode="Mode: unique (one role), verify (confirm), reversed (remove), binding (permanent), temporary",
         self_destruct="Self-destruct after X minutes (optional)",
+        role_minutes="Temporary mode: minutes before a role is removed (default 60)",
         channel="Channel to send the message (defaults to current)",
     )
     @app_commands.choices(
@@ -155,6 +291,7 @@ class ReactionRolesSystem(commands.Cog):
         mode: str = "normal",
         self_destruct: Optional[int] = None,
         channel: Optional[discord.TextChannel] = None,
+        role_minutes: Optional[int] = None,
     ):
         """Create a new reaction role message"""
         if not interaction.guild:
@@ -247,6 +384,11 @@ class ReactionRolesSystem(commands.Cog):
                 self_destruct=(
                     self_destruct * 60 if self_destruct else None
                 ),  # Convert to seconds
+                role_duration=(
+                    (role_minutes or DEFAULT_TEMPORARY_ROLE_MINUTES) * 60
+                    if mode == "temporary"
+                    else None
+                ),
                 created_by=interaction.user.id,
             )
 
@@ -257,14 +399,13 @@ class ReactionRolesSystem(commands.Cog):
                 # pylint: enable=unsubscriptable-object
 
             # Add to cache
-            self.reaction_roles_cache[message.id] = {
-                "config": config.__dict__,
-                "roles": [],
-            }
+            message_ids = await self.guild_messages.get(interaction.guild.id)
+            message_ids.add(message.id)
+            self.cache_message(config.__dict__, [])
 
             # Schedule self-destruct if needed
             if self_destruct:
-                await self.schedule_self_destruct(message.id, self_destruct * 60)
+                await self.schedule_self_destruct(config.__dict__)
 
             await interaction.followup.send(
                 f"✅ **Reaction role message created!**\n"
@@ -317,7 +458,7 @@ class ReactionRolesSystem(commands.Cog):
             return
 
         # Check if message exists in cache
-        if msg_id not in self.reaction_roles_cache:
+        if await self.get_message_data(interaction.guild.id, msg_id) is None:
             await interaction.response.send_message(
                 "❌ Reaction role message not found. Make sure you're using the correct message ID.",
                 ephemeral=True,
@@ -334,14 +475,13 @@ class ReactionRolesSystem(commands.Cog):
             return
 
         # Check if role is already assigned to this emoji
-        existing_roles = self.reaction_roles_cache[msg_id]["roles"]
-        for existing_role in existing_roles:
-            if existing_role["emoji"] == emoji:
-                await interaction.response.send_message(
-                    f"❌ The emoji {emoji} is already assigned to role **{existing_role['role_name']}**.",
-                    ephemeral=True,
-                )
-                return
+        existing_role = self.reaction_roles_cache[msg_id]["emojis"].get(emoji)
+        if existing_role:
+            await interaction.response.send_message(
+                f"❌ The emoji {emoji} is already assigned to role **{existing_role['role_name']}**.",
+                ephemeral=True,
+            )
+            return
 
         try:
             await interaction.response.defer()
@@ -394,7 +534,11 @@ class ReactionRolesSystem(commands.Cog):
                 # pylint: enable=unsubscriptable-object
 
             # Add to cache
-            self.reaction_roles_cache[msg_id]["roles"].append(reaction_role.__dict__)
+            data = self.reaction_roles_cache[msg_id]
+            data["roles"].append(reaction_role.__dict__)
+            data["emojis"][emoji] = reaction_role.__dict__
+            if max_uses:
+                self.warm_holder_counts(interaction.guild)
 
             # Update the embed to show the new role
             await self.update_reaction_role_embed(message)
@@ -522,13 +666,14 @@ class ReactionRolesSystem(commands.Cog):
                 # pylint: enable=unsubscriptable-object
 
             # Remove from cache
-            if message_id in self.reaction_roles_cache:
-                del self.reaction_roles_cache[message_id]
+            data = self.reaction_roles_cache.pop(message_id, None)
+            if data is not None:
+                message_ids = self.guild_messages.peek(data["config"].get("guild_id"))
+                if message_ids is not None:
+                    message_ids.discard(message_id)
 
-            # Cancel self-destruct task if any
-            if message_id in self.self_destruct_tasks:
-                self.self_destruct_tasks[message_id].cancel()
-                del self.self_destruct_tasks[message_id]
+            # Cancel pending self-destruct if any
+            await self.expiry.cancel(SELF_DESTRUCT_JOB, message_id)
 
         except Exception as exc:  # pylint: disable=broad-exception-caught
             logger.error(
@@ -555,7 +700,9 @@ class ReactionRolesSystem(commands.Cog):
 
         # Check if this is a reaction role message
         msg_id = payload.message_id
-        if msg_id not in self.reaction_roles_cache:
+        if payload.guild_id is None:
+            return
+        if await self.get_message_data(payload.guild_id, msg_id) is None:
             return
 
         try:
@@ -569,15 +716,9 @@ class ReactionRolesSystem(commands.Cog):
 
             data = self.reaction_roles_cache[msg_id]
             config = data["config"]
-            roles = data["roles"]
 
             # Find the role for this emoji
-            target_role_data = None
-            for role_data in roles:
-                if role_data["emoji"] == str(payload.emoji):
-                    target_role_data = role_data
-                    break
-
+            target_role_data = data["emojis"].get(str(payload.emoji))
             if not target_role_data:
                 return
 
@@ -637,24 +778,52 @@ class ReactionRolesSystem(commands.Cog):
         self, member: discord.Member, role: discord.Role, role_data: dict, config: dict
     ):
         """Add a role to a member with mode-specific logic"""
-        mode = config["mode"]
+        # Check if member already has the role (or is being given it)
+        if role in member.roles or (role.id, member.id) in self.pending_holders:
+            return
 
-        # Check if member already has the role
-        if role in member.roles:
+        if not role_data.get("max_uses"):
+            await self._give_role(member, role, role_data, config)
             return
 
         # Check max uses
-        if role_data.get("max_uses"):
-            current_uses = len([m for m in member.guild.members if role in m.roles])
-            if current_uses >= role_data["max_uses"]:
-                # Send ephemeral message about limit reached
-                try:
-                    await member.send(
-                        f"❌ The role **{role.name}** has reached its maximum limit of {role_data['max_uses']} users."
-                    )
-                except discord.Forbidden:
-                    pass
-                return
+        current_uses = self.holder_count(role)
+        if current_uses >= role_data["max_uses"]:
+            # Send ephemeral message about limit reached
+            try:
+                await member.send(
+                    f"❌ The role **{role.name}** has reached its maximum limit of {role_data['max_uses']} users."
+                )
+            except discord.Forbidden:
+                pass
+            return
+
+        # Take the slot before awaiting anything, so a burst of reactions
+        # cannot all pass the check above; give it back if the role is not
+        # added after all
+        if role.id in self.role_counts:
+            self.role_counts[role.id] += 1
+        self.pending_holders.add((role.id, member.id))
+        added = False
+        try:
+            added = await self._give_role(member, role, role_data, config)
+        finally:
+            if not added and (role.id, member.id) in self.pending_holders:
+                self.pending_holders.discard((role.id, member.id))
+                if role.id in self.role_counts:
+                    self.role_counts[role.id] -= 1
+
+    async def _give_role(
+        self, member: discord.Member, role: discord.Role, role_data: dict, config: dict
+    ) -> bool:
+        """
+        Run the mode-specific steps and add the role.
+
+        Returns:
+            Whether the role was added
+        """
+        mode = config["mode"]
+        added = False
 
         # Handle unique mode - remove other roles from this message
         if mode == "unique":
@@ -728,8 +897,24 @@ class ReactionRolesSystem(commands.Cog):
         # Add the role
         try:
             await member.add_roles(role, reason=f"Reaction role ({mode} mode)")
+            added = True
             logger.info("Added role %s to %s via reaction role", role.name, member)
 
+            if mode == "temporary":
+                duration = config.get("role_duration") or (
+                    DEFAULT_TEMPORARY_ROLE_MINUTES * 60
+                )
+                await self.expiry.schedule(
+                    TEMPORARY_ROLE_JOB,
+                    f"{member.guild.id}:{member.id}:{role.id}",
+                    datetime.utcnow() + timedelta(seconds=duration),
+                    {
+                        "guild_id": member.guild.id,
+                        "user_id": member.id,
+                        "role_id": role.id,
+                    },
+                )
+
             # Send confirmation DM if possible
             try:
                 embed = discord.Embed(
@@ -751,6 +936,7 @@ class ReactionRolesSystem(commands.Cog):
             )
         except Exception as exc:  # pylint: disable=broad-exception-caught
             logger.error("Failed to add role %s to %s: %s", role.name, member, exc)
+        return added
 
     async def remove_role_from_member(
         self,
@@ -785,6 +971,10 @@ class ReactionRolesSystem(commands.Cog):
                 role, reason=f"Reaction role removal ({mode} mode)"
             )
             logger.info("Removed role %s from %s via reaction role", role.name, member)
+            if mode == "temporary":
+                await self.expiry.cancel(
+                    TEMPORARY_ROLE_JOB, f"{member.guild.id}:{member.id}:{role.id}"
+                )
 
             # Send confirmation DM if possible
             try:
@@ -806,6 +996,35 @@ class ReactionRolesSystem(commands.Cog):
         except Exception as exc:  # pylint: disable=broad-exception-caught
             logger.error("Failed to remove role %s from %s: %s", role.name, member, exc)
 
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Keep holder counts of limited roles current"""
+        if before.roles == after.roles or not (
+            self.role_counts or self.pending_holders
+        ):
+            return
+        before_ids = {role.id for role in before.roles}
+        after_ids = {role.id for role in after.roles}
+        for role_id in after_ids ^ before_ids:
+            gained = role_id in after_ids
+            if gained and (role_id, after.id) in self.pending_holders:
+                # Already counted when the reaction took the slot
+                self.pending_holders.discard((role_id, after.id))
+            elif role_id in self.role_counts:
+                self.role_counts[role_id] += 1 if gained else -1
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        """Members leaving no longer hold limited roles"""
+        for role in member.roles:
+            if role.id in self.role_counts:
+                self.role_counts[role.id] -= 1
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        """Forget the holder count of a deleted role"""
+        self.role_counts.pop(role.id, None)
+
 
 async def setup(bot):
     """Load the ReactionRolesSystem cog"""
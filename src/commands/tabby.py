@@ -1,20 +1,31 @@
 """
-Tabbycat Integration Commands for Hear! Hear! Bot - PostgreSQL Compatible
+Tabbycat Integration Commands for Hear! Hear! Bot
 Author: aldinn
 Email: kferdoush617@gmail.com
 
-NOTE: This is a temporary compatibility layer during PostgreSQL migration.
-Many features are temporarily disabled until proper PostgreSQL tables are created.
+Tournament connections, participants and registration keys are kept in the
+persistent tournament store. A background sync engine mirrors rounds,
+pairings and venues there too, so draw commands answer from local data and
+only fall back to Tabbycat when nothing has been synced yet.
 """
 
 import logging
+from datetime import timezone
 
 import discord
-import requests
 from discord import app_commands
 from discord.ext import commands
+from pymongo.errors import PyMongoError
 
 from src.database.connection import Database
+from src.database.tournament_store import tournament_store
+from src.utils.tabbycat_client import (
+    TabbycatClient,
+    TabbycatError,
+    round_url_for,
+    select_current_round,
+)
+from src.utils.tabbycat_sync import TabbycatSyncEngine
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +36,52 @@ class TabbyCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.database = Database()
-        # Temporary in-memory storage until PostgreSQL tables are created
-        self.tournament_cache = {}
+        # Shared pooled client so Tabbycat calls never block the event loop
+        self.tabbycat: TabbycatClient = bot.tabbycat
+        # Persistent tournament storage with write-through cache
+        self.store = tournament_store
+        # Background delta import of each connected tournament
+        self.sync_engine = TabbycatSyncEngine(bot, self.tabbycat, self.store)
+
+    async def cog_load(self):
+        """Start background syncing of stored tournaments"""
+        self.sync_engine.start()
+
+    async def cog_unload(self):
+        """Stop background syncing"""
+        self.sync_engine.stop()
+
+    async def _get_tournament_data(self, guild_id):
+        """Get tournament data from the tournament store"""
+        return await self.store.get_tournament(guild_id)
+
+    async def _store_tournament_data(self, guild_id, data):
+        """Store tournament data in the tournament store"""
+        await self.store.set_tournament(guild_id, data)
+
+    async def _import_participants(self, guild_id, tournament_data):
+        """
+        Import teams and adjudicators so registration keys resolve locally
 
-    def _get_tournament_data(self, guild_id):
-        """Get tournament data from cache"""
-        return self.tournament_cache.get(guild_id)
+        Returns:
+            int: Number of registration keys imported, or None on failure
+        """
+        try:
+            teams = await self.tabbycat.get_teams(
+                tournament_data["tournament"], tournament_data["token"]
+            )
+            adjudicators = await self.tabbycat.get_adjudicators(
+                tournament_data["tournament"], tournament_data["token"]
+            )
+        except TabbycatError as exc:
+            logger.error("Failed to import participants for %s: %s", guild_id, exc)
+            return None
 
-    def _store_tournament_data(self, guild_id, data):
-        """Store tournament data in cache"""
-        self.tournament_cache[guild_id] = data
+        try:
+            return await self.store.replace_participants(guild_id, teams, adjudicators)
+        except PyMongoError:
+            # Logged by the store; the background sync retries the write
+            return None
 
     @commands.command(name="tabsync")
     @commands.has_permissions(administrator=True)
@@ -46,25 +93,19 @@ class TabbyCommands(commands.Cog):
         """
         try:
             # Clean up the URL
-            if url.endswith("/"):
-                base_url = url[:-1]
-            else:
-                base_url = url
+            base_url = self.tabbycat.normalize_site(url)
 
             # Test the connection
-            test_url = f"{base_url}/api/v1/tournaments"
-            headers = {"Authorization": f"Token {token}"}
-
-            response = requests.get(test_url, headers=headers, timeout=10)
-
-            if response.status_code != 200:
+            try:
+                tournaments = await self.tabbycat.get_tournaments(base_url, token)
+            except TabbycatError as exc:
+                if exc.status is None:
+                    raise
                 await ctx.send(
-                    f"❌ Failed to connect to Tabbycat. Status code: {response.status_code}"
+                    f"❌ Failed to connect to Tabbycat. Status code: {exc.status}"
                 )
                 return
 
-            tournaments = response.json()
-
             if not tournaments:
                 await ctx.send("❌ No tournaments found at this URL.")
                 return
@@ -73,17 +114,18 @@ class TabbyCommands(commands.Cog):
             tournament = tournaments[0]
             tournament_url = f"{base_url}/api/v1/tournaments/{tournament['slug']}/"
 
-            # Store tournament data in temporary cache
+            # Store tournament data in the tournament store
             tournament_data = {
                 "site": base_url,
                 "token": token,
                 "tournament": tournament_url,
                 "tournament_name": tournament["name"],
                 "tournament_slug": tournament["slug"],
-                "teams": [],
-                "adjudicators": [],
             }
-            self._store_tournament_data(ctx.guild.id, tournament_data)
+            self.tabbycat.invalidate_tournament(tournament_url)
+            await self._store_tournament_data(ctx.guild.id, tournament_data)
+            key_count = await self._import_participants(ctx.guild.id, tournament_data)
+            self.sync_engine.schedule(ctx.guild.id)
 
             embed = discord.Embed(
                 title="✅ Tournament Connected",
@@ -97,7 +139,13 @@ class TabbyCommands(commands.Cog):
                 name="Tournament Name", value=tournament["name"], inline=True
             )
             embed.add_field(
-                name="Status", value="Connected (⚠️ Storage pending)", inline=True
+                name="Registration Keys",
+                value=(
+                    str(key_count)
+                    if key_count is not None
+                    else "⚠️ Import failed, run tabsync again"
+                ),
+                inline=True,
             )
 
             await ctx.send(embed=embed)
@@ -105,7 +153,7 @@ class TabbyCommands(commands.Cog):
                 "Connected guild %s to tournament %s", ctx.guild.id, tournament["name"]
             )
 
-        except requests.exceptions.RequestException as e:
+        except TabbycatError as e:
             await ctx.send(f"❌ Network error: {str(e)}")
             logger.error("Network error in sync command: %s", e)
         except (AttributeError, KeyError, ValueError) as e:
@@ -134,23 +182,80 @@ class TabbyCommands(commands.Cog):
 
     async def _register_logic(self, ctx, key, is_slash=False):
         """Shared logic for both command types"""
+        send_func = ctx.followup.send if is_slash else ctx.send
         try:
-            # Tournament registration temporarily disabled for PostgreSQL migration
-            # NOTE: PostgreSQL tournament storage and registration needed
-
-            send_func = ctx.followup.send if is_slash else ctx.send
             if is_slash:
-                await ctx.response.defer()
+                await ctx.response.defer(ephemeral=True)
 
-            await send_func(
-                "⚠️ Tournament registration temporarily disabled during PostgreSQL migration.\n"
-                f"Your registration key `{key}` has been noted.\n"
-                "Please check back soon when the database migration is complete!"
+            guild = ctx.guild
+            user = ctx.user if is_slash else ctx.author
+            tournament_data = await self._get_tournament_data(guild.id)
+            if not tournament_data:
+                await send_func(
+                    "❌ This server is not synced with a tournament. Use `/tabsync` first."
+                )
+                return
+
+            registration = await self.store.get_registration_by_key(
+                guild.id, key.strip()
             )
-            return
+            if not registration:
+                await send_func(
+                    "❌ Invalid registration key. Check the key from your private URL "
+                    "or contact the tab team."
+                )
+                return
 
-        except (discord.HTTPException, AttributeError) as e:
-            send_func = ctx.followup.send if is_slash else ctx.send
+            linked_user = registration.get("discord_id")
+            if linked_user is not None and linked_user != user.id:
+                await send_func(
+                    "❌ This key is already registered to another member. "
+                    "Contact the tab team if this is a mistake."
+                )
+                return
+
+            registration = await self.store.link_user(
+                guild.id, registration["key"], user.id
+            )
+
+            # Give the matching tournament role if it has been set up
+            role_name = (
+                "Adjudicator" if registration["role"] == "adjudicator" else "Debater"
+            )
+            role = discord.utils.get(guild.roles, name=role_name)
+            if role and isinstance(user, discord.Member) and role not in user.roles:
+                try:
+                    await user.add_roles(role, reason="Tournament registration")
+                except discord.Forbidden:
+                    logger.warning(
+                        "Missing permission to assign %s in guild %s",
+                        role_name,
+                        guild.id,
+                    )
+
+            embed = discord.Embed(
+                title="✅ Registered",
+                description=(
+                    f"Welcome, **{registration['name']}**! You are registered for "
+                    f"**{tournament_data['tournament_name']}**."
+                ),
+                color=discord.Color.green(),
+            )
+            embed.add_field(name="Role", value=role_name, inline=True)
+            if registration.get("team_name"):
+                embed.add_field(
+                    name="Team", value=registration["team_name"], inline=True
+                )
+
+            await send_func(embed=embed)
+            logger.info(
+                "Registered user %s as %s in guild %s",
+                user.id,
+                registration["role"],
+                guild.id,
+            )
+
+        except (discord.HTTPException, AttributeError, KeyError) as e:
             if is_slash and not ctx.response.is_done():
                 await ctx.response.defer()
             await send_func("❌ Registration error.")
@@ -246,24 +351,18 @@ class TabbyCommands(commands.Cog):
 
         try:
             # Clean up the URL
-            if url.endswith("/"):
-                base_url = url[:-1]
-            else:
-                base_url = url
+            base_url = self.tabbycat.normalize_site(url)
 
             # Test the connection
-            test_url = f"{base_url}/api/v1/tournaments"
-            headers = {"Authorization": f"Token {token}"}
-
-            response = requests.get(test_url, headers=headers, timeout=10)
-
-            if response.status_code != 200:
+            try:
+                tournaments = await self.tabbycat.get_tournaments(base_url, token)
+            except TabbycatError as exc:
+                if exc.status is None:
+                    raise
                 await interaction.followup.send(
-                    f"❌ Failed to connect to Tabbycat. Status code: {response.status_code}"
+                    f"❌ Failed to connect to Tabbycat. Status code: {exc.status}"
                 )
                 return
-
-            tournaments = response.json()
             if not tournaments:
                 await interaction.followup.send(
                     "❌ No tournaments found in your Tabbycat instance."
@@ -273,25 +372,31 @@ class TabbyCommands(commands.Cog):
             # Use the first tournament (or let admin choose in the future)
             tournament = tournaments[0]
 
-            # Store tournament data in temporary cache
+            # Store tournament data in the tournament store
             tournament_data = {
                 "site": base_url,
                 "token": token,
                 "tournament": f"{base_url}/api/v1/tournaments/{tournament['slug']}/",
                 "tournament_name": tournament["name"],
                 "tournament_slug": tournament["slug"],
-                "teams": [],
-                "adjudicators": [],
             }
-            self._store_tournament_data(interaction.guild_id, tournament_data)
+            self.tabbycat.invalidate_tournament(tournament_data["tournament"])
+            await self._store_tournament_data(interaction.guild_id, tournament_data)
+            key_count = await self._import_participants(
+                interaction.guild_id, tournament_data
+            )
+            self.sync_engine.schedule(interaction.guild_id)
 
-            # Store tournament data in PostgreSQL
             if await self.database.ensure_connected():
                 await interaction.followup.send(
                     f"✅ Successfully connected to tournament: **{tournament['name']}**\n"
                     f"🔗 URL: {base_url}\n"
                     f"📊 Tournament ID: {tournament['slug']}\n"
-                    f"💾 Data cached and ready for use!"
+                    + (
+                        f"🔑 Registration keys imported: {key_count}"
+                        if key_count is not None
+                        else "⚠️ Participant import failed, run `/tabsync` again"
+                    )
                 )
                 logger.info(
                     "Synced guild %s with tournament %s",
@@ -301,7 +406,7 @@ class TabbyCommands(commands.Cog):
             else:
                 await interaction.followup.send("❌ Database connection error.")
 
-        except requests.exceptions.RequestException as e:
+        except TabbycatError as e:
             await interaction.followup.send(f"❌ Network error: {str(e)}")
             logger.error("Network error in slash sync command: %s", e)
         except (AttributeError, KeyError, ValueError) as e:
@@ -371,144 +476,143 @@ class TabbyCommands(commands.Cog):
     # Helper methods to handle both slash and prefix commands
     async def _checkin_logic(self, ctx, is_slash=False):
         """Shared logic for checkin commands"""
-        try:
-            tournament_data = self._get_tournament_data(
-                ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
-            )
-            if not tournament_data:
-                send_func = ctx.followup.send if is_slash else ctx.send
-                await send_func(
-                    "❌ This server is not synced with a tournament. Use `/tabsync` first."
-                )
-                return
+        await self._set_checkin(ctx, True, is_slash=is_slash)
 
-            # For now, provide information about check-in process
-            embed = discord.Embed(
-                title="✅ Tournament Check-in",
-                description="Ready to check in for the tournament",
-                color=discord.Color.green(),
-            )
+    async def _checkout_logic(self, ctx, is_slash=False):
+        """Shared logic for checkout commands"""
+        await self._set_checkin(ctx, False, is_slash=is_slash)
 
-            embed.add_field(
-                name="📋 Check-in Process:",
-                value="1. Make sure you're registered with `/register <key>`\n"
-                "2. Check your tournament status with `/status`\n"
-                "3. Contact the tab team if you need assistance",
-                inline=False,
-            )
+    async def _get_registration(self, ctx, is_slash=False):
+        """
+        Resolve the tournament and the invoking user's registration
 
-            embed.add_field(
-                name="🏆 Tournament:",
-                value=f"**{tournament_data['tournament_name']}**",
-                inline=True,
-            )
+        Sends the appropriate error and returns (None, None) when either is
+        missing.
+        """
+        send_func = ctx.followup.send if is_slash else ctx.send
+        guild_id = ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
+        user = ctx.user if is_slash else ctx.author
 
-            embed.add_field(
-                name="🔗 Tabbycat:",
-                value=f"[Open Tournament]({tournament_data['site']})",
-                inline=True,
+        tournament_data = await self._get_tournament_data(guild_id)
+        if not tournament_data:
+            await send_func(
+                "❌ This server is not synced with a tournament. Use `/tabsync` first."
             )
+            return None, None
 
-            send_func = ctx.followup.send if is_slash else ctx.send
-            await send_func(embed=embed)
+        registration = await self.store.get_registration_by_user(guild_id, user.id)
+        if not registration:
+            await send_func(
+                "❌ You are not registered. Use `/register <key>` with the key from "
+                "your private URL first."
+            )
+            return tournament_data, None
 
-        except (discord.HTTPException, AttributeError) as e:
-            send_func = ctx.followup.send if is_slash else ctx.send
-            await send_func("❌ Error processing check-in.")
-            logger.error("Error in checkin command: %s", e)
+        return tournament_data, registration
 
-    async def _checkout_logic(self, ctx, is_slash=False):
-        """Shared logic for checkout commands"""
+    async def _set_checkin(self, ctx, checked_in, is_slash=False):
+        """Shared logic for checking in and out"""
+        action = "check-in" if checked_in else "check-out"
+        send_func = ctx.followup.send if is_slash else ctx.send
         try:
-            tournament_data = self._get_tournament_data(
-                ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
+            tournament_data, registration = await self._get_registration(
+                ctx, is_slash=is_slash
             )
-            if not tournament_data:
-                send_func = ctx.followup.send if is_slash else ctx.send
+            if not registration:
+                return
+
+            if registration.get("checked_in", False) == checked_in:
                 await send_func(
-                    "❌ This server is not synced with a tournament. Use `/tabsync` first."
+                    f"ℹ️ You are already checked {'in' if checked_in else 'out'}."
                 )
                 return
 
-            # For now, provide information about check-out process
-            embed = discord.Embed(
-                title="🚪 Tournament Check-out",
-                description="Ready to check out from the tournament",
-                color=discord.Color.orange(),
+            await self.store.set_checked_in(
+                registration["guild_id"], registration["discord_id"], checked_in
             )
 
-            embed.add_field(
-                name="📋 Check-out Process:",
-                value="1. Complete any ongoing debates or judging\n"
-                "2. Submit any required feedback\n"
-                "3. Check your availability status",
-                inline=False,
-            )
+            if checked_in:
+                embed = discord.Embed(
+                    title="✅ Checked In",
+                    description=f"**{registration['name']}** is checked in.",
+                    color=discord.Color.green(),
+                )
+            else:
+                embed = discord.Embed(
+                    title="🚪 Checked Out",
+                    description=f"**{registration['name']}** is checked out.",
+                    color=discord.Color.orange(),
+                )
 
             embed.add_field(
                 name="🏆 Tournament:",
                 value=f"**{tournament_data['tournament_name']}**",
                 inline=True,
             )
+            if registration.get("team_name"):
+                embed.add_field(
+                    name="👥 Team:", value=registration["team_name"], inline=True
+                )
 
-            send_func = ctx.followup.send if is_slash else ctx.send
             await send_func(embed=embed)
 
-        except (discord.HTTPException, AttributeError) as e:
-            send_func = ctx.followup.send if is_slash else ctx.send
-            await send_func("❌ Error processing check-out.")
-            logger.error("Error in checkout command: %s", e)
+        except (discord.HTTPException, AttributeError, KeyError) as e:
+            await send_func(f"❌ Error processing {action}.")
+            logger.error("Error in %s command: %s", action, e)
 
     async def _ballot_logic(self, ctx, is_slash=False):
         """Shared logic for ballot commands"""
+        send_func = ctx.followup.send if is_slash else ctx.send
         try:
-            tournament_data = self._get_tournament_data(
-                ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
+            tournament_data, registration = await self._get_registration(
+                ctx, is_slash=is_slash
             )
-            if not tournament_data:
-                send_func = ctx.followup.send if is_slash else ctx.send
-                await send_func(
-                    "❌ This server is not synced with a tournament. Use `/tabsync` first."
-                )
+            if not registration:
                 return
 
-            # Get adjudicator info (simplified for now)
-            # In a full implementation, this would check if the user is registered as an adjudicator
-            # and fetch their specific ballot assignments
+            if registration["role"] != "adjudicator":
+                await send_func("❌ Ballots are only available to adjudicators.")
+                return
+
+            # Ballots are submitted from the adjudicator's private URL
+            private_url = (
+                f"{tournament_data['site']}/{tournament_data['tournament_slug']}"
+                f"/privateurls/{registration['key']}/"
+            )
 
             embed = discord.Embed(
                 title="🗳️ Adjudicator Ballot",
-                description="Ballot functionality is available for registered adjudicators",
+                description=(
+                    f"Submit your ballots for **{tournament_data['tournament_name']}** "
+                    f"from your [private URL]({private_url})."
+                ),
                 color=discord.Color.purple(),
             )
-
-            embed.add_field(
-                name="📋 How to get your ballot:",
-                value="1. Make sure you're registered with `/register <key>`\n"
-                "2. Check in with `/checkin`\n"
-                "3. Your ballot will be available once the round starts",
-                inline=False,
-            )
-
             embed.add_field(
                 name="💡 Note:",
-                value="Full ballot functionality requires tournament organizer setup.\n"
-                "Contact the tab team if you need assistance.",
+                value="Keep this link private - it identifies you to the tab system.",
                 inline=False,
             )
 
-            send_func = ctx.followup.send if is_slash else ctx.send
-            await send_func(embed=embed)
+            # The private URL must not be posted in a public channel
+            user = ctx.user if is_slash else ctx.author
+            try:
+                await user.send(embed=embed)
+                await send_func("📬 Your ballot link has been sent to your DMs.")
+            except discord.Forbidden:
+                await send_func(
+                    "❌ I couldn't DM you. Enable direct messages from server "
+                    "members and try again."
+                )
 
-        except (discord.HTTPException, AttributeError) as e:
-            send_func = ctx.followup.send if is_slash else ctx.send
+        except (discord.HTTPException, AttributeError, KeyError) as e:
             await send_func("❌ Error fetching ballot information.")
             logger.error("Error in ballot command: %s", e)
 
     async def _pairings_logic(self, ctx, is_slash=False):
         """Shared logic for pairings commands"""
         try:
-            tournament_data = self._get_tournament_data(
+            tournament_data = await self._get_tournament_data(
                 ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
             )
             if not tournament_data:
@@ -518,37 +622,19 @@ class TabbyCommands(commands.Cog):
                 )
                 return
 
-            headers = {"Authorization": f"Token {tournament_data['token']}"}
+            guild_id = tournament_data["guild_id"]
+            token = tournament_data["token"]
 
-            # First get current round info
-            rounds_url = f"{tournament_data['tournament']}rounds"
+            # First get current round info, preferring the synced snapshot
             try:
-                rounds_response = requests.get(rounds_url, headers=headers, timeout=10)
-                rounds_response.raise_for_status()
-            except requests.exceptions.RequestException as exc:
+                rounds = await self._get_rounds(tournament_data)
+            except TabbycatError as exc:
                 send_func = ctx.followup.send if is_slash else ctx.send
                 await send_func("❌ Failed to fetch rounds data.")
-                logger.error("Error fetching rounds from %s: %s", rounds_url, exc)
+                logger.error("Error fetching rounds: %s", exc)
                 return
 
-            try:
-                rounds = rounds_response.json()
-            except ValueError as exc:
-                send_func = ctx.followup.send if is_slash else ctx.send
-                await send_func("❌ Invalid rounds data received from tab system.")
-                logger.error("Invalid JSON for rounds response: %s", exc)
-                return
-
-            # Find the current round (first non-completed round)
-            current_round = None
-            for round_data in rounds:
-                if not round_data.get("completed", False):
-                    current_round = round_data
-                    break
-
-            if not current_round:
-                # If no incomplete rounds, use the last round
-                current_round = rounds[-1] if rounds else None
+            current_round = select_current_round(rounds)
 
             if not current_round:
                 send_func = ctx.followup.send if is_slash else ctx.send
@@ -556,39 +642,31 @@ class TabbyCommands(commands.Cog):
                 return
 
             # Get pairings for the current round
-            round_url = current_round.get("url") or current_round.get("links", {}).get(
-                "pairings"
-            )
-            if not round_url:
-                round_id = current_round.get("id")
-                if round_id is not None:
-                    round_url = f"{tournament_data['tournament']}rounds/{round_id}"
+            round_url = round_url_for(current_round, tournament_data["tournament"])
 
-            pairings_url = f"{round_url}/pairings" if round_url else None
-            if not pairings_url:
+            if not round_url:
                 send_func = ctx.followup.send if is_slash else ctx.send
                 await send_func("❌ Pairings endpoint not provided by tab system.")
                 logger.error("Round data missing pairings URL: %s", current_round)
                 return
 
-            try:
-                pairings_response = requests.get(
-                    pairings_url, headers=headers, timeout=10
-                )
-                pairings_response.raise_for_status()
-            except requests.exceptions.RequestException as exc:
-                send_func = ctx.followup.send if is_slash else ctx.send
-                await send_func("❌ Failed to fetch pairings data.")
-                logger.error("Error fetching pairings from %s: %s", pairings_url, exc)
-                return
+            pairings = await self.store.get_snapshot(
+                guild_id, "pairings", round_id=current_round.get("id")
+            )
+            if pairings is None:
+                try:
+                    pairings = await self.tabbycat.get_pairings(round_url, token)
+                except TabbycatError as exc:
+                    send_func = ctx.followup.send if is_slash else ctx.send
+                    await send_func("❌ Failed to fetch pairings data.")
+                    logger.error("Error fetching pairings: %s", exc)
+                    return
 
-            try:
-                pairings = pairings_response.json()
-            except ValueError as exc:
-                send_func = ctx.followup.send if is_slash else ctx.send
-                await send_func("❌ Invalid pairings data received from tab system.")
-                logger.error("Invalid JSON for pairings response: %s", exc)
-                return
+            team_names = await self.store.get_team_names(guild_id)
+            venue_names = {
+                venue.get("url"): venue.get("display_name") or venue.get("name")
+                for venue in await self.store.get_snapshot(guild_id, "venues") or []
+            }
 
             embed = discord.Embed(
                 title=(
@@ -606,15 +684,25 @@ class TabbyCommands(commands.Cog):
                 # Format pairings - show first 10 debates
                 pairings_text = ""
                 for pairing in pairings[:10]:
-                    venue = pairing.get("venue", {}).get("display_name", "TBA")
+                    # Tabbycat returns venues and teams as hyperlinks
+                    venue = pairing.get("venue")
+                    if isinstance(venue, dict):
+                        venue = venue.get("display_name")
+                    else:
+                        venue = venue_names.get(venue)
+                    venue = venue or "TBA"
 
                     # Get team names
                     teams = []
                     for team_data in pairing.get("teams", []):
-                        team_name = team_data.get("team", {}).get(
-                            "short_name", "Unknown"
+                        team = team_data.get("team")
+                        if isinstance(team, dict):
+                            team_name = team.get("short_name", "Unknown")
+                        else:
+                            team_name = team_names.get(team, "Unknown")
+                        position = team_data.get("position") or team_data.get(
+                            "side", "Unknown"
                         )
-                        position = team_data.get("position", "Unknown")
                         teams.append(f"{team_name} ({position})")
 
                     if teams:
@@ -644,7 +732,7 @@ class TabbyCommands(commands.Cog):
     async def _standings_logic(self, ctx, is_slash=False):
         """Shared logic for standings commands"""
         try:
-            tournament_data = self._get_tournament_data(
+            tournament_data = await self._get_tournament_data(
                 ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
             )
             if not tournament_data:
@@ -654,18 +742,16 @@ class TabbyCommands(commands.Cog):
                 )
                 return
 
-            headers = {"Authorization": f"Token {tournament_data['token']}"}
-            standings_url = f"{tournament_data['tournament']}standings"
-
-            response = requests.get(standings_url, headers=headers, timeout=10)
-
-            if response.status_code != 200:
+            try:
+                standings = await self.tabbycat.get_standings(
+                    tournament_data["tournament"], tournament_data["token"]
+                )
+            except TabbycatError as exc:
                 send_func = ctx.followup.send if is_slash else ctx.send
                 await send_func("❌ Failed to fetch standings data.")
+                logger.error("Error fetching standings: %s", exc)
                 return
 
-            standings = response.json()
-
             embed = discord.Embed(
                 title="🏆 Tournament Standings",
                 description=f"Current standings for **{tournament_data['tournament_name']}**",
@@ -697,7 +783,7 @@ class TabbyCommands(commands.Cog):
     async def _motion_logic(self, ctx, round_abbrev, is_slash=False):
         """Shared logic for motion commands"""
         try:
-            tournament_data = self._get_tournament_data(
+            tournament_data = await self._get_tournament_data(
                 ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
             )
             if not tournament_data:
@@ -707,18 +793,18 @@ class TabbyCommands(commands.Cog):
                 )
                 return
 
-            headers = {"Authorization": f"Token {tournament_data['token']}"}
-            rounds_url = f"{tournament_data['tournament']}rounds"
-
-            response = requests.get(rounds_url, headers=headers, timeout=10)
-
-            if response.status_code != 200:
+            try:
+                rounds = await self._get_rounds(tournament_data)
+                round_data = self._find_round(rounds, round_abbrev)
+                if round_data is None or not round_data.get("motions_released"):
+                    # The snapshot may predate a motion release; check live
+                    rounds = await self._get_rounds(tournament_data, live=True)
+            except TabbycatError as exc:
                 send_func = ctx.followup.send if is_slash else ctx.send
                 await send_func("❌ Failed to fetch rounds data.")
+                logger.error("Error fetching rounds: %s", exc)
                 return
 
-            rounds = response.json()
-
             for round_data in rounds:
                 if round_data["abbreviation"].lower() == round_abbrev.lower():
                     if not round_data.get("motions_released", False):
@@ -762,15 +848,36 @@ class TabbyCommands(commands.Cog):
             send_func = ctx.followup.send if is_slash else ctx.send
             await send_func(f"❌ Round **{round_abbrev}** not found.")
 
-        except (KeyError, ValueError, AttributeError, requests.RequestException) as e:
+        except (KeyError, ValueError, AttributeError, TabbycatError) as e:
             send_func = ctx.followup.send if is_slash else ctx.send
             await send_func("❌ Error fetching motion.")
             logger.error("Error in motion command: %s", e)
 
+    async def _get_rounds(self, tournament_data, live=False):
+        """Return the tournament's rounds from the synced snapshot or Tabbycat"""
+        rounds = None
+        if not live:
+            rounds = await self.store.get_snapshot(
+                tournament_data["guild_id"], "rounds"
+            )
+        if rounds is None:
+            rounds = await self.tabbycat.get_rounds(
+                tournament_data["tournament"], tournament_data["token"]
+            )
+        return sorted(rounds, key=lambda round_data: round_data.get("seq") or 0)
+
+    @staticmethod
+    def _find_round(rounds, round_abbrev):
+        """Return the round with the given abbreviation, if any"""
+        for round_data in rounds:
+            if (round_data.get("abbreviation") or "").lower() == round_abbrev.lower():
+                return round_data
+        return None
+
     async def _status_logic(self, ctx, is_slash=False):
         """Shared logic for status commands"""
         try:
-            tournament_data = self._get_tournament_data(
+            tournament_data = await self._get_tournament_data(
                 ctx.guild.id if hasattr(ctx, "guild") else ctx.guild_id
             )
             if not tournament_data:
@@ -802,6 +909,19 @@ class TabbyCommands(commands.Cog):
             )
             embed.add_field(name="🔄 Status", value="Connected", inline=True)
 
+            last_synced = (tournament_data.get("sync") or {}).get("last_synced_at")
+            embed.add_field(
+                name="🕒 Last Sync",
+                value=(
+                    discord.utils.format_dt(
+                        last_synced.replace(tzinfo=timezone.utc), "R"
+                    )
+                    if last_synced
+                    else "Pending"
+                ),
+                inline=True,
+            )
+
             send_func = ctx.followup.send if is_slash else ctx.send
             await send_func(embed=embed)
 
@@ -3,10 +3,11 @@ Timer Commands - Restored Original Functionality from pybot.py
 Author: aldinn
 Email: kferdoush617@gmail.com
 
-Full restoration of the original pybot.py timer system
+Full restoration of the original pybot.py timer system. Countdowns are
+driven by the shared timer scheduler; this cog only renders the events it
+fires.
 """
 
-import asyncio
 import logging
 import time
 
@@ -14,35 +15,421 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from src.utils.timer import MILESTONES, ScheduledTimer
+from src.utils.timer_render import FINISH_GIF, TimerRenderer
+
 logger = logging.getLogger(__name__)
 
+MILESTONE_MESSAGES = {
+    300: {
+        "en": ":yellow_circle: **5 minutes LEFT** {}",
+        "fr": ":yellow_circle: **5 minutes RESTANTES** {}",
+    },
+    180: {
+        "en": ":orange_circle: **3 minutes LEFT** {}",
+        "fr": ":orange_circle: **3 minutes RESTANTES** {}",
+    },
+    60: {
+        "en": ":orange_circle: **1 minute LEFT** {}",
+        "fr": ":orange_circle: **1 minute RESTANTE** {}",
+    },
+    30: {
+        "en": ":red_circle: **30 seconds LEFT** {}",
+        "fr": ":red_circle: **30 secondes RESTANTES** {}",
+    },
+}
+
+END_MESSAGES = {
+    "en": ":red_circle: **Time's UP!** {} 🎉\n" + FINISH_GIF,
+    "fr": ":red_circle: **Le temps est ÉCOULÉ!** {} 🎉\n" + FINISH_GIF,
+}
+
+STOP_MESSAGES = {
+    "en": "⏹️ **Timer stopped by {}!**",
+    "fr": "⏹️ **Chronomètre arrêté par {}!**",
+}
+
+ADD_MESSAGES = {
+    "en": "⏰ Added 1 minute to timer! ⏱️",
+    "fr": "⏰ 1 minute ajoutée au chronomètre! ⏱️",
+}
+
+SYNTAX_ERROR_MESSAGES = {
+    "en": (
+        "*Syntax error*\n*The command should contain minutes and seconds "
+        "in format* **Nm Ns**\nFor example: ***7m 15s, 0m 30s***"
+    ),
+    "fr": (
+        "*Erreur de syntaxe*\n*La commande doit contenir le nombre de minutes "
+        "et de secondes selon le format* **Nm Ns**\nPar exemple : ***7m 15s, 0m 30s***"
+    ),
+}
+
+
+def _milestone_message(seconds: int, lang: str) -> str:
+    """Return the notification template for a milestone"""
+    if seconds in MILESTONE_MESSAGES:
+        messages = MILESTONE_MESSAGES[seconds]
+    else:
+        messages = {
+            "en": f":rotating_light: **{seconds} seconds LEFT** {{}}",
+            "fr": f":rotating_light: **{seconds} secondes RESTANTES** {{}}",
+        }
+    return messages.get(lang, messages["en"])
+
+
+def _channel_mention(channel) -> str:
+    """Get a channel mention safely"""
+    if channel is None:
+        return "DM"
+    try:
+        if isinstance(
+            channel,
+            (
+                discord.TextChannel,
+                discord.VoiceChannel,
+                discord.ForumChannel,
+                discord.CategoryChannel,
+            ),
+        ):
+            return channel.mention
+        return str(channel)
+    except (AttributeError, TypeError):
+        return "DM"
+
+
+class TimerView(discord.ui.View):
+    """
+    Interactive view for timer controls.
+
+    The view never times out and its buttons have fixed custom IDs, so it
+    can be re-attached to a timer message after a restart.
+    """
+
+    def __init__(self, cog: "Timer", timer_id: str, owner_id: int, lang: str):
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.timer_id = timer_id
+        self.owner_id = owner_id
+        self.lang = lang
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the timer owner may use the buttons."""
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message(
+                "🚫 Only the timer owner can control this timer.",
+                ephemeral=True,
+            )
+            return False
+        return True
+
+    def show_paused(self, paused: bool):
+        """Switch the pause button between Pause and Resume."""
+        button = self.pause_button
+        if paused:
+            button.label = "Resume"
+            button.style = discord.ButtonStyle.success
+            button.emoji = "▶️"
+        else:
+            button.label = "Pause"
+            button.style = discord.ButtonStyle.secondary
+            button.emoji = "⏸️"
+
+    @discord.ui.button(
+        label="Pause",
+        style=discord.ButtonStyle.secondary,
+        emoji="⏸️",
+        custom_id="timer:pause",
+    )
+    async def pause_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):  # pylint: disable=unused-argument
+        """Handle pause/resume button clicks."""
+        timer = self.cog.pause_timer(self.timer_id) or self.cog.resume_timer(
+            self.timer_id
+        )
+        if timer is None:
+            await interaction.response.send_message(
+                "❌ No timer to pause/resume.", ephemeral=True
+            )
+            return
+
+        # The message itself is updated through the edit coalescer
+        await interaction.response.defer()
+
+    @discord.ui.button(
+        label="Stop",
+        style=discord.ButtonStyle.danger,
+        emoji="⏹️",
+        custom_id="timer:stop",
+    )
+    async def stop_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):  # pylint: disable=unused-argument
+        """Handle stop button clicks."""
+        if self.cog.stop_timer(self.timer_id) is None:
+            await interaction.response.send_message(
+                "❌ No timer to stop.", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer()
+        try:
+            await interaction.channel.send(
+                STOP_MESSAGES.get(self.lang, STOP_MESSAGES["en"]).format(
+                    interaction.user.mention
+                )
+            )
+        except (discord.HTTPException, AttributeError):
+            pass
+
+    @discord.ui.button(
+        label="Add 1min",
+        style=discord.ButtonStyle.success,
+        emoji="➕",
+        custom_id="timer:add",
+    )
+    async def add_time_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):  # pylint: disable=unused-argument
+        """Handle add time button clicks."""
+        if self.cog.scheduler.extend(self.timer_id, 60) is None:
+            await interaction.response.send_message(
+                "❌ Timer is not running.", ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            ADD_MESSAGES.get(self.lang, ADD_MESSAGES["en"]), ephemeral=True
+        )
+
+    @discord.ui.button(
+        label="Notify Me",
+        style=discord.ButtonStyle.primary,
+        emoji="🔔",
+        custom_id="timer:notify",
+    )
+    async def notify_button(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):  # pylint: disable=unused-argument
+        """Handle notify button clicks."""
+        if self.cog.scheduler.get(self.timer_id) is None:
+            await interaction.response.send_message(
+                "❌ Timer is not running.", ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            "🔔 You'll be notified when the timer finishes!", ephemeral=True
+        )
+
 
 class Timer(commands.Cog):
     """Timer commands with original pybot.py functionality"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.l = {}  # timer trigger library - format: {user_id_channel_id: status}
-        self.t = {}  # reminder storage library
-        self.active_timers = (
-            {}
-            # track active timer messages - format: {user_id_channel_id: message_obj}
+        self.scheduler = bot.timer_manager
+        self.display = bot.edit_coalescer
+        bot.guild_settings.subscribe("language", self._on_language_change)
+
+    async def cog_unload(self):
+        """Stop listening for settings changes"""
+        self.bot.guild_settings.unsubscribe("language", self._on_language_change)
+
+    def _on_language_change(self, guild_id: int, document):
+        """Switch running timers of a guild to its new language"""
+        if document is None:
+            return  # only evicted; the language itself did not change
+        lang = document.get("ln", "en")
+        for timer in self.scheduler.active_timers.values():
+            if timer.guild_id == guild_id:
+                timer.lang = lang
+                if timer.view is not None:
+                    timer.view.lang = lang
+
+    # ========================================
+    # SCHEDULER EVENTS
+    # ========================================
+
+    def on_tick(self, timer: ScheduledTimer, seconds_left: int):
+        """Push the current display state to the edit coalescer"""
+        self._show(timer, seconds_left=seconds_left)
+
+    def _show(self, timer: ScheduledTimer, seconds_left=None, force=False):
+        """Queue an edit showing the timer's live embed and buttons"""
+        if timer.message is None:
+            return
+
+        def render():
+            # Rendered when the edit is sent, so it reflects the latest state
+            embed = timer.renderer.render(
+                timer.seconds_left(), timer.progress(), timer.paused
+            )
+            if embed is None and not force:
+                return None  # nothing visible changed since the last edit
+            return {"embed": timer.renderer.embed, "view": timer.view}
+
+        self.display.submit(
+            timer.message,
+            render,
+            seconds_left=seconds_left,
+            force=force,
+            on_gone=lambda: self._forget(timer),
+            guild_id=timer.guild_id,
         )
 
-    async def get_language(self, guild_id):
-        """Get language setting for a guild"""
+    def _forget(self, timer: ScheduledTimer):
+        """Drop a timer whose message was deleted"""
+        self.scheduler.cancel(timer.key)
+        if timer.view:
+            timer.view.stop()
+
+    async def on_milestone(self, timer: ScheduledTimer, seconds_left: int):
+        """Announce a milestone in the timer's channel"""
+        if timer.message is None:
+            return
         try:
-            if self.bot.database:
-                if not await self.bot.database.ensure_connected():
-                    return "en"
-                collection = await self.bot.database.get_collection("language")
-                if collection:
-                    find = await collection.find_one({"_id": str(guild_id)})
-                    if find:
-                        return find.get("ln", "en")
-        except (AttributeError, KeyError, TypeError) as e:
-            logger.error("Error getting language: %s", e)
-        return "en"
+            await timer.message.channel.send(
+                _milestone_message(seconds_left, timer.lang).format(timer.owner_mention)
+            )
+        except discord.HTTPException:
+            pass
+
+    async def on_finish(self, timer: ScheduledTimer):
+        """Show the final embed and announce the end of the timer"""
+        if timer.message is None:
+            return
+        if timer.view:
+            # Disable all buttons by clearing the view
+            timer.view.clear_items()
+            timer.view.stop()
+
+        final_embed = timer.renderer.final_embed()
+        self.display.submit(
+            timer.message,
+            lambda: {"embed": final_embed, "view": timer.view},
+            force=True,
+        )
+        self.display.release(timer.message.id)
+        try:
+            await timer.message.channel.send(
+                END_MESSAGES.get(timer.lang, END_MESSAGES["en"]).format(
+                    timer.owner_mention
+                )
+            )
+        except discord.HTTPException:
+            pass
+
+    # ========================================
+    # TIMER CONTROL
+    # ========================================
+
+    def _create_timer(
+        self, guild, channel, user, total_seconds, lang
+    ) -> ScheduledTimer:
+        """Create a timer and its control view"""
+        timer_id = self.scheduler.create_timer_key(user.id, channel.id)
+        timer = ScheduledTimer(
+            timer_id,
+            guild.id if guild else None,
+            channel.id,
+            user.id,
+            total_seconds,
+            handler=self,
+            lang=lang,
+            owner_mention=user.mention,
+            channel_mention=_channel_mention(channel),
+        )
+        timer.renderer = TimerRenderer(timer.owner_mention, timer.channel_mention)
+        timer.view = TimerView(self, timer_id, user.id, lang)
+        return timer
+
+    async def restore_timers(self) -> int:
+        """Resume timers checkpointed before the last restart"""
+        documents = await self.bot.timer_store.load_all()
+        restored = 0
+
+        for doc in documents:
+            if doc["_id"] in self.scheduler.active_timers:
+                # Already running (e.g. the cog was reloaded); keep its checkpoint
+                continue
+            message_id = doc.get("message_id")
+            if message_id is None:
+                self.bot.timer_store.remove(doc["_id"])
+                continue
+
+            paused_remaining = doc.get("paused_remaining")
+            if paused_remaining is None:
+                remaining = max(0.0, (doc.get("ends_at") or 0) - time.time())
+            else:
+                remaining = paused_remaining
+
+            timer = ScheduledTimer(
+                doc["_id"],
+                doc.get("guild_id"),
+                doc["channel_id"],
+                doc["user_id"],
+                doc["duration"],
+                handler=self,
+                lang=doc.get("lang", "en"),
+                owner_mention=doc.get("owner_mention", f"<@{doc['user_id']}>"),
+                channel_mention=doc.get("channel_mention", f"<#{doc['channel_id']}>"),
+            )
+            timer.deadline = time.monotonic() + remaining
+            timer.paused_remaining = paused_remaining
+            # Marks passed while the bot was down are not announced late
+            timer.fired = {mark for mark in MILESTONES if mark > remaining}
+
+            channel = self.bot.get_partial_messageable(
+                doc["channel_id"], guild_id=doc.get("guild_id")
+            )
+            timer.message = channel.get_partial_message(message_id)
+            timer.renderer = TimerRenderer(timer.owner_mention, timer.channel_mention)
+            timer.view = TimerView(self, timer.key, timer.user_id, timer.lang)
+            timer.view.show_paused(timer.paused)
+            self.bot.add_view(timer.view, message_id=message_id)
+
+            # Timers that ran out during the downtime finish straight away
+            self.scheduler.add(timer, checkpoint=False)
+            restored += 1
+
+        if restored:
+            logger.info("⏱️ Restored %d timer(s) from checkpoints", restored)
+        return restored
+
+    def pause_timer(self, timer_id: str):
+        """Pause a timer and refresh its display"""
+        timer = self.scheduler.pause(timer_id)
+        if timer:
+            self._refresh_controls(timer)
+        return timer
+
+    def resume_timer(self, timer_id: str):
+        """Resume a timer and refresh its display"""
+        timer = self.scheduler.resume(timer_id)
+        if timer:
+            self._refresh_controls(timer)
+        return timer
+
+    def _refresh_controls(self, timer: ScheduledTimer):
+        """Sync the pause button and embed after the state changed"""
+        if timer.view:
+            timer.view.show_paused(timer.paused)
+        self._show(timer, force=True)
+
+    def stop_timer(self, timer_id: str):
+        """Stop a timer and disable its buttons"""
+        timer = self.scheduler.cancel(timer_id)
+        if timer and timer.view:
+            timer.view.clear_items()
+            timer.view.stop()
+            if timer.message is not None:
+                self.display.submit(
+                    timer.message, lambda: {"view": timer.view}, force=True
+                )
+                self.display.release(timer.message.id)
+        return timer
 
     @commands.command(aliases=["time"])
     async def currenttime(self, ctx):
@@ -53,20 +440,10 @@ class Timer(commands.Cog):
     @commands.command(aliases=["timekeep", "t", "chrono"])
     async def timer(self, ctx, duration, seconds="0s"):
         """Set a visual timer with interactive buttons - Original pybot.py functionality"""
-        lang = await self.get_language(ctx.guild.id)
+        lang = await self.bot.get_language(ctx.guild.id)
 
         if not (duration.endswith("m") and seconds.endswith("s")):
-            error_messages = {
-                "en": (
-                    "*Syntax error*\n*The command should contain minutes and seconds "
-                    "in format* **Nm Ns**\nFor example: ***7m 15s, 0m 30s***"
-                ),
-                "fr": (
-                    "*Erreur de syntaxe*\n*La commande doit contenir le nombre de minutes "
-                    "et de secondes selon le format* **Nm Ns**\nPar exemple : ***7m 15s, 0m 30s***"
-                ),
-            }
-            await ctx.send(error_messages.get(lang, error_messages["en"]))
+            await ctx.send(SYNTAX_ERROR_MESSAGES.get(lang, SYNTAX_ERROR_MESSAGES["en"]))
             return
 
         try:
@@ -82,11 +459,8 @@ class Timer(commands.Cog):
                 await ctx.send("Timer cannot exceed 2 hours.")
                 return
 
-            # Create unique timer ID
-            timer_id = f"{ctx.author.id}_{ctx.channel.id}"
-
             # Check if user already has a timer in this channel
-            if timer_id in self.l:
+            if self.scheduler.is_timer_active(ctx.author.id, ctx.channel.id):
                 conflict_messages = {
                     "en": (
                         f"{ctx.author.mention}, you already have a timer running in this channel. "
@@ -100,374 +474,26 @@ class Timer(commands.Cog):
                 await ctx.send(conflict_messages.get(lang, conflict_messages["en"]))
                 return
 
-            # Clean up any existing timer messages for this user/channel
-            if timer_id in self.active_timers:
-                try:
-                    await self.active_timers[timer_id].delete()
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-                del self.active_timers[timer_id]
-
-            self.l[timer_id] = 0  # 0 = running, 1 = stopped, 2 = paused
-
-            # Create interactive buttons
-            class TimerView(discord.ui.View):
-                """Interactive view for timer controls."""
-
-                def __init__(self):
-                    super().__init__(timeout=total_seconds + 30)
-
-                @discord.ui.button(
-                    label="Pause", style=discord.ButtonStyle.secondary, emoji="⏸️"
-                )
-                async def pause_button(
-                    self, interaction: discord.Interaction, button: discord.ui.Button
-                ):  # pylint: disable=unused-argument
-                    """Handle pause/resume button clicks."""
-                    if interaction.user.id != ctx.author.id:
-                        await interaction.response.send_message(
-                            "🚫 Only the timer owner can control this timer.",
-                            ephemeral=True,
-                        )
-                        return
-
-                    if timer_id in outer_self.l and outer_self.l[timer_id] == 0:
-                        outer_self.l[timer_id] = 2
-                        button.label = "Resume"
-                        button.style = discord.ButtonStyle.success
-                        button.emoji = "▶️"
-                        await interaction.response.edit_message(view=self)
-                    elif timer_id in outer_self.l and outer_self.l[timer_id] == 2:
-                        outer_self.l[timer_id] = 0
-                        button.label = "Pause"
-                        button.style = discord.ButtonStyle.secondary
-                        button.emoji = "⏸️"
-                        await interaction.response.edit_message(view=self)
-                    else:
-                        await interaction.response.send_message(
-                            "❌ No timer to pause/resume.", ephemeral=True
-                        )
-
-                @discord.ui.button(
-                    label="Stop", style=discord.ButtonStyle.danger, emoji="⏹️"
-                )
-                async def stop_button(
-                    self, interaction: discord.Interaction, button: discord.ui.Button
-                ):  # pylint: disable=unused-argument
-                    """Handle stop button clicks."""
-                    if interaction.user.id != ctx.author.id:
-                        await interaction.response.send_message(
-                            "🚫 Only the timer owner can control this timer.",
-                            ephemeral=True,
-                        )
-                        return
-
-                    if timer_id in outer_self.l:
-                        outer_self.l[timer_id] = 1
-                        # Disable all buttons by clearing view
-                        self.clear_items()
-                        await interaction.response.edit_message(view=self)
-                    else:
-                        await interaction.response.send_message(
-                            "❌ No timer to stop.", ephemeral=True
-                        )
-
-                @discord.ui.button(
-                    label="Add 1min", style=discord.ButtonStyle.success, emoji="➕"
-                )
-                async def add_time_button(
-                    self, interaction: discord.Interaction, button: discord.ui.Button
-                ):  # pylint: disable=unused-argument
-                    """Handle add time button clicks."""
-                    if interaction.user.id != ctx.author.id:
-                        await interaction.response.send_message(
-                            "🚫 Only the timer owner can control this timer.",
-                            ephemeral=True,
-                        )
-                        return
-
-                    nonlocal total_seconds
-                    if timer_id in outer_self.l and outer_self.l[timer_id] != 1:
-                        total_seconds += 60
-                        add_messages = {
-                            "en": "⏰ Added 1 minute to timer! ⏱️",
-                            "fr": "⏰ 1 minute ajoutée au chronomètre! ⏱️",
-                        }
-                        await interaction.response.send_message(
-                            add_messages.get(lang, add_messages["en"]), ephemeral=True
-                        )
-                    else:
-                        await interaction.response.send_message(
-                            "❌ Timer is not running.", ephemeral=True
-                        )
-
-                @discord.ui.button(
-                    label="Notify Me", style=discord.ButtonStyle.primary, emoji="🔔"
-                )
-                async def notify_button(
-                    self, interaction: discord.Interaction, button: discord.ui.Button
-                ):  # pylint: disable=unused-argument
-                    """Handle notify button clicks."""
-                    if interaction.user.id != ctx.author.id:
-                        await interaction.response.send_message(
-                            "🚫 Only the timer owner can control this timer.",
-                            ephemeral=True,
-                        )
-                        return
-
-                    if timer_id in outer_self.l and outer_self.l[timer_id] != 1:
-                        await interaction.response.send_message(
-                            "🔔 You'll be notified when the timer finishes!",
-                            ephemeral=True,
-                        )
-                    else:
-                        await interaction.response.send_message(
-                            "❌ Timer is not running.", ephemeral=True
-                        )
-
-            outer_self = self
-            view = TimerView()
-
-            # Send only ONE timer message with buttons
-            timer_embed = discord.Embed(
-                title="⏰ Interactive Timer Started!",
-                description=f"```\n⏱️  {minutes:02d}:{secs:02d}  ⏱️\n```",
-                color=0x00FF00,
+            timer = self._create_timer(
+                ctx.guild, ctx.channel, ctx.author, total_seconds, lang
             )
-            timer_embed.add_field(
-                name="👤 Timer Owner", value=ctx.author.mention, inline=True
+            timer.message = await ctx.send(
+                embed=timer.renderer.start_embed(timer.seconds_left()), view=timer.view
             )
-            timer_embed.add_field(name="🎯 Status", value="🟢 **RUNNING**", inline=True)
-            timer_embed.add_field(
-                name="📍 Channel", value=ctx.channel.mention, inline=True
-            )
-            timer_embed.set_footer(text="Use the buttons below to control your timer!")
-            timer_embed.set_thumbnail(
-                url="https://cdn.discordapp.com/emojis/755774680633016380.gif"
-            )
-
-            msg = await ctx.send(embed=timer_embed, view=view)
-            self.active_timers[timer_id] = msg
-
-            # Animated timer countdown with rate limit protection
-            last_update = 0
-            while total_seconds > 0:
-                if timer_id not in self.l:
-                    break
-
-                if self.l[timer_id] == 1:  # Stop
-                    stop_messages = {
-                        "en": f"⏹️ **Timer stopped by {ctx.author.mention}!**",
-                        "fr": f"⏹️ **Chronomètre arrêté par {ctx.author.mention}!**",
-                    }
-                    await ctx.send(stop_messages.get(lang, stop_messages["en"]))
-                    del self.l[timer_id]
-                    if timer_id in self.active_timers:
-                        del self.active_timers[timer_id]
-                    break
-
-                elif self.l[timer_id] == 2:  # Pause
-                    pause_embed = discord.Embed(
-                        title="⏸️ Timer Paused",
-                        description=f"```\n⏸️  {total_seconds // 60:02d}:{total_seconds % 60:02d}  ⏸️\n```",
-                        color=0x808080,
-                    )
-                    pause_embed.add_field(
-                        name="👤 Timer Owner", value=ctx.author.mention, inline=True
-                    )
-                    pause_embed.add_field(
-                        name="🎯 Status", value="⏸️ **PAUSED**", inline=True
-                    )
-                    pause_embed.add_field(
-                        name="📍 Channel", value=ctx.channel.mention, inline=True
-                    )
-                    pause_embed.set_footer(text="Click Resume to continue the timer!")
-
-                    try:
-                        await msg.edit(embed=pause_embed, view=view)
-                    except (discord.NotFound, discord.HTTPException):
-                        pass
-                    while self.l.get(timer_id, 1) == 2:
-                        await asyncio.sleep(1)
-                    continue
-
-                # Update timer display with rate limit protection (every second for real-time updates)
-                current_time = time.time()
-                should_update = (
-                    current_time - last_update >= 1  # Every second for real-time
-                    or total_seconds <= 10  # Last 10 seconds
-                    or total_seconds % 60 == 0  # Every minute
-                    # Important milestones
-                    or total_seconds in [300, 180, 60, 30]
-                )
-
-                if should_update:
-                    # Dynamic colors based on time remaining
-                    if total_seconds > 300:  # > 5 minutes
-                        color = 0x00FF00  # Green
-                        status_emoji = "🟢"
-                        status_text = "RUNNING"
-                    elif total_seconds > 60:  # 1-5 minutes
-                        color = 0xFFFF00  # Yellow
-                        status_emoji = "🟡"
-                        status_text = "RUNNING"
-                    elif total_seconds > 30:  # 30s-1min
-                        color = 0xFF8800  # Orange
-                        status_emoji = "🟠"
-                        status_text = "HURRY UP!"
-                    else:  # < 30 seconds
-                        color = 0xFF0000  # Red
-                        status_emoji = "🔴"
-                        status_text = "FINAL COUNTDOWN!"
-
-                    # Create simple single-line progress bar
-                    total_time = minutes * 60 + secs
-                    progress = max(0, (total_time - total_seconds) / total_time)
-
-                    # Single line progress bar (20 characters for clean display)
-                    bar_length = 20
-                    filled_blocks = int(progress * bar_length)
-                    empty_blocks = bar_length - filled_blocks
-
-                    # Simple progress bar with single character
-                    progress_bar = "█" * filled_blocks + "░" * empty_blocks
-
-                    timer_embed = discord.Embed(
-                        title="⏰ Interactive Timer",
-                        description=f"```\n⏱️  {total_seconds // 60:02d}:{total_seconds % 60:02d}  ⏱️\n```",
-                        color=color,
-                    )
-                    timer_embed.add_field(
-                        name="👤 Timer Owner", value=ctx.author.mention, inline=True
-                    )
-                    timer_embed.add_field(
-                        name="🎯 Status",
-                        value=f"{status_emoji} **{status_text}**",
-                        inline=True,
-                    )
-                    timer_embed.add_field(
-                        name="📍 Channel", value=ctx.channel.mention, inline=True
-                    )
-                    timer_embed.add_field(
-                        name="📊 Progress", value=f"{progress_bar}", inline=False
-                    )
-
-                    if total_seconds <= 30:
-                        timer_embed.set_footer(text="⚡ Time is running out! ⚡")
-                        timer_embed.set_thumbnail(
-                            url="https://cdn.discordapp.com/emojis/755774680633016380.gif"
-                        )
-                    else:
-                        timer_embed.set_footer(
-                            text="Use the buttons below to control your timer!"
-                        )
-
-                    try:
-                        await msg.edit(embed=timer_embed, view=view)
-                        last_update = current_time
-                    except (discord.NotFound, discord.HTTPException):
-                        pass
-
-                # Check for milestone notifications
-                if total_seconds in [300, 180, 60, 30, 10, 5, 3, 2, 1]:
-                    milestone_messages = {}
-                    if total_seconds == 300:
-                        milestone_messages = {
-                            "en": ":yellow_circle: **5 minutes LEFT** {}",
-                            "fr": ":yellow_circle: **5 minutes RESTANTES** {}",
-                        }
-                    elif total_seconds == 180:
-                        milestone_messages = {
-                            "en": ":orange_circle: **3 minutes LEFT** {}",
-                            "fr": ":orange_circle: **3 minutes RESTANTES** {}",
-                        }
-                    elif total_seconds == 60:
-                        milestone_messages = {
-                            "en": ":orange_circle: **1 minute LEFT** {}",
-                            "fr": ":orange_circle: **1 minute RESTANTE** {}",
-                        }
-                    elif total_seconds == 30:
-                        milestone_messages = {
-                            "en": ":red_circle: **30 seconds LEFT** {}",
-                            "fr": ":red_circle: **30 secondes RESTANTES** {}",
-                        }
-                    elif total_seconds <= 10:
-                        milestone_messages = {
-                            "en": f":rotating_light: **{total_seconds} seconds LEFT** {{}}",
-                            "fr": f":rotating_light: **{total_seconds} secondes RESTANTES** {{}}",
-                        }
-
-                    if milestone_messages:
-                        try:
-                            await ctx.send(
-                                milestone_messages[lang].format(ctx.author.mention)
-                            )
-                        except (discord.HTTPException, KeyError):
-                            pass
-
-                await asyncio.sleep(1)
-                total_seconds -= 1
-
-            if total_seconds <= 0 and timer_id in self.l:
-                # Disable all buttons by clearing the view
-                view.clear_items()
-
-                end_messages = {
-                    "en": ":red_circle: **Time's UP!** {} 🎉\nhttps://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683",
-                    "fr": ":red_circle: **Le temps est ÉCOULÉ!** {} 🎉\nhttps://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683",
-                }
-
-                try:
-                    final_embed = discord.Embed(
-                        title="🎉 Timer Completed!",
-                        description="```\n🚨  00:00  🚨\n```",
-                        color=0xFF0000,
-                    )
-                    final_embed.add_field(
-                        name="👤 Timer Owner", value=ctx.author.mention, inline=True
-                    )
-                    final_embed.add_field(
-                        name="🎯 Status", value="✅ **FINISHED!**", inline=True
-                    )
-                    final_embed.add_field(
-                        name="📍 Channel", value=ctx.channel.mention, inline=True
-                    )
-                    final_embed.add_field(
-                        name="🎊 Result", value="**TIME'S UP!** 🎉", inline=False
-                    )
-                    final_embed.set_footer(text="Timer completed successfully!")
-                    final_embed.set_image(
-                        url="https://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683.gif"
-                    )
-
-                    await msg.edit(embed=final_embed, view=view)
-                    await ctx.send(end_messages[lang].format(ctx.author.mention))
-                except (discord.HTTPException, KeyError):
-                    pass
-
-                # Clean up
-                if timer_id in self.l:
-                    del self.l[timer_id]
-                if timer_id in self.active_timers:
-                    del self.active_timers[timer_id]
+            self.scheduler.add(timer)
 
         except ValueError:
-            error_messages = {
-                "en": "*Syntax error*\n*The command should contain minutes and seconds in format* **Nm Ns**\nFor example: ***7m 15s, 0m 30s***",
-                "fr": "*Erreur de syntaxe*\n*La commande doit contenir le nombre de minutes et de secondes selon le format* **Nm Ns**\nPar exemple : ***7m 15s, 0m 30s***",
-            }
-            await ctx.send(error_messages.get(lang, error_messages["en"]))
-        except (discord.HTTPException, asyncio.TimeoutError) as e:
+            await ctx.send(SYNTAX_ERROR_MESSAGES.get(lang, SYNTAX_ERROR_MESSAGES["en"]))
+        except discord.HTTPException as e:
             logger.error("Timer error: %s", e)
             await ctx.send("❌ An error occurred while setting up the timer.")
 
     @commands.command()
     async def stop(self, ctx):
         """Stop your active timer"""
-        timer_id = f"{ctx.author.id}_{ctx.channel.id}"
+        timer_id = self.scheduler.create_timer_key(ctx.author.id, ctx.channel.id)
 
-        if timer_id in self.l:
-            self.l[timer_id] = 1
+        if self.stop_timer(timer_id):
             await ctx.send(f"⏹️ Timer stopped by {ctx.author.mention}!")
         else:
             await ctx.send("❌ You don't have an active timer in this channel.")
@@ -475,12 +501,13 @@ class Timer(commands.Cog):
     @commands.command()
     async def pause(self, ctx):
         """Pause your active timer"""
-        timer_id = f"{ctx.author.id}_{ctx.channel.id}"
+        timer_id = self.scheduler.create_timer_key(ctx.author.id, ctx.channel.id)
+        timer = self.scheduler.get(timer_id)
 
-        if timer_id in self.l and self.l[timer_id] == 0:
-            self.l[timer_id] = 2
+        if timer and not timer.paused:
+            self.pause_timer(timer_id)
             await ctx.send(f"⏸️ Timer paused by {ctx.author.mention}!")
-        elif timer_id in self.l and self.l[timer_id] == 2:
+        elif timer:
             await ctx.send("⏸️ Your timer is already paused.")
         else:
             await ctx.send("❌ You don't have an active timer in this channel.")
@@ -488,16 +515,28 @@ class Timer(commands.Cog):
     @commands.command()
     async def resume(self, ctx):
         """Resume your paused timer"""
-        timer_id = f"{ctx.author.id}_{ctx.channel.id}"
+        timer_id = self.scheduler.create_timer_key(ctx.author.id, ctx.channel.id)
+        timer = self.scheduler.get(timer_id)
 
-        if timer_id in self.l and self.l[timer_id] == 2:
-            self.l[timer_id] = 0
+        if timer and timer.paused:
+            self.resume_timer(timer_id)
             await ctx.send(f"▶️ Timer resumed by {ctx.author.mention}!")
-        elif timer_id in self.l and self.l[timer_id] == 0:
+        elif timer:
             await ctx.send("⏸️ Your timer is already running.")
         else:
             await ctx.send("❌ You don't have a paused timer in this channel.")
 
+    def _reset_guild_timers(self, guild_id) -> int:
+        """Stop every timer of a guild"""
+        timer_ids = [
+            timer.key
+            for timer in self.scheduler.active_timers.values()
+            if timer.guild_id == guild_id
+        ]
+        for timer_id in timer_ids:
+            self.stop_timer(timer_id)
+        return len(timer_ids)
+
     @commands.command(aliases=["cleartimers"])
     async def resettimers(self, ctx):
         """Clear all active timers (Admin only)"""
@@ -507,10 +546,7 @@ class Timer(commands.Cog):
             )
             return
 
-        count = len(self.l)
-        self.l.clear()
-        self.active_timers.clear()
-
+        count = self._reset_guild_timers(ctx.guild.id)
         await ctx.send(f"🧹 Cleared {count} active timers.")
 
     # ========================================
@@ -547,8 +583,7 @@ class Timer(commands.Cog):
             )
             return
 
-        # Convert to expected format and call the timer logic directly
-        lang = await self.get_language(interaction.guild.id)
+        lang = await self.bot.get_language(interaction.guild.id)
         total_seconds = minutes * 60 + seconds
 
         if total_seconds > 7200:  # 2 hours limit
@@ -557,11 +592,8 @@ class Timer(commands.Cog):
             )
             return
 
-        # Create unique timer ID
-        timer_id = f"{interaction.user.id}_{interaction.channel.id}"
-
         # Check if user already has a timer in this channel
-        if timer_id in self.l:
+        if self.scheduler.is_timer_active(interaction.user.id, interaction.channel.id):
             conflict_messages = {
                 "en": f"{interaction.user.mention}, you already have a timer running in this channel. Use `/timer-stop` to stop it first.",
                 "fr": f"{interaction.user.mention}, vous avez déjà un chronomètre en cours dans ce canal. Utilisez `/timer-stop` pour l'arrêter d'abord.",
@@ -571,372 +603,18 @@ class Timer(commands.Cog):
             )
             return
 
-        # Clean up any existing timer messages for this user/channel
-        if timer_id in self.active_timers:
-            try:
-                await self.active_timers[timer_id].delete()
-            except (discord.NotFound, discord.HTTPException):
-                pass
-            del self.active_timers[timer_id]
-
-        self.l[timer_id] = 0  # 0 = running, 1 = stopped, 2 = paused
-
-        # Get channel mention safely
-        channel_mention = "DM"
-        if interaction.channel:
-            try:
-                if isinstance(interaction.channel, discord.TextChannel):
-                    channel_mention = interaction.channel.mention
-                elif isinstance(
-                    interaction.channel,
-                    (
-                        discord.VoiceChannel,
-                        discord.ForumChannel,
-                        discord.CategoryChannel,
-                    ),
-                ):
-                    channel_mention = interaction.channel.mention
-                else:
-                    channel_mention = str(interaction.channel)
-            except (AttributeError, TypeError):
-                channel_mention = "DM"
-
-        # Create interactive buttons (same as prefix command)
-        class TimerView(discord.ui.View):
-            """Interactive view for slash command timer controls."""
-
-            def __init__(self):
-                super().__init__(timeout=total_seconds + 30)
-
-            @discord.ui.button(
-                label="Pause", style=discord.ButtonStyle.secondary, emoji="⏸️"
-            )
-            async def pause_button(
-                self, button_interaction: discord.Interaction, button: discord.ui.Button
-            ):  # pylint: disable=unused-argument
-                """Handle pause/resume button clicks for slash command."""
-                if button_interaction.user.id != interaction.user.id:
-                    await button_interaction.response.send_message(
-                        "🚫 Only the timer owner can control this timer.",
-                        ephemeral=True,
-                    )
-                    return
-
-                if timer_id in outer_self.l and outer_self.l[timer_id] == 0:
-                    outer_self.l[timer_id] = 2
-                    button.label = "Resume"
-                    button.style = discord.ButtonStyle.success
-                    button.emoji = "▶️"
-                    await button_interaction.response.edit_message(view=self)
-                elif timer_id in outer_self.l and outer_self.l[timer_id] == 2:
-                    outer_self.l[timer_id] = 0
-                    button.label = "Pause"
-                    button.style = discord.ButtonStyle.secondary
-                    button.emoji = "⏸️"
-                    await button_interaction.response.edit_message(view=self)
-                else:
-                    await button_interaction.response.send_message(
-                        "❌ No timer to pause/resume.", ephemeral=True
-                    )
-
-            @discord.ui.button(
-                label="Stop", style=discord.ButtonStyle.danger, emoji="⏹️"
-            )
-            async def stop_button(
-                self, button_interaction: discord.Interaction, button: discord.ui.Button
-            ):  # pylint: disable=unused-argument
-                """Handle stop button clicks for slash command."""
-                if button_interaction.user.id != interaction.user.id:
-                    await button_interaction.response.send_message(
-                        "🚫 Only the timer owner can control this timer.",
-                        ephemeral=True,
-                    )
-                    return
-
-                if timer_id in outer_self.l:
-                    outer_self.l[timer_id] = 1
-                    self.clear_items()
-                    await button_interaction.response.edit_message(view=self)
-                else:
-                    await button_interaction.response.send_message(
-                        "❌ No timer to stop.", ephemeral=True
-                    )
-
-            @discord.ui.button(
-                label="Add 1min", style=discord.ButtonStyle.success, emoji="➕"
-            )
-            async def add_time_button(
-                self, button_interaction: discord.Interaction, button: discord.ui.Button
-            ):  # pylint: disable=unused-argument
-                """Handle add time button clicks for slash command."""
-                if button_interaction.user.id != interaction.user.id:
-                    await button_interaction.response.send_message(
-                        "🚫 Only the timer owner can control this timer.",
-                        ephemeral=True,
-                    )
-                    return
-
-                nonlocal total_seconds
-                if timer_id in outer_self.l and outer_self.l[timer_id] != 1:
-                    total_seconds += 60
-                    add_messages = {
-                        "en": "⏰ Added 1 minute to timer! ⏱️",
-                        "fr": "⏰ 1 minute ajoutée au chronomètre! ⏱️",
-                    }
-                    await button_interaction.response.send_message(
-                        add_messages.get(lang, add_messages["en"]), ephemeral=True
-                    )
-                else:
-                    await button_interaction.response.send_message(
-                        "❌ Timer is not running.", ephemeral=True
-                    )
-
-            @discord.ui.button(
-                label="Notify Me", style=discord.ButtonStyle.primary, emoji="🔔"
-            )
-            async def notify_button(
-                self, button_interaction: discord.Interaction, button: discord.ui.Button
-            ):  # pylint: disable=unused-argument
-                """Handle notify button clicks for slash command."""
-                if button_interaction.user.id != interaction.user.id:
-                    await button_interaction.response.send_message(
-                        "🚫 Only the timer owner can control this timer.",
-                        ephemeral=True,
-                    )
-                    return
-
-                if timer_id in outer_self.l and outer_self.l[timer_id] != 1:
-                    await button_interaction.response.send_message(
-                        "🔔 You'll be notified when the timer finishes!", ephemeral=True
-                    )
-                else:
-                    await button_interaction.response.send_message(
-                        "❌ Timer is not running.", ephemeral=True
-                    )
-
-        outer_self = self
-        view = TimerView()
-
-        # Send timer message with buttons
-        timer_embed = discord.Embed(
-            title="⏰ Interactive Timer Started!",
-            description=f"```\n⏱️  {minutes:02d}:{seconds:02d}  ⏱️\n```",
-            color=0x00FF00,
+        timer = self._create_timer(
+            interaction.guild,
+            interaction.channel,
+            interaction.user,
+            total_seconds,
+            lang,
         )
-        timer_embed.add_field(
-            name="👤 Timer Owner", value=interaction.user.mention, inline=True
-        )
-        timer_embed.add_field(name="🎯 Status", value="🟢 **RUNNING**", inline=True)
-        timer_embed.add_field(name="📍 Channel", value=channel_mention, inline=True)
-        timer_embed.set_footer(text="Use the buttons below to control your timer!")
-        timer_embed.set_thumbnail(
-            url="https://cdn.discordapp.com/emojis/755774680633016380.gif"
+        await interaction.response.send_message(
+            embed=timer.renderer.start_embed(timer.seconds_left()), view=timer.view
         )
-
-        await interaction.response.send_message(embed=timer_embed, view=view)
-        msg = await interaction.original_response()
-        self.active_timers[timer_id] = msg
-
-        # Start the countdown logic (same as prefix command)
-        last_update = 0
-        while total_seconds > 0:
-            if timer_id not in self.l:
-                break
-
-            if self.l[timer_id] == 1:  # Stop
-                stop_messages = {
-                    "en": f"⏹️ **Timer stopped by {interaction.user.mention}!**",
-                    "fr": f"⏹️ **Chronomètre arrêté par {interaction.user.mention}!**",
-                }
-                await interaction.followup.send(
-                    stop_messages.get(lang, stop_messages["en"])
-                )
-                del self.l[timer_id]
-                if timer_id in self.active_timers:
-                    del self.active_timers[timer_id]
-                break
-
-            elif self.l[timer_id] == 2:  # Pause
-                pause_embed = discord.Embed(
-                    title="⏸️ Timer Paused",
-                    description=f"```\n⏸️  {total_seconds // 60:02d}:{total_seconds % 60:02d}  ⏸️\n```",
-                    color=0x808080,
-                )
-                pause_embed.add_field(
-                    name="👤 Timer Owner", value=interaction.user.mention, inline=True
-                )
-                pause_embed.add_field(
-                    name="🎯 Status", value="⏸️ **PAUSED**", inline=True
-                )
-                pause_embed.add_field(
-                    name="📍 Channel", value=channel_mention, inline=True
-                )
-                pause_embed.set_footer(text="Click Resume to continue the timer!")
-
-                try:
-                    await msg.edit(embed=pause_embed, view=view)
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-                while self.l.get(timer_id, 1) == 2:
-                    await asyncio.sleep(1)
-                continue
-
-            # Update timer display (same logic as prefix command)
-            current_time = time.time()
-            should_update = (
-                current_time - last_update >= 1
-                or total_seconds <= 10
-                or total_seconds % 60 == 0
-                or total_seconds in [300, 180, 60, 30]
-            )
-
-            if should_update:
-                # Dynamic colors based on time remaining
-                if total_seconds > 300:
-                    color = 0x00FF00
-                    status_emoji = "🟢"
-                    status_text = "RUNNING"
-                elif total_seconds > 60:
-                    color = 0xFFFF00
-                    status_emoji = "🟡"
-                    status_text = "RUNNING"
-                elif total_seconds > 30:
-                    color = 0xFF8800
-                    status_emoji = "🟠"
-                    status_text = "HURRY UP!"
-                else:
-                    color = 0xFF0000
-                    status_emoji = "🔴"
-                    status_text = "FINAL COUNTDOWN!"
-
-                # Progress bar
-                total_time = minutes * 60 + seconds
-                progress = max(0, (total_time - total_seconds) / total_time)
-                bar_length = 20
-                filled_blocks = int(progress * bar_length)
-                empty_blocks = bar_length - filled_blocks
-                progress_bar = "█" * filled_blocks + "░" * empty_blocks
-
-                timer_embed = discord.Embed(
-                    title="⏰ Interactive Timer",
-                    description=f"```\n⏱️  {total_seconds // 60:02d}:{total_seconds % 60:02d}  ⏱️\n```",
-                    color=color,
-                )
-                timer_embed.add_field(
-                    name="👤 Timer Owner", value=interaction.user.mention, inline=True
-                )
-                timer_embed.add_field(
-                    name="🎯 Status",
-                    value=f"{status_emoji} **{status_text}**",
-                    inline=True,
-                )
-                timer_embed.add_field(
-                    name="📍 Channel", value=channel_mention, inline=True
-                )
-                timer_embed.add_field(
-                    name="📊 Progress", value=f"{progress_bar}", inline=False
-                )
-
-                if total_seconds <= 30:
-                    timer_embed.set_footer(text="⚡ Time is running out! ⚡")
-                    timer_embed.set_thumbnail(
-                        url="https://cdn.discordapp.com/emojis/755774680633016380.gif"
-                    )
-                else:
-                    timer_embed.set_footer(
-                        text="Use the buttons below to control your timer!"
-                    )
-
-                try:
-                    await msg.edit(embed=timer_embed, view=view)
-                    last_update = current_time
-                except (discord.NotFound, discord.HTTPException):
-                    pass
-
-            # Milestone notifications
-            if total_seconds in [300, 180, 60, 30, 10, 5, 3, 2, 1]:
-                milestone_messages = {}
-                if total_seconds == 300:
-                    milestone_messages = {
-                        "en": ":yellow_circle: **5 minutes LEFT** {}",
-                        "fr": ":yellow_circle: **5 minutes RESTANTES** {}",
-                    }
-                elif total_seconds == 180:
-                    milestone_messages = {
-                        "en": ":orange_circle: **3 minutes LEFT** {}",
-                        "fr": ":orange_circle: **3 minutes RESTANTES** {}",
-                    }
-                elif total_seconds == 60:
-                    milestone_messages = {
-                        "en": ":orange_circle: **1 minute LEFT** {}",
-                        "fr": ":orange_circle: **1 minute RESTANTE** {}",
-                    }
-                elif total_seconds == 30:
-                    milestone_messages = {
-                        "en": ":red_circle: **30 seconds LEFT** {}",
-                        "fr": ":red_circle: **30 secondes RESTANTES** {}",
-                    }
-                elif total_seconds <= 10:
-                    milestone_messages = {
-                        "en": f":rotating_light: **{total_seconds} seconds LEFT** {{}}",
-                        "fr": f":rotating_light: **{total_seconds} secondes RESTANTES** {{}}",
-                    }
-
-                if milestone_messages:
-                    try:
-                        await interaction.followup.send(
-                            milestone_messages[lang].format(interaction.user.mention)
-                        )
-                    except (discord.HTTPException, KeyError):
-                        pass
-
-            await asyncio.sleep(1)
-            total_seconds -= 1
-
-        # Timer completion
-        if total_seconds <= 0 and timer_id in self.l:
-            view.clear_items()
-
-            end_messages = {
-                "en": ":red_circle: **Time's UP!** {} 🎉\nhttps://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683",
-                "fr": ":red_circle: **Le temps est ÉCOULÉ!** {} 🎉\nhttps://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683",
-            }
-
-            try:
-                final_embed = discord.Embed(
-                    title="🎉 Timer Completed!",
-                    description="```\n🚨  00:00  🚨\n```",
-                    color=0xFF0000,
-                )
-                final_embed.add_field(
-                    name="👤 Timer Owner", value=interaction.user.mention, inline=True
-                )
-                final_embed.add_field(
-                    name="🎯 Status", value="✅ **FINISHED!**", inline=True
-                )
-                final_embed.add_field(
-                    name="📍 Channel", value=channel_mention, inline=True
-                )
-                final_embed.add_field(
-                    name="🎊 Result", value="**TIME'S UP!** 🎉", inline=False
-                )
-                final_embed.set_footer(text="Timer completed successfully!")
-                final_embed.set_image(
-                    url="https://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683.gif"
-                )
-
-                await msg.edit(embed=final_embed, view=view)
-                await interaction.followup.send(
-                    end_messages[lang].format(interaction.user.mention)
-                )
-            except (discord.HTTPException, KeyError):
-                pass
-
-            # Clean up
-            if timer_id in self.l:
-                del self.l[timer_id]
-            if timer_id in self.active_timers:
-                del self.active_timers[timer_id]
+        timer.message = await interaction.original_response()
+        self.scheduler.add(timer)
 
     @app_commands.command(name="currenttime", description="Get current Unix timestamp")
     async def currenttime_slash(self, interaction: discord.Interaction):
@@ -955,10 +633,11 @@ class Timer(commands.Cog):
             )
             return
 
-        timer_id = f"{interaction.user.id}_{interaction.channel.id}"
+        timer_id = self.scheduler.create_timer_key(
+            interaction.user.id, interaction.channel.id
+        )
 
-        if timer_id in self.l:
-            self.l[timer_id] = 1
+        if self.stop_timer(timer_id):
             await interaction.response.send_message(
                 f"⏹️ Timer stopped by {interaction.user.mention}!"
             )
@@ -976,14 +655,17 @@ class Timer(commands.Cog):
             )
             return
 
-        timer_id = f"{interaction.user.id}_{interaction.channel.id}"
+        timer_id = self.scheduler.create_timer_key(
+            interaction.user.id, interaction.channel.id
+        )
+        timer = self.scheduler.get(timer_id)
 
-        if timer_id in self.l and self.l[timer_id] == 0:
-            self.l[timer_id] = 2
+        if timer and not timer.paused:
+            self.pause_timer(timer_id)
             await interaction.response.send_message(
                 f"⏸️ Timer paused by {interaction.user.mention}!"
             )
-        elif timer_id in self.l and self.l[timer_id] == 2:
+        elif timer:
             await interaction.response.send_message(
                 "⏸️ Your timer is already paused.", ephemeral=True
             )
@@ -1001,14 +683,17 @@ class Timer(commands.Cog):
             )
             return
 
-        timer_id = f"{interaction.user.id}_{interaction.channel.id}"
+        timer_id = self.scheduler.create_timer_key(
+            interaction.user.id, interaction.channel.id
+        )
+        timer = self.scheduler.get(timer_id)
 
-        if timer_id in self.l and self.l[timer_id] == 2:
-            self.l[timer_id] = 0
+        if timer and timer.paused:
+            self.resume_timer(timer_id)
             await interaction.response.send_message(
                 f"▶️ Timer resumed by {interaction.user.mention}!"
             )
-        elif timer_id in self.l and self.l[timer_id] == 0:
+        elif timer:
             await interaction.response.send_message(
                 "⏸️ Your timer is already running.", ephemeral=True
             )
@@ -1036,9 +721,7 @@ class Timer(commands.Cog):
             )
             return
 
-        count = len(self.l)
-        self.l.clear()
-        self.active_timers.clear()
+        count = self._reset_guild_timers(interaction.guild.id)
 
         await interaction.response.send_message(f"🧹 Cleared {count} active timers.")
 
@@ -19,21 +19,6 @@ class UtilityCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    async def get_language(self, guild_id):
-        """Get language setting for a guild"""
-        try:
-            if self.bot.database:
-                if not await self.bot.database.ensure_connected():
-                    return "en"
-                collection = await self.bot.database.get_collection("language")
-                if collection:
-                    find = await collection.find_one({"_id": str(guild_id)})
-                    if find:
-                        return find.get("ln", "en")
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.exception("Error getting language: %s", e)
-        return "en"
-
     @commands.command()
     async def help(self, ctx, command_name=None):
         """Show help information"""
@@ -304,7 +289,7 @@ class UtilityCommands(commands.Cog):
     @commands.command(aliases=["8ball", "test"])
     async def _8ball(self, ctx, *, question):
         """Ask the magic 8-ball a question"""
-        lang = await self.get_language(ctx.guild.id)
+        lang = await self.bot.get_language(ctx.guild.id)
 
         responses = {
             "en": [
@@ -353,7 +338,7 @@ class UtilityCommands(commands.Cog):
     )
     async def greetings(self, ctx):
         """Greet the user"""
-        lang = await self.get_language(ctx.guild.id)
+        lang = await self.bot.get_language(ctx.guild.id)
 
         greetings_list = {
             "en": ["Hey there,", "Hello,", "What's up?"],
@@ -366,7 +351,7 @@ class UtilityCommands(commands.Cog):
     @commands.command(aliases=["flip", "coin"])
     async def coinflip(self, ctx):
         """Flip a coin"""
-        lang = await self.get_language(ctx.guild.id)
+        lang = await self.bot.get_language(ctx.guild.id)
 
         coins = {"en": ["Head", "Tail"], "fr": ["Face", "Pile"]}
 
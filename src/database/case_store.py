@@ -0,0 +1,178 @@
+"""
+Moderation Case Store
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Stores moderation actions as numbered cases. Every guild has its own case
+counter that is incremented atomically in MongoDB, so case numbers are
+sequential and never collide, even with several shards writing at once.
+Case lists are read page by page with a cursor (the last case number, or
+timestamp and id, seen) rather than a skip, so the cost of a page does not
+grow with the size of the guild's history.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS, ModerationLog
+
+logger = logging.getLogger(__name__)
+
+# Cases shown per page of /cases and /history
+CASES_PER_PAGE = 10
+
+
+class CaseStore:
+    """Numbered moderation cases with indexed, cursor-paginated lookups"""
+
+    def __init__(self, db: MongoDatabase):
+        self.db = db
+        self.created: int = 0
+
+    async def _collection(self):
+        """Return the case collection, or None when offline"""
+        return await self.db.get_collection(COLLECTIONS["moderation_logs"])
+
+    async def ensure_indexes(self):
+        """Create the indexes behind case and history lookups"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return
+            await collection.create_index(
+                [("guild_id", ASCENDING), ("case_id", DESCENDING)],
+                name="guild_case",
+            )
+            await collection.create_index(
+                [
+                    ("guild_id", ASCENDING),
+                    ("user_id", ASCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ],
+                name="guild_user_created_id",
+            )
+        except PyMongoError as exc:
+            logger.error("Failed to create moderation case indexes: %s", exc)
+
+    async def next_case_id(self, guild_id: int) -> Optional[int]:
+        """Atomically allocate the next case number of a guild"""
+        counters = await self.db.get_collection(COLLECTIONS["case_counters"])
+        if counters is None:
+            return None
+        counter = await counters.find_one_and_update(
+            {"_id": guild_id},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return counter["seq"]
+
+    async def create_case(self, mod_log: ModerationLog) -> Optional[int]:
+        """Number and store a moderation action; returns its case number"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return None
+            mod_log.case_id = await self.next_case_id(mod_log.guild_id)
+            if mod_log.case_id is None:
+                return None
+            await collection.insert_one(dict(mod_log.__dict__))
+            self.created += 1
+            return mod_log.case_id
+        except PyMongoError as exc:
+            logger.error("Failed to store moderation case: %s", exc)
+            return None
+
+    async def get_case(self, guild_id: int, case_id: int) -> Optional[Dict[str, Any]]:
+        """Return one case of a guild"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return None
+            return await collection.find_one({"guild_id": guild_id, "case_id": case_id})
+        except PyMongoError as exc:
+            logger.error("Failed to load case %s of %s: %s", case_id, guild_id, exc)
+            return None
+
+    async def guild_cases(
+        self,
+        guild_id: int,
+        before: Optional[int] = None,
+        limit: int = CASES_PER_PAGE,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Return a page of a guild's cases, newest first.
+
+        Args:
+            before: Cursor from the previous page (only older cases are returned)
+
+        Returns:
+            The cases and the cursor of the next page (None on the last page)
+        """
+        query: Dict[str, Any] = {"guild_id": guild_id, "case_id": {"$type": "number"}}
+        if before is not None:
+            query["case_id"] = {"$lt": before}
+        cases = await self._page(query, [("case_id", DESCENDING)], limit)
+        cursor = cases[limit - 1]["case_id"] if len(cases) > limit else None
+        return cases[:limit], cursor
+
+    async def user_history(
+        self,
+        guild_id: int,
+        user_id: int,
+        before: Optional[Tuple[datetime, Any]] = None,
+        limit: int = CASES_PER_PAGE,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[datetime, Any]]]:
+        """
+        Return a page of one user's cases in a guild, newest first.
+
+        Cases are ordered by ``(created_at, _id)``, so cases stored in the
+        same millisecond (bulk actions) are neither skipped nor repeated at
+        a page boundary.
+
+        Args:
+            before: Cursor from the previous page
+        """
+        query: Dict[str, Any] = {"guild_id": guild_id, "user_id": user_id}
+        if before is not None:
+            created_at, case_oid = before
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": case_oid}},
+            ]
+        cases = await self._page(
+            query, [("created_at", DESCENDING), ("_id", DESCENDING)], limit
+        )
+        cursor = None
+        if len(cases) > limit:
+            last = cases[limit - 1]
+            cursor = (last["created_at"], last["_id"])
+        return cases[:limit], cursor
+
+    async def _page(
+        self, query: Dict[str, Any], sort: List[Tuple[str, int]], limit: int
+    ) -> List[Dict[str, Any]]:
+        """Run a page query, fetching one extra case to detect a next page"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return []
+            return (
+                await collection.find(query)
+                .sort(sort)
+                .limit(limit + 1)
+                .to_list(length=limit + 1)
+            )
+        except PyMongoError as exc:
+            logger.error("Failed to load moderation cases: %s", exc)
+            return []
+
+
+# Shared moderation case store for the bot
+case_store = CaseStore(database)
@@ -21,6 +21,7 @@ from motor.motor_asyncio import (  # type: ignore[import]
 from pymongo.errors import ConfigurationError, ConnectionFailure, PyMongoError
 
 from config.settings import Config
+from src.utils.command_metrics import command_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +68,7 @@ class MongoDatabase:
                         serverSelectionTimeoutMS=Config.MONGODB_CONNECT_TIMEOUT_MS,
                         socketTimeoutMS=Config.MONGODB_SOCKET_TIMEOUT_MS,
                         uuidRepresentation="standard",
+                        event_listeners=[command_metrics.db_listener],
                     )
 
                     await client.admin.command("ping")
@@ -0,0 +1,359 @@
+"""
+Guild Settings Cache
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+One in-memory cache for every per-guild settings document (language,
+legacy guild settings, server configuration and logging configuration).
+Documents are loaded on first use, kept in a bounded LRU with a TTL, and
+updated write-through: memory changes first, MongoDB is written next, and
+subscribers are told about the change in-process so no cog has to keep its
+own copy.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+from config.settings import Config
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS
+from src.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Language codes stored in the ``language`` collection and their display names
+LANGUAGE_NAMES = {"en": "english", "bn": "bangla", "fr": "french"}
+DEFAULT_LANGUAGE = "en"
+
+
+class SettingsNamespace(NamedTuple):
+    """Where one kind of guild settings document is stored"""
+
+    collection: str
+    id_field: str
+    id_type: type
+
+
+# Settings documents that are cached, by namespace
+NAMESPACES: Dict[str, SettingsNamespace] = {
+    "language": SettingsNamespace("language", "_id", str),
+    "guilds": SettingsNamespace("guilds", "_id", int),
+    "guild_configs": SettingsNamespace(COLLECTIONS["guild_configs"], "guild_id", int),
+    "logging_configs": SettingsNamespace(
+        COLLECTIONS["logging_configs"], "guild_id", int
+    ),
+}
+
+# Called as ``callback(guild_id, document)``; document is None when removed
+SettingsCallback = Callable[[int, Optional[Dict[str, Any]]], Any]
+
+
+class _Entry:
+    """Cached settings document (None when the guild has none)"""
+
+    __slots__ = ("document", "expires_at")
+
+    def __init__(self, document: Optional[Dict[str, Any]], expires_at: float):
+        self.document = document
+        self.expires_at = expires_at
+
+
+class GuildSettingsCache:
+    """
+    Shared per-guild settings with LRU + TTL eviction.
+
+    ``get`` answers from memory whenever the entry is fresh; concurrent
+    misses for the same guild share a single ``find_one``. ``update``,
+    ``replace`` and ``delete`` change the cached document before persisting
+    it, so the bot keeps working on its in-memory copy while MongoDB is
+    unreachable. Subscribers registered with ``subscribe`` are called after
+    every change and invalidation of their namespace.
+    """
+
+    def __init__(
+        self,
+        db: MongoDatabase,
+        max_entries: int = Config.GUILD_SETTINGS_CACHE_SIZE,
+        ttl: float = Config.GUILD_SETTINGS_CACHE_TTL,
+    ):
+        self.db = db
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, int], _Entry]" = OrderedDict()
+        self._loading: SingleFlight[Tuple[str, int], Any] = SingleFlight()
+        self._subscribers: Dict[str, List[SettingsCallback]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.write_failures: int = 0
+
+    # ==================== READS ====================
+
+    def peek(self, namespace: str, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Return a cached document without touching the database"""
+        entry = self._entries.get((namespace, guild_id))
+        return entry.document if entry is not None else None
+
+    async def get(self, namespace: str, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Return a guild's settings document, loading it on a miss"""
+        key = (namespace, guild_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.document
+
+        if key in self._loading:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        async def load() -> Optional[Dict[str, Any]]:
+            document, loaded = await self._load(namespace, guild_id)
+            if loaded:
+                self._store(key, document)
+            elif entry is not None:
+                # Keep serving the expired copy while the database is away
+                document = entry.document
+            return document
+
+        return await self._loading.run(key, load)
+
+    async def _load(
+        self, namespace: str, guild_id: int
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Fetch a document; the flag is False when the database was unavailable"""
+        spec = NAMESPACES[namespace]
+        if not await self.db.ensure_connected():
+            return None, False
+        try:
+            collection = await self.db.get_collection(spec.collection)
+            if collection is None:
+                return None, False
+            document = await collection.find_one(
+                {spec.id_field: spec.id_type(guild_id)}
+            )
+            return document, True
+        except PyMongoError as exc:
+            logger.error(
+                "Failed to load %s settings for guild %s: %s", namespace, guild_id, exc
+            )
+            return None, False
+
+    async def find_guild_ids(self, namespace: str, query: Dict[str, Any]) -> List[int]:
+        """Return the ids of guilds whose stored document matches ``query``"""
+        spec = NAMESPACES[namespace]
+        if not await self.db.ensure_connected():
+            return []
+        try:
+            collection = await self.db.get_collection(spec.collection)
+            if collection is None:
+                return []
+            cursor = collection.find(query, {spec.id_field: 1})
+            return [
+                int(document[spec.id_field])
+                async for document in cursor
+                if spec.id_field in document
+            ]
+        except PyMongoError as exc:
+            logger.error("Failed to query %s settings: %s", namespace, exc)
+            return []
+
+    def _store(self, key: Tuple[str, int], document: Optional[Dict[str, Any]]):
+        """Put a document into the LRU, evicting the oldest entries"""
+        self._entries[key] = _Entry(document, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ==================== WRITES ====================
+
+    async def update(
+        self,
+        namespace: str,
+        guild_id: int,
+        changes: Dict[str, Any],
+        unset: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Apply ``$set``/``$unset`` changes to a guild's document.
+
+        Returns:
+            True if the change was persisted, False if it is cached only
+        """
+        spec = NAMESPACES[namespace]
+        current = await self.get(namespace, guild_id)
+        document = {spec.id_field: spec.id_type(guild_id)}
+        if current:
+            document.update(current)
+        document.update(changes)
+        for field in unset or ():
+            document.pop(field, None)
+        self._apply(namespace, guild_id, document)
+
+        operation: Dict[str, Any] = {}
+        if changes:
+            operation["$set"] = changes
+        if unset:
+            operation["$unset"] = {field: "" for field in unset}
+        if not operation:
+            return True
+        return await self._write(
+            namespace,
+            guild_id,
+            lambda collection, query: collection.update_one(
+                query, operation, upsert=True
+            ),
+        )
+
+    async def replace(
+        self, namespace: str, guild_id: int, document: Dict[str, Any]
+    ) -> bool:
+        """Replace a guild's whole settings document"""
+        spec = NAMESPACES[namespace]
+        document = dict(document)
+        document[spec.id_field] = spec.id_type(guild_id)
+        self._apply(namespace, guild_id, document)
+        # MongoDB's own _id cannot change on replace, so never send it
+        stored = {
+            k: v for k, v in document.items() if k != "_id" or spec.id_field == "_id"
+        }
+        return await self._write(
+            namespace,
+            guild_id,
+            lambda collection, query: collection.replace_one(
+                query, stored, upsert=True
+            ),
+        )
+
+    async def delete(self, namespace: str, guild_id: int) -> bool:
+        """Remove a guild's settings document"""
+        self._apply(namespace, guild_id, None)
+        return await self._write(
+            namespace,
+            guild_id,
+            lambda collection, query: collection.delete_one(query),
+        )
+
+    def _apply(self, namespace: str, guild_id: int, document: Optional[Dict[str, Any]]):
+        """Update memory and notify subscribers"""
+        self._store((namespace, guild_id), document)
+        self._notify(namespace, guild_id, document)
+
+    async def _write(self, namespace: str, guild_id: int, operation) -> bool:
+        """Persist a change; the cached copy is kept either way"""
+        spec = NAMESPACES[namespace]
+        if not await self.db.ensure_connected():
+            logger.warning(
+                "%s settings for guild %s cached only (offline)", namespace, guild_id
+            )
+            return False
+        try:
+            collection = await self.db.get_collection(spec.collection)
+            if collection is None:
+                return False
+            await operation(collection, {spec.id_field: spec.id_type(guild_id)})
+            return True
+        except PyMongoError as exc:
+            self.write_failures += 1
+            logger.error(
+                "Failed to persist %s settings for guild %s: %s",
+                namespace,
+                guild_id,
+                exc,
+            )
+            return False
+
+    # ==================== INVALIDATION ====================
+
+    def subscribe(self, namespace: str, callback: SettingsCallback):
+        """Call ``callback(guild_id, document)`` whenever a namespace changes"""
+        self._subscribers.setdefault(namespace, []).append(callback)
+
+    def unsubscribe(self, namespace: str, callback: SettingsCallback):
+        """Stop notifying a callback"""
+        callbacks = self._subscribers.get(namespace, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def invalidate(self, namespace: str, guild_id: Optional[int] = None) -> int:
+        """
+        Drop cached documents so the next read goes to the database.
+
+        Without ``guild_id`` the whole namespace is dropped. Subscribers are
+        notified with a None document.
+        """
+        if guild_id is not None:
+            keys = (
+                [(namespace, guild_id)]
+                if (namespace, guild_id) in self._entries
+                else []
+            )
+        else:
+            keys = [key for key in self._entries if key[0] == namespace]
+        for key in keys:
+            del self._entries[key]
+            self._notify(namespace, key[1], None)
+        return len(keys)
+
+    def invalidate_guild(self, guild_id: int) -> int:
+        """Drop every cached document of one guild"""
+        return sum(self.invalidate(namespace, guild_id) for namespace in NAMESPACES)
+
+    def clear(self):
+        """Drop every cached document"""
+        self._entries.clear()
+
+    def _notify(
+        self, namespace: str, guild_id: int, document: Optional[Dict[str, Any]]
+    ):
+        """Run the subscribers of a namespace"""
+        for callback in list(self._subscribers.get(namespace, ())):
+            try:
+                result = callback(guild_id, document)
+                if asyncio.iscoroutine(result):
+                    asyncio.create_task(result)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                logger.error("Settings subscriber for %s failed: %s", namespace, exc)
+
+    # ==================== LANGUAGE ====================
+
+    async def get_language(self, guild_id: int) -> str:
+        """Return a guild's language code (``en`` by default)"""
+        document = await self.get("language", guild_id)
+        if not document:
+            return DEFAULT_LANGUAGE
+        return document.get("ln", DEFAULT_LANGUAGE)
+
+    async def set_language(self, guild_id: int, language: str) -> bool:
+        """Store a guild's language, given as a code or display name"""
+        code = language.lower()
+        for known, name in LANGUAGE_NAMES.items():
+            if code == name:
+                code = known
+                break
+        return await self.update("language", guild_id, {"ln": code})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "write_failures": self.write_failures,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared guild settings cache for the bot
+guild_settings = GuildSettingsCache(database)
@@ -20,6 +20,7 @@ class ReactionRoleConfig:
     description: str
     mode: str  # unique, verify, reversed, binding, temporary
     self_destruct: Optional[int] = None  # seconds until message self-destructs
+    role_duration: Optional[int] = None  # seconds a temporary mode role is kept
     blacklist_roles: List[int] = None  # roles that can't use this reaction role
     whitelist_roles: List[int] = None  # only these roles can use this reaction role
     created_at: datetime = None
@@ -59,7 +60,7 @@ class ModerationLog:
     duration: Optional[int] = None  # seconds, for timed actions
     expires_at: Optional[datetime] = None
     created_at: datetime = None
-    case_id: Optional[str] = None  # unique case identifier
+    case_id: Optional[int] = None  # per-guild case number
 
     def __post_init__(self):
         if self.created_at is None:
@@ -147,10 +148,22 @@ COLLECTIONS = {
     "reaction_roles": "reaction_roles",
     "reaction_role_configs": "reaction_role_configs",
     "moderation_logs": "moderation_logs",
+    "case_counters": "case_counters",  # Last case number per guild
     "sticky_roles": "sticky_roles",
     "logging_configs": "logging_configs",
     "guild_configs": "guild_configs",
     "temporary_roles": "temporary_roles",
     "infractions": "infractions",  # User infraction history
     "automod_rules": "automod_rules",  # Automated moderation rules
+    "timers": "timers",  # Checkpoints of running debate timers
+    "scheduled_jobs": "scheduled_jobs",  # Expiry scheduler queue
+    "motion_decks": "motion_decks",  # Non-repeating motion draw positions
+    # Tournament storage (Tabby database)
+    "tournaments": "tournaments",  # Guild -> Tabbycat tournament connection
+    "tournament_teams": "tournament_teams",
+    "tournament_adjudicators": "tournament_adjudicators",
+    "registration_keys": "registration_keys",  # Private URL keys -> participants
+    "tournament_rounds": "tournament_rounds",  # Synced draw snapshots
+    "tournament_pairings": "tournament_pairings",
+    "tournament_venues": "tournament_venues",
 }
@@ -0,0 +1,281 @@
+"""
+Motion Deck Storage
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Shuffled, non-repeating motion draws per guild (or per channel). A deck is
+not a stored list of motions: each segment of the bank is shuffled by a
+keyed pseudo-random permutation, so a deck is persisted as a seed and a
+cursor per segment and a draw computes the next motion id in O(1). Motions
+added to the bank later become a new segment that is mixed into the
+remaining draws instead of forcing a reshuffle. Cursor changes are written
+behind in one ``bulk_write``, like sticky roles.
+"""
+
+import logging
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from config.settings import Config
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS
+from src.utils.guild_cache import LazyGuildCache
+from src.utils.write_behind import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+MASK64 = (1 << 64) - 1
+FEISTEL_ROUNDS = 4
+
+# (channel id, or 0 for a guild-wide deck; language)
+DeckKey = Tuple[int, str]
+
+
+def _mix(value: int, key: int) -> int:
+    """SplitMix64 finaliser used as the Feistel round function"""
+    z = ((value ^ key) * 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+class DeckSegment:
+    """A shuffled run of motion ids ``base .. base + size - 1``"""
+
+    __slots__ = ("seed", "base", "size", "cursor", "_half", "_keys")
+
+    def __init__(self, seed: int, base: int, size: int, cursor: int = 0):
+        self.seed = seed
+        self.base = base
+        self.size = size
+        self.cursor = cursor
+        # Balanced Feistel network over the smallest even bit width >= size
+        self._half = max(1, ((size - 1).bit_length() + 1) // 2)
+        keys = random.Random(seed)
+        self._keys = [keys.getrandbits(64) for _ in range(FEISTEL_ROUNDS)]
+
+    @property
+    def remaining(self) -> int:
+        """Motions of this segment not drawn yet"""
+        return self.size - self.cursor
+
+    def _permute(self, index: int) -> int:
+        """Position ``index`` of the shuffled order (a bijection on 0..size-1)"""
+        mask = (1 << self._half) - 1
+        value = index
+        while True:
+            left, right = value >> self._half, value & mask
+            for key in self._keys:
+                left, right = right, left ^ (_mix(right, key) & mask)
+            value = (left << self._half) | right
+            # Cycle-walk values outside the segment; at most ~4x the domain
+            if value < self.size:
+                return value
+
+    def take(self) -> int:
+        """Draw the next motion id of this segment"""
+        motion_id = self.base + self._permute(self.cursor)
+        self.cursor += 1
+        return motion_id
+
+    def to_document(self) -> List[int]:
+        """Compact stored form"""
+        return [self.seed, self.base, self.size, self.cursor]
+
+
+class MotionDeck:
+    """Non-repeating draw order over a motion bank"""
+
+    __slots__ = ("segments", "covered", "cycles")
+
+    def __init__(
+        self,
+        segments: Optional[List[DeckSegment]] = None,
+        covered: int = 0,
+        cycles: int = 0,
+    ):
+        self.segments = segments or []
+        self.covered = covered  # bank size the segments cover
+        self.cycles = cycles  # completed passes through the bank
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "MotionDeck":
+        """Rebuild a stored deck"""
+        return cls(
+            [DeckSegment(*segment) for segment in document.get("segments", [])],
+            document.get("covered", 0),
+            document.get("cycles", 0),
+        )
+
+    def sync(self, bank_size: int):
+        """Follow the bank: add new motions, or reshuffle if it shrank"""
+        if bank_size < self.covered:
+            # Motions were removed; old positions no longer mean the same motion
+            self._reshuffle(bank_size)
+        elif bank_size > self.covered:
+            self.segments.append(
+                DeckSegment(
+                    random.getrandbits(63), self.covered, bank_size - self.covered
+                )
+            )
+            self.covered = bank_size
+
+    def _reshuffle(self, bank_size: int):
+        """Start a new pass over the whole bank"""
+        self.segments = (
+            [DeckSegment(random.getrandbits(63), 0, bank_size)] if bank_size else []
+        )
+        self.covered = bank_size
+
+    def draw(self, bank_size: int) -> Optional[int]:
+        """Return the next motion id; every motion comes up once per pass"""
+        self.sync(bank_size)
+        self.segments = [segment for segment in self.segments if segment.remaining]
+        if not self.segments:
+            if not bank_size:
+                return None
+            self.cycles += 1
+            self._reshuffle(bank_size)
+
+        # Pick a segment in proportion to what is left, so new motions are
+        # spread evenly through the rest of the pass
+        pick = random.randrange(sum(segment.remaining for segment in self.segments))
+        for segment in self.segments:
+            if pick < segment.remaining:
+                return segment.take()
+            pick -= segment.remaining
+        return None  # unreachable
+
+    def remaining(self) -> int:
+        """Draws left before the deck reshuffles"""
+        return sum(segment.remaining for segment in self.segments)
+
+    def to_document(self) -> Dict[str, Any]:
+        """Compact stored form"""
+        return {
+            "segments": [segment.to_document() for segment in self.segments],
+            "covered": self.covered,
+            "cycles": self.cycles,
+        }
+
+
+# (channel id, language) -> deck, for one guild
+GuildDecks = Dict[DeckKey, MotionDeck]
+
+
+class MotionDeckStore:
+    """Per-guild motion decks with lazy loading and write-behind saves"""
+
+    def __init__(
+        self, db: MongoDatabase, delay: float = Config.MOTION_DECK_FLUSH_DELAY
+    ):
+        self.db = db
+        self.guilds: LazyGuildCache[GuildDecks] = LazyGuildCache(
+            "motion_decks", self._load_guild, Config.LAZY_GUILD_CACHE_SIZE
+        )
+        # (guild id, channel id, language) -> deck waiting to be written
+        self.writes: WriteBehind[Tuple[int, int, str], MotionDeck] = WriteBehind(
+            "motion deck(s)", self._write, delay
+        )
+        self.draws: int = 0
+
+    async def _collection(self):
+        """Return the motion deck collection, or None when offline"""
+        return await self.db.get_collection(COLLECTIONS["motion_decks"])
+
+    async def ensure_indexes(self):
+        """Create the per-guild lookup index"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return
+            await collection.create_index(
+                [("guild_id", 1), ("channel_id", 1), ("language", 1)],
+                name="guild_channel_language",
+                unique=True,
+            )
+        except PyMongoError as exc:
+            logger.error("Failed to create motion deck indexes: %s", exc)
+
+    async def _load_guild(self, guild_id: int) -> GuildDecks:
+        """Load one guild's decks, including unflushed changes"""
+        collection = await self._collection()
+        if collection is None:
+            raise ConnectionError("MongoDB connection unavailable")
+
+        decks: GuildDecks = {}
+        async for document in collection.find({"guild_id": guild_id}, {"_id": 0}):
+            key = (document["channel_id"], document["language"])
+            decks[key] = MotionDeck.from_document(document)
+
+        for (dirty_guild, channel_id, language), deck in self.writes.pending.items():
+            if dirty_guild == guild_id:
+                decks[(channel_id, language)] = deck
+        return decks
+
+    async def draw(
+        self, guild_id: int, channel_id: int, language: str, bank_size: int
+    ) -> Optional[int]:
+        """
+        Draw the next motion id from a guild's (or channel's) deck.
+
+        Args:
+            channel_id: Channel of a per-channel deck, or 0 for the guild deck
+        """
+        decks = await self.guilds.get(guild_id)
+        deck = decks.get((channel_id, language))
+        if deck is None:
+            deck = decks[(channel_id, language)] = MotionDeck()
+        motion_id = deck.draw(bank_size)
+        self.draws += 1
+        self.writes.mark((guild_id, channel_id, language), deck)
+        return motion_id
+
+    async def reset(self, guild_id: int):
+        """Forget every deck of a guild, so the next draws start a new pass"""
+        decks = await self.guilds.get(guild_id)
+        for (channel_id, language), deck in decks.items():
+            deck.segments, deck.covered = [], 0
+            self.writes.mark((guild_id, channel_id, language), deck)
+
+    async def _write(self, changes: Dict[Tuple[int, int, str], MotionDeck]):
+        """Upsert a batch of changed decks in a single bulk operation"""
+        now = datetime.utcnow()
+        operations: List[Any] = [
+            UpdateOne(
+                {"guild_id": guild_id, "channel_id": channel_id, "language": language},
+                {"$set": {**deck.to_document(), "updated_at": now}},
+                upsert=True,
+            )
+            for (guild_id, channel_id, language), deck in changes.items()
+        ]
+        if not await self.db.ensure_connected():
+            raise PyMongoError("database unavailable")
+        collection = await self._collection()
+        if collection is None:
+            raise PyMongoError("database unavailable")
+        await collection.bulk_write(operations, ordered=False)
+
+    async def flush(self):
+        """Write every changed deck now"""
+        await self.writes.flush()
+
+    async def close(self):
+        """Flush outstanding changes before shutdown"""
+        await self.writes.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return store counters"""
+        return {
+            "draws": self.draws,
+            **self.writes.get_stats(),
+            **{f"cache_{k}": v for k, v in self.guilds.get_stats().items()},
+        }
+
+
+# Shared motion deck store for the bot
+motion_deck_store = MotionDeckStore(database)
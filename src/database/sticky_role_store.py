@@ -0,0 +1,186 @@
+"""
+Sticky Role Storage
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Remembers the roles of members who were kicked or banned so they can be
+given back when the member rejoins. Saves are write-behind: memory is
+updated at once and the changes of a short window are flushed together in
+one ``bulk_write`` of upserts, so a mass kick costs one round trip instead
+of one per member. Each loaded guild keeps its role ids in compact
+``array('Q')`` values, and entries older than the retention period are
+ignored in memory and removed by a TTL index in MongoDB.
+"""
+
+import logging
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from config.settings import Config
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS
+from src.utils.guild_cache import LazyGuildCache
+from src.utils.write_behind import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+
+class StickyEntry:
+    """Saved roles of one member"""
+
+    __slots__ = ("role_ids", "saved_at")
+
+    def __init__(self, role_ids: Iterable[int], saved_at: float):
+        self.role_ids = array("Q", role_ids)
+        self.saved_at = saved_at  # POSIX timestamp
+
+
+# user id -> saved roles, for one guild
+GuildStickyRoles = Dict[int, StickyEntry]
+
+
+class StickyRoleStore:
+    """Write-behind sticky role persistence with per-guild lazy loading"""
+
+    def __init__(
+        self,
+        db: MongoDatabase,
+        delay: float = Config.STICKY_ROLE_FLUSH_DELAY,
+        retention_days: int = Config.STICKY_ROLE_RETENTION_DAYS,
+    ):
+        self.db = db
+        self.retention = timedelta(days=retention_days) if retention_days else None
+        self.guilds: LazyGuildCache[GuildStickyRoles] = LazyGuildCache(
+            "sticky_roles", self._load_guild, Config.LAZY_GUILD_CACHE_SIZE
+        )
+        # (guild id, user id) -> entry waiting to be written
+        self.writes: WriteBehind[Tuple[int, int], StickyEntry] = WriteBehind(
+            "sticky role change(s)", self._write, delay
+        )
+
+    async def _collection(self):
+        """Return the sticky role collection, or None when offline"""
+        return await self.db.get_collection(COLLECTIONS["sticky_roles"])
+
+    async def ensure_indexes(self):
+        """Create the lookup index and the retention TTL index"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return
+            await collection.create_index(
+                [("guild_id", 1), ("user_id", 1)], name="guild_user"
+            )
+            if self.retention is not None:
+                await collection.create_index(
+                    "added_at",
+                    name="added_at_ttl",
+                    expireAfterSeconds=int(self.retention.total_seconds()),
+                )
+        except PyMongoError as exc:
+            logger.error("Failed to create sticky role indexes: %s", exc)
+
+    def _expired(self, entry: StickyEntry) -> bool:
+        """Whether an entry is older than the retention period"""
+        if self.retention is None:
+            return False
+        return time.time() - entry.saved_at > self.retention.total_seconds()
+
+    # ==================== READS ====================
+
+    async def _load_guild(self, guild_id: int) -> GuildStickyRoles:
+        """Load one guild's sticky roles, including unflushed changes"""
+        collection = await self._collection()
+        if collection is None:
+            raise ConnectionError("MongoDB connection unavailable")
+
+        query: Dict[str, Any] = {"guild_id": guild_id}
+        if self.retention is not None:
+            query["added_at"] = {"$gte": datetime.utcnow() - self.retention}
+
+        roles: GuildStickyRoles = {}
+        async for document in collection.find(
+            query, {"_id": 0, "user_id": 1, "role_ids": 1, "added_at": 1}
+        ):
+            added_at = document.get("added_at")
+            roles[document["user_id"]] = StickyEntry(
+                document["role_ids"],
+                (
+                    (added_at - datetime(1970, 1, 1)).total_seconds()
+                    if added_at
+                    else time.time()
+                ),
+            )
+
+        for (dirty_guild, user_id), entry in self.writes.pending.items():
+            if dirty_guild == guild_id:
+                roles[user_id] = entry
+        return roles
+
+    async def get(self, guild_id: int, user_id: int) -> Optional[array]:
+        """Return a member's saved role ids, or None"""
+        roles = await self.guilds.get(guild_id)
+        entry = roles.get(user_id)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            del roles[user_id]
+            return None
+        return entry.role_ids
+
+    # ==================== WRITES ====================
+
+    def save(self, guild_id: int, user_id: int, role_ids: List[int]):
+        """Remember a member's roles; written with the next flush"""
+        entry = StickyEntry(role_ids, time.time())
+        roles = self.guilds.peek(guild_id)
+        if roles is not None:
+            roles[user_id] = entry
+        self.writes.mark((guild_id, user_id), entry)
+
+    async def _write(self, changes: Dict[Tuple[int, int], StickyEntry]):
+        """Upsert a batch of changes in a single bulk operation"""
+        operations: List[Any] = [
+            UpdateOne(
+                {"guild_id": guild_id, "user_id": user_id},
+                {
+                    "$set": {
+                        "role_ids": entry.role_ids.tolist(),
+                        "added_at": datetime.utcfromtimestamp(entry.saved_at),
+                    }
+                },
+                upsert=True,
+            )
+            for (guild_id, user_id), entry in changes.items()
+        ]
+        if not await self.db.ensure_connected():
+            raise PyMongoError("database unavailable")
+        collection = await self._collection()
+        if collection is None:
+            raise PyMongoError("database unavailable")
+        await collection.bulk_write(operations, ordered=False)
+
+    async def flush(self):
+        """Write every pending change now"""
+        await self.writes.flush()
+
+    async def close(self):
+        """Flush outstanding changes before shutdown"""
+        await self.writes.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return store counters"""
+        return {
+            **self.writes.get_stats(),
+            "retention_days": self.retention.days if self.retention else None,
+            **{f"cache_{k}": v for k, v in self.guilds.get_stats().items()},
+        }
+
+
+# Shared sticky role store for the bot
+sticky_role_store = StickyRoleStore(database)
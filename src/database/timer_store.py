@@ -0,0 +1,144 @@
+"""
+Timer Checkpoint Storage
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Checkpoints running timers to MongoDB so they survive restarts. Timers are
+stored with an absolute wall-clock end time, so nothing needs to be written
+while a timer simply counts down; only state changes (start, pause, resume,
+added time, stop, finish) mark a timer dirty. Dirty timers are flushed
+together in one bulk write after a short debounce.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import DeleteMany, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from config.settings import Config
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def timer_document(timer) -> Dict[str, Any]:
+    """Serialize a scheduled timer into a checkpoint document"""
+    return {
+        "_id": timer.key,
+        "guild_id": timer.guild_id,
+        "channel_id": timer.channel_id,
+        "user_id": timer.user_id,
+        "message_id": timer.message.id if timer.message is not None else None,
+        "duration": timer.duration,
+        # Wall-clock end time; monotonic deadlines do not survive a restart
+        "ends_at": None if timer.paused else time.time() + timer.remaining(),
+        "paused_remaining": timer.paused_remaining,
+        "lang": timer.lang,
+        "owner_mention": timer.owner_mention,
+        "channel_mention": timer.channel_mention,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+class TimerStore:
+    """Debounced, batched checkpoint writer for active timers"""
+
+    def __init__(self, db: MongoDatabase, delay: float = Config.TIMER_CHECKPOINT_DELAY):
+        self.db = db
+        self.delay = delay
+        self._dirty: Dict[str, Any] = {}  # key -> timer
+        self._removed: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.flush_count: int = 0
+        self.write_count: int = 0
+
+    async def _collection(self):
+        """Return the timers collection, or None when offline"""
+        return await self.db.get_collection(COLLECTIONS["timers"])
+
+    def save(self, timer):
+        """Mark a timer for checkpointing"""
+        self._removed.discard(timer.key)
+        self._dirty[timer.key] = timer
+        self._schedule_flush()
+
+    def remove(self, key: str):
+        """Mark a timer's checkpoint for deletion"""
+        self._dirty.pop(key, None)
+        self._removed.add(key)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start the debounce window if it is not already open"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        """Collect changes for ``delay`` seconds, then write them at once"""
+        await asyncio.sleep(self.delay)
+        # Shutdown cancels the debounce, never a bulk write already under way
+        await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """Write every pending checkpoint in a single bulk operation"""
+        if not self._dirty and not self._removed:
+            return
+
+        dirty, self._dirty = self._dirty, {}
+        removed, self._removed = self._removed, set()
+
+        operations: List[Any] = [
+            ReplaceOne({"_id": key}, timer_document(timer), upsert=True)
+            for key, timer in dirty.items()
+        ]
+        if removed:
+            operations.append(DeleteMany({"_id": {"$in": list(removed)}}))
+
+        try:
+            collection = await self._collection()
+            if collection is None:
+                raise PyMongoError("database unavailable")
+            await collection.bulk_write(operations, ordered=False)
+            self.flush_count += 1
+            self.write_count += len(operations)
+        except PyMongoError as exc:
+            logger.error("Failed to checkpoint %d timer(s): %s", len(operations), exc)
+            # Keep the changes for the next flush unless newer ones arrived
+            for key, timer in dirty.items():
+                if key not in self._removed:
+                    self._dirty.setdefault(key, timer)
+            self._removed |= {key for key in removed if key not in self._dirty}
+
+    async def load_all(self) -> List[Dict[str, Any]]:
+        """Return every stored timer checkpoint"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return []
+            return await collection.find({}).to_list(length=None)
+        except PyMongoError as exc:
+            logger.error("Failed to load timer checkpoints: %s", exc)
+            return []
+
+    async def close(self):
+        """Flush outstanding checkpoints before shutdown"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return checkpoint counters"""
+        return {
+            "pending": len(self._dirty) + len(self._removed),
+            "flushes": self.flush_count,
+            "writes": self.write_count,
+        }
+
+
+# Shared timer checkpoint store for the bot
+timer_store = TimerStore(database)
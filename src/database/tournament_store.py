@@ -0,0 +1,614 @@
+"""
+Tournament Storage Layer
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Persistent MongoDB storage for Tabbycat tournament connections, teams,
+adjudicators, registration keys and draw snapshots, fronted by a
+write-through in-memory cache so command handlers resolve a guild, key or
+Discord user in O(1). Imports are diffed against the stored snapshot and
+only changed documents are written back.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, DeleteMany, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from config.settings import Config
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS
+from src.utils.guild_cache import LazyGuildCache
+
+logger = logging.getLogger(__name__)
+
+# Draw data mirrored from Tabbycat as raw API objects
+SNAPSHOT_KINDS = ("rounds", "pairings", "venues")
+
+
+class _GuildTournamentState:
+    """In-memory view of one guild's tournament data"""
+
+    __slots__ = ("tournament", "keys", "users", "snapshots", "keys_unsaved")
+
+    def __init__(self, tournament: Optional[Dict[str, Any]] = None):
+        self.tournament = tournament
+        # registration key -> registration document
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        # Discord user id -> registration document (same objects as ``keys``)
+        self.users: Dict[int, Dict[str, Any]] = {}
+        # collection key -> {item id: stored document}, loaded on first diff
+        self.snapshots: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        # The last import's registration keys may not be in MongoDB yet
+        self.keys_unsaved: bool = False
+
+    def index(self, registration: Dict[str, Any]):
+        """Add a registration document to the lookup tables"""
+        self.keys[registration["key"]] = registration
+        discord_id = registration.get("discord_id")
+        if discord_id is not None:
+            self.users[discord_id] = registration
+
+
+class TournamentStore:
+    """
+    Tournament storage with a write-through cache.
+
+    Documents live in the Tabby database. Each guild's tournament and
+    registration keys are loaded into memory on first use; every write
+    updates memory first and is then persisted, so reads never wait on
+    MongoDB once a guild is warm.
+    """
+
+    def __init__(self, db: MongoDatabase):
+        self.db = db
+        self.guilds: LazyGuildCache[_GuildTournamentState] = LazyGuildCache(
+            "tournaments", self._read_guild, Config.LAZY_GUILD_CACHE_SIZE
+        )
+        self._indexes_ready: bool = False
+
+    async def _collection(self, key: str):
+        """Return a Tabby database collection, or None when offline"""
+        return await self.db.get_collection(COLLECTIONS[key], use_tabby_db=True)
+
+    async def ensure_indexes(self):
+        """Create the indexes used by tournament lookups (idempotent)"""
+        if self._indexes_ready or not await self.db.ensure_connected():
+            return
+
+        try:
+            tournaments = await self._collection("tournaments")
+            teams = await self._collection("tournament_teams")
+            adjudicators = await self._collection("tournament_adjudicators")
+            keys = await self._collection("registration_keys")
+            snapshots = [
+                await self._collection(f"tournament_{kind}") for kind in SNAPSHOT_KINDS
+            ]
+            if any(
+                c is None for c in (tournaments, teams, adjudicators, keys, *snapshots)
+            ):
+                return
+
+            await tournaments.create_index(
+                [("guild_id", ASCENDING)], unique=True, name="guild_id_unique"
+            )
+            await teams.create_index(
+                [("guild_id", ASCENDING), ("team_id", ASCENDING)],
+                unique=True,
+                name="guild_team_unique",
+            )
+            await adjudicators.create_index(
+                [("guild_id", ASCENDING), ("adjudicator_id", ASCENDING)],
+                unique=True,
+                name="guild_adjudicator_unique",
+            )
+            await keys.create_index(
+                [("guild_id", ASCENDING), ("key", ASCENDING)],
+                unique=True,
+                name="guild_key_unique",
+            )
+            await keys.create_index(
+                [("guild_id", ASCENDING), ("discord_id", ASCENDING)],
+                name="guild_discord_user",
+                partialFilterExpression={"discord_id": {"$type": "long"}},
+            )
+            for collection in snapshots:
+                await collection.create_index(
+                    [("guild_id", ASCENDING), ("item_id", ASCENDING)],
+                    unique=True,
+                    name="guild_item_unique",
+                )
+            self._indexes_ready = True
+            logger.info("✅ Tournament store indexes ensured")
+
+        except PyMongoError as exc:
+            logger.error("Failed to create tournament store indexes: %s", exc)
+
+    async def _load_guild(self, guild_id: int) -> _GuildTournamentState:
+        """Return the cached state for a guild, loading it on first use"""
+        try:
+            return await self.guilds.get(guild_id)
+        except (ConnectionError, PyMongoError) as exc:
+            logger.error(
+                "Failed to load tournament data for guild %s: %s", guild_id, exc
+            )
+            # Not cached, so the next access retries the load
+            return _GuildTournamentState()
+
+    async def _read_guild(self, guild_id: int) -> _GuildTournamentState:
+        """Read one guild's tournament and registration keys from MongoDB"""
+        if not await self.db.ensure_connected():
+            raise ConnectionError("MongoDB connection unavailable")
+        await self.ensure_indexes()
+        tournaments = await self._collection("tournaments")
+        keys = await self._collection("registration_keys")
+        if tournaments is None or keys is None:
+            raise ConnectionError("MongoDB connection unavailable")
+
+        state = _GuildTournamentState(
+            await tournaments.find_one({"guild_id": guild_id}, {"_id": 0})
+        )
+        if state.tournament:
+            async for registration in keys.find({"guild_id": guild_id}, {"_id": 0}):
+                state.index(registration)
+        return state
+
+    # ==================== TOURNAMENTS ====================
+
+    async def get_tournament(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Return the tournament connected to a guild"""
+        state = await self._load_guild(guild_id)
+        return state.tournament
+
+    async def set_tournament(self, guild_id: int, data: Dict[str, Any]):
+        """Connect a guild to a tournament, replacing any previous connection"""
+        state = await self._load_guild(guild_id)
+        previous = state.tournament
+
+        tournament = dict(data, guild_id=guild_id, synced_at=datetime.utcnow())
+        state.tournament = tournament
+        if previous and previous.get("tournament") != tournament.get("tournament"):
+            # Keys and snapshots belong to the old tournament; stale documents
+            # are removed by the next import's delta
+            state.keys.clear()
+            state.users.clear()
+            state.snapshots.clear()
+
+        if not await self.db.ensure_connected():
+            logger.warning("Tournament for guild %s cached only (offline)", guild_id)
+            return
+
+        try:
+            collection = await self._collection("tournaments")
+            if collection is not None:
+                await collection.replace_one(
+                    {"guild_id": guild_id}, tournament, upsert=True
+                )
+        except PyMongoError as exc:
+            logger.error("Failed to persist tournament for guild %s: %s", guild_id, exc)
+
+    # ==================== PARTICIPANTS ====================
+
+    async def replace_participants(
+        self,
+        guild_id: int,
+        teams: Iterable[Dict[str, Any]],
+        adjudicators: Iterable[Dict[str, Any]],
+    ) -> int:
+        """
+        Import Tabbycat teams and adjudicators for a guild.
+
+        Registration keys are rebuilt from the speakers' and adjudicators'
+        private URL keys, keeping any existing Discord links and check-ins.
+
+        Returns:
+            int: Number of registration keys now available
+
+        Raises:
+            PyMongoError: If the import could not be saved; keys stay usable
+                from memory and the next import writes the full delta again
+        """
+        state = await self._load_guild(guild_id)
+
+        team_docs: List[Dict[str, Any]] = []
+        adjudicator_docs: List[Dict[str, Any]] = []
+        registrations: Dict[str, Dict[str, Any]] = {}
+
+        for team in teams:
+            team_doc = {
+                "guild_id": guild_id,
+                "team_id": team.get("id"),
+                "url": team.get("url"),
+                "short_name": team.get("short_name") or team.get("reference"),
+                "long_name": team.get("long_name"),
+                "speakers": [s.get("name") for s in team.get("speakers", [])],
+            }
+            team_docs.append(team_doc)
+            for speaker in team.get("speakers", []):
+                if speaker.get("url_key"):
+                    registrations[speaker["url_key"]] = {
+                        "guild_id": guild_id,
+                        "key": speaker["url_key"],
+                        "role": "speaker",
+                        "participant_id": speaker.get("id"),
+                        "name": speaker.get("name"),
+                        "team_id": team_doc["team_id"],
+                        "team_name": team_doc["short_name"],
+                    }
+
+        for adjudicator in adjudicators:
+            adjudicator_docs.append(
+                {
+                    "guild_id": guild_id,
+                    "adjudicator_id": adjudicator.get("id"),
+                    "url": adjudicator.get("url"),
+                    "name": adjudicator.get("name"),
+                    "institution": adjudicator.get("institution"),
+                    "url_key": adjudicator.get("url_key"),
+                }
+            )
+            if adjudicator.get("url_key"):
+                registrations[adjudicator["url_key"]] = {
+                    "guild_id": guild_id,
+                    "key": adjudicator["url_key"],
+                    "role": "adjudicator",
+                    "participant_id": adjudicator.get("id"),
+                    "name": adjudicator.get("name"),
+                }
+
+        # Carry over Discord links, check-in state and timestamps
+        previous_keys = dict(state.keys)
+        keys_unsaved = state.keys_unsaved
+        for key, registration in registrations.items():
+            existing = previous_keys.get(key)
+            if existing:
+                registrations[key] = {**existing, **registration}
+            else:
+                registration["discord_id"] = None
+                registration["checked_in"] = False
+
+        state.keys.clear()
+        state.users.clear()
+        for registration in registrations.values():
+            state.index(registration)
+        state.keys_unsaved = True
+
+        try:
+            # Diff keys against MongoDB itself if the last import was not saved
+            stored_keys = (
+                await self._read_documents("registration_keys", guild_id, "key")
+                if keys_unsaved
+                else previous_keys
+            )
+            await self._apply_delta(
+                state, "tournament_teams", guild_id, team_docs, "team_id"
+            )
+            await self._apply_delta(
+                state,
+                "tournament_adjudicators",
+                guild_id,
+                adjudicator_docs,
+                "adjudicator_id",
+            )
+            await self._apply_delta(
+                state,
+                "registration_keys",
+                guild_id,
+                list(registrations.values()),
+                "key",
+                snapshot=stored_keys,
+            )
+            state.keys_unsaved = False
+        except PyMongoError as exc:
+            logger.error(
+                "Failed to persist participants for guild %s: %s", guild_id, exc
+            )
+            raise
+
+        return len(registrations)
+
+    # ==================== DRAW SNAPSHOTS ====================
+
+    async def apply_snapshot(
+        self,
+        guild_id: int,
+        kind: str,
+        items: Iterable[Dict[str, Any]],
+        **fields: Any,
+    ) -> Tuple[int, int]:
+        """
+        Store the latest Tabbycat ``rounds``, ``pairings`` or ``venues`` list.
+
+        Items are keyed by their Tabbycat ``id`` and compared with the stored
+        snapshot; only new/changed items are upserted and only vanished ones
+        are deleted. Extra ``fields`` (e.g. ``round_id``) are stored alongside
+        each item and can be used to filter ``get_snapshot``.
+
+        Returns:
+            Tuple of (documents written, documents deleted)
+
+        Raises:
+            PyMongoError: If the snapshot could not be saved; the stored
+                snapshot is left as it was so the next sync retries the write
+        """
+        state = await self._load_guild(guild_id)
+        docs = [
+            {"guild_id": guild_id, "item_id": item.get("id"), "data": item, **fields}
+            for item in items
+            if item.get("id") is not None
+        ]
+        try:
+            return await self._apply_delta(
+                state, f"tournament_{kind}", guild_id, docs, "item_id"
+            )
+        except PyMongoError as exc:
+            logger.error(
+                "Failed to persist %s snapshot for guild %s: %s", kind, guild_id, exc
+            )
+            raise
+
+    async def get_snapshot(
+        self, guild_id: int, kind: str, **fields: Any
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the stored ``rounds``, ``pairings`` or ``venues`` list.
+
+        Only items whose extra fields match ``fields`` are returned.
+
+        Returns:
+            The raw Tabbycat objects, or None if nothing has been synced yet
+            or the snapshot cannot be read (callers fetch live instead)
+        """
+        state = await self._load_guild(guild_id)
+        if not state.tournament:
+            return None
+        try:
+            snapshot = await self._load_snapshot(
+                state, f"tournament_{kind}", guild_id, "item_id"
+            )
+        except PyMongoError as exc:
+            logger.warning(
+                "Failed to read %s snapshot for guild %s: %s", kind, guild_id, exc
+            )
+            return None
+        items = [
+            doc["data"]
+            for doc in snapshot.values()
+            if all(doc.get(name) == value for name, value in fields.items())
+        ]
+        return items or None
+
+    async def get_team_names(self, guild_id: int) -> Dict[str, str]:
+        """Return team API URL -> short name for the guild's tournament"""
+        state = await self._load_guild(guild_id)
+        try:
+            teams = await self._load_snapshot(
+                state, "tournament_teams", guild_id, "team_id"
+            )
+        except PyMongoError as exc:
+            logger.warning("Failed to read teams for guild %s: %s", guild_id, exc)
+            return {}
+        return {
+            doc["url"]: doc.get("short_name") or "Unknown"
+            for doc in teams.values()
+            if doc.get("url")
+        }
+
+    async def update_sync_state(self, guild_id: int, sync_state: Dict[str, Any]):
+        """Record the background sync cursors of a guild's tournament"""
+        state = await self._load_guild(guild_id)
+        if not state.tournament:
+            return
+        state.tournament["sync"] = sync_state
+
+        if not await self.db.ensure_connected():
+            return
+        try:
+            collection = await self._collection("tournaments")
+            if collection is not None:
+                await collection.update_one(
+                    {"guild_id": guild_id}, {"$set": {"sync": sync_state}}
+                )
+        except PyMongoError as exc:
+            logger.error("Failed to persist sync state for guild %s: %s", guild_id, exc)
+
+    async def get_synced_guild_ids(self) -> List[int]:
+        """Return every guild id with a stored tournament connection"""
+        if not await self.db.ensure_connected():
+            return [
+                guild_id for guild_id, state in self.guilds.items() if state.tournament
+            ]
+        try:
+            collection = await self._collection("tournaments")
+            if collection is None:
+                return []
+            return await collection.distinct("guild_id")
+        except PyMongoError as exc:
+            logger.error("Failed to list synced tournaments: %s", exc)
+            return []
+
+    async def _load_snapshot(
+        self,
+        state: _GuildTournamentState,
+        key: str,
+        guild_id: int,
+        id_field: str,
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Return the stored documents of a collection for a guild, by id.
+
+        Raises:
+            PyMongoError: If MongoDB is unavailable; nothing is cached, so an
+                empty snapshot is never mistaken for the stored one
+        """
+        snapshot = state.snapshots.get(key)
+        if snapshot is None:
+            snapshot = state.snapshots[key] = await self._read_documents(
+                key, guild_id, id_field
+            )
+        return snapshot
+
+    async def _read_documents(
+        self, key: str, guild_id: int, id_field: str
+    ) -> Dict[Any, Dict[str, Any]]:
+        """Read a guild's documents of a collection from MongoDB, by id"""
+        collection = await self._writable_collection(key)
+        documents = {}
+        async for doc in collection.find({"guild_id": guild_id}, {"_id": 0}):
+            documents[doc[id_field]] = doc
+        return documents
+
+    async def _writable_collection(self, key: str):
+        """Return a Tabby database collection, raising when offline"""
+        if not await self.db.ensure_connected():
+            raise PyMongoError("database unavailable")
+        collection = await self._collection(key)
+        if collection is None:
+            raise PyMongoError("database unavailable")
+        return collection
+
+    async def _apply_delta(
+        self,
+        state: _GuildTournamentState,
+        key: str,
+        guild_id: int,
+        docs: List[Dict[str, Any]],
+        id_field: str,
+        snapshot: Optional[Dict[Any, Dict[str, Any]]] = None,
+    ) -> Tuple[int, int]:
+        """
+        Write only the differences between ``docs`` and the stored snapshot.
+
+        Changed or new documents are upserted and vanished ones deleted in a
+        single unordered ``bulk_write``. The cached snapshot only moves
+        forward once the write succeeded.
+
+        Returns:
+            Tuple of (documents written, documents deleted)
+
+        Raises:
+            PyMongoError: If MongoDB is unavailable or the write fails
+        """
+        if snapshot is None:
+            snapshot = await self._load_snapshot(state, key, guild_id, id_field)
+
+        incoming = {doc[id_field]: doc for doc in docs}
+        changed = [
+            doc for item_id, doc in incoming.items() if snapshot.get(item_id) != doc
+        ]
+        removed = [item_id for item_id in snapshot if item_id not in incoming]
+        if not (changed or removed):
+            return 0, 0
+
+        collection = await self._writable_collection(key)
+        operations: List[Any] = [
+            ReplaceOne(
+                {"guild_id": guild_id, id_field: doc[id_field]}, doc, upsert=True
+            )
+            for doc in changed
+        ]
+        if removed:
+            operations.append(
+                DeleteMany({"guild_id": guild_id, id_field: {"$in": removed}})
+            )
+        await collection.bulk_write(operations, ordered=False)
+        if key != "registration_keys":
+            state.snapshots[key] = incoming
+
+        logger.debug(
+            "%s delta for guild %s: %d written, %d deleted",
+            key,
+            guild_id,
+            len(changed),
+            len(removed),
+        )
+        return len(changed), len(removed)
+
+    # ==================== REGISTRATIONS ====================
+
+    async def get_registration_by_key(
+        self, guild_id: int, key: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the registration entry for a private URL key"""
+        state = await self._load_guild(guild_id)
+        return state.keys.get(key)
+
+    async def get_registration_by_user(
+        self, guild_id: int, discord_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """Return the registration entry linked to a Discord user"""
+        state = await self._load_guild(guild_id)
+        return state.users.get(discord_id)
+
+    async def link_user(
+        self, guild_id: int, key: str, discord_id: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Link a Discord user to a registration key.
+
+        Returns:
+            The updated registration, or None if the key is unknown
+        """
+        state = await self._load_guild(guild_id)
+        registration = state.keys.get(key)
+        if registration is None:
+            return None
+
+        previous = state.users.get(discord_id)
+        if previous is not None and previous is not registration:
+            previous["discord_id"] = None
+            await self._persist_registration(previous)
+
+        registration["discord_id"] = discord_id
+        registration["registered_at"] = datetime.utcnow()
+        state.users[discord_id] = registration
+        await self._persist_registration(registration)
+        return registration
+
+    async def set_checked_in(
+        self, guild_id: int, discord_id: int, checked_in: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Update the check-in state of a registered user"""
+        state = await self._load_guild(guild_id)
+        registration = state.users.get(discord_id)
+        if registration is None:
+            return None
+
+        registration["checked_in"] = checked_in
+        registration["checked_in_at"] = datetime.utcnow() if checked_in else None
+        await self._persist_registration(registration)
+        return registration
+
+    async def _persist_registration(self, registration: Dict[str, Any]):
+        """Write a single registration document through to MongoDB"""
+        if not await self.db.ensure_connected():
+            return
+        try:
+            collection = await self._collection("registration_keys")
+            if collection is not None:
+                await collection.replace_one(
+                    {"guild_id": registration["guild_id"], "key": registration["key"]},
+                    registration,
+                    upsert=True,
+                )
+        except PyMongoError as exc:
+            logger.error("Failed to persist registration: %s", exc)
+
+    def forget_guild(self, guild_id: int):
+        """Drop a guild from the in-memory cache"""
+        self.guilds.discard(guild_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        return {
+            "registration_keys": sum(len(s.keys) for s in self.guilds.values()),
+            **{f"cache_{k}": v for k, v in self.guilds.get_stats().items()},
+        }
+
+
+# Shared tournament store for the bot
+tournament_store = TournamentStore(database)
@@ -14,8 +14,7 @@ import discord
 from discord.abc import Messageable
 from discord.ext import commands
 
-from src.database.connection import database
-from src.database.models import COLLECTIONS
+from src.utils.join_pipeline import JoinContext
 
 logger = logging.getLogger(__name__)
 
@@ -120,23 +119,19 @@ class MemberEvents(commands.Cog):
         self.bot = bot
 
     async def _fetch_guild_settings(self, guild_id: int) -> Optional[Dict[str, Any]]:
-        if not await database.ensure_connected():
-            return None
-        collection = await database.get_collection("guilds")
-        if not collection:
-            return None
-        return await collection.find_one({"_id": guild_id})
-
-    async def _fetch_role_prompt(self, guild_id: int) -> Optional[Dict[str, Any]]:
-        if not await database.ensure_connected():
-            return None
-        collection = await database.get_collection(COLLECTIONS["guild_configs"])
-        if not collection:
-            return None
-        config = await collection.find_one({"guild_id": guild_id})
-        if not config:
-            return None
-        return config.get("role_prompt")
+        return await self.bot.guild_settings.get("guilds", guild_id)
+
+    async def cog_load(self):
+        """Hook the welcome flow into the member join pipeline"""
+        pipeline = self.bot.join_pipeline
+        pipeline.register("autorole", roles=self.add_autorole)
+        pipeline.register("welcome", effect=self.send_welcome)
+        pipeline.register("role_prompt", effect=self.send_role_prompt)
+
+    async def cog_unload(self):
+        """Remove this cog's join handlers"""
+        for name in ("autorole", "welcome", "role_prompt"):
+            self.bot.join_pipeline.unregister(name)
 
     @staticmethod
     def _should_prompt_member(member: discord.Member) -> bool:
@@ -184,12 +179,11 @@ class MemberEvents(commands.Cog):
         embed.set_footer(text="You will receive the selected role immediately")
         return embed
 
-    async def _send_role_prompt(
-        self,
-        member: discord.Member,
-        guild_settings: Optional[Dict[str, Any]],
-    ) -> None:
-        prompt_config = await self._fetch_role_prompt(member.guild.id)
+    async def send_role_prompt(self, context: JoinContext) -> None:
+        """Offer the tournament role selector to a new member."""
+        member = context.member
+        guild_settings = context.settings
+        prompt_config = (context.config or {}).get("role_prompt")
         if not prompt_config or not prompt_config.get("enabled"):
             return
 
@@ -245,82 +239,61 @@ class MemberEvents(commands.Cog):
                 member,
             )
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        """Handle new member joins."""
-        try:
-            guild_settings = await self._fetch_guild_settings(member.guild.id)
-            if not guild_settings:
-                logger.debug(
-                    "No guild settings found for %s - skipping auto-role and prompts",
-                    member.guild.id,
-                )
-                return
-
-            role_id = guild_settings.get("autorole")
-            if role_id:
-                role = member.guild.get_role(role_id)
-                if role and role < member.guild.me.top_role:  # type: ignore[operator]
-                    try:
-                        await member.add_roles(role, reason="Auto-role assignment")
-                        logger.info(
-                            "Assigned auto-role %s to %s in %s",
-                            role.id,
-                            member,
-                            member.guild,
-                        )
-                    except discord.Forbidden:
-                        logger.warning(
-                            "Cannot assign auto-role %s in %s - insufficient permissions",
-                            role.id,
-                            member.guild,
-                        )
-                    except Exception as exc:  # pylint: disable=broad-exception-caught
-                        logger.error("Error assigning auto-role: %s", exc)
-
-            welcome_channel_id = guild_settings.get("welcome_channel")
-            channel = (
-                member.guild.get_channel(welcome_channel_id)
-                if welcome_channel_id
-                else None
-            )
-            if (
-                channel
-                and isinstance(channel, Messageable)
-                and channel.permissions_for(member.guild.me).send_messages
-            ):
-                language = guild_settings.get("language", "english")
-                welcome_msg = (
-                    f"🎉 স্বাগতম {member.mention}! {member.guild.name} এ যোগ দেওয়ার জন্য ধন্যবাদ।"
-                    if language == "bangla"
-                    else f"🎉 Welcome {member.mention}! Thanks for joining {member.guild.name}."
-                )
-                embed = discord.Embed(
-                    title="👋 New Member!",
-                    description=welcome_msg,
-                    color=discord.Color.green(),
-                    timestamp=member.joined_at,
-                )
-                embed.set_thumbnail(url=member.display_avatar.url)
-                embed.add_field(
-                    name="Member Count",
-                    value=member.guild.member_count,
-                    inline=True,
-                )
+    @staticmethod
+    def add_autorole(context: JoinContext):
+        """Queue the legacy ``.autorole`` role in the join pipeline."""
+        if context.settings:
+            context.add_role(context.settings.get("autorole"), "Auto-role assignment")
+
+    async def send_welcome(self, context: JoinContext):
+        """Post the welcome message for a new member."""
+        member = context.member
+        # Legacy guild settings win over the ``/setup-welcome`` channel
+        welcome_channel_id = (context.settings or {}).get("welcome_channel") or (
+            context.config or {}
+        ).get("welcome_channel_id")
+        channel = (
+            member.guild.get_channel(welcome_channel_id) if welcome_channel_id else None
+        )
+        if (
+            not channel
+            or not isinstance(channel, Messageable)
+            or not channel.permissions_for(member.guild.me).send_messages
+        ):
+            return
 
-                message_channel = cast(Messageable, channel)
-                try:
-                    await message_channel.send(embed=embed)
-                except discord.Forbidden:
-                    logger.warning(
-                        "Cannot send welcome message in %s - no permission",
-                        message_channel,
-                    )
-                except Exception as exc:  # pylint: disable=broad-exception-caught
-                    logger.error("Error sending welcome message: %s", exc)
+        welcome_msg = (
+            f"🎉 স্বাগতম {member.mention}! {member.guild.name} এ যোগ দেওয়ার জন্য ধন্যবাদ।"
+            if context.language == "bn"
+            else f"🎉 Welcome {member.mention}! Thanks for joining {member.guild.name}."
+        )
+        embed = discord.Embed(
+            title="👋 New Member!",
+            description=welcome_msg,
+            color=discord.Color.green(),
+            timestamp=member.joined_at,
+        )
+        embed.set_thumbnail(url=member.display_avatar.url)
+        embed.add_field(
+            name="Member Count",
+            value=member.guild.member_count,
+            inline=True,
+        )
 
-            await self._send_role_prompt(member, guild_settings)
+        message_channel = cast(Messageable, channel)
+        try:
+            await message_channel.send(embed=embed)
+        except discord.Forbidden:
+            logger.warning(
+                "Cannot send welcome message in %s - no permission",
+                message_channel,
+            )
 
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        """Handle new member joins through the shared join pipeline."""
+        try:
+            await self.bot.join_pipeline.handle(member)
         except Exception as exc:  # pylint: disable=broad-exception-caught
             logger.error("Error in on_member_join: %s", exc, exc_info=True)
 
@@ -340,10 +313,10 @@ class MemberEvents(commands.Cog):
             ):
                 return
 
-            language = guild_settings.get("language", "english")
+            language = await self.bot.get_language(member.guild.id)
             goodbye_msg = (
                 f"👋 {member.display_name} চলে গেছেন। আমরা তাদের মিস করব!"
-                if language == "bangla"
+                if language == "bn"
                 else f"👋 {member.display_name} has left the server. We'll miss them!"
             )
             embed = discord.Embed(
@@ -417,14 +390,9 @@ class MemberEvents(commands.Cog):
         logger.info("Left guild: %s (ID: %s)", guild.name, guild.id)
 
         try:
-            if await database.ensure_connected():
-                collection = await database.get_collection("guilds")
-                if collection:
-                    await collection.update_one(
-                        {"_id": guild.id},
-                        {"$set": {"inactive": True}},
-                        upsert=True,
-                    )
+            await self.bot.guild_settings.update("guilds", guild.id, {"inactive": True})
+            # Nothing else of this guild is needed until it comes back
+            self.bot.guild_settings.invalidate_guild(guild.id)
         except Exception as exc:  # pylint: disable=broad-exception-caught
             logger.error("Error cleaning up guild data: %s", exc)
 
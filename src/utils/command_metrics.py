@@ -0,0 +1,298 @@
+"""
+Command Latency Metrics
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Times every prefix and slash command invocation and keeps per-command
+latency histograms in memory. Each invocation also records how long it
+spent waiting on Discord's HTTP API and on MongoDB, and for slash commands
+how quickly the first interaction response (or defer) was sent. Histograms
+use fixed buckets, so memory stays constant however many commands run.
+"""
+
+import bisect
+import contextvars
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import discord
+from discord import app_commands
+from pymongo import monitoring
+
+# Upper bounds of the latency buckets, in milliseconds
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+DEFERRED_RESPONSES = (
+    discord.InteractionResponseType.deferred_channel_message,
+    discord.InteractionResponseType.deferred_message_update,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, milliseconds: float):
+        """Record one measurement"""
+        self.counts[bisect.bisect_left(BUCKETS_MS, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile by interpolating inside its bucket"""
+        return min(self._interpolate(fraction), self.max_ms)
+
+    def _interpolate(self, fraction: float) -> float:
+        """Linear estimate from the bucket that holds the rank"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS_MS[index - 1] if index else 0
+                if index == len(BUCKETS_MS):
+                    return self.max_ms  # beyond the last bound
+                upper = BUCKETS_MS[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return float(BUCKETS_MS[-1])
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean and p50/p95/p99 in milliseconds"""
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 2),
+            "p95_ms": round(self.percentile(0.95), 2),
+            "p99_ms": round(self.percentile(0.99), 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class CommandStats:
+    """Histograms and counters of one command"""
+
+    __slots__ = ("kind", "calls", "errors", "total", "defer", "response", "http", "db")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.calls = 0
+        self.errors = 0
+        self.total = LatencyHistogram()
+        self.defer = LatencyHistogram()  # time until a deferred response
+        self.response = LatencyHistogram()  # time until a direct response
+        self.http = LatencyHistogram()  # Discord API time per invocation
+        self.db = LatencyHistogram()  # MongoDB time per invocation
+
+
+class Invocation:
+    """Timing of one running command"""
+
+    __slots__ = ("name", "kind", "started", "http_ms", "db_ms", "first_response_ms")
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.http_ms = 0.0
+        self.db_ms = 0.0
+        self.first_response_ms: Optional[float] = None
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the command started"""
+        return (time.perf_counter() - self.started) * 1000
+
+
+# The invocation whose task (or a task it spawned) is currently running
+_current: contextvars.ContextVar[Optional[Invocation]] = contextvars.ContextVar(
+    "command_invocation", default=None
+)
+
+
+class _DatabaseTimer(monitoring.CommandListener):
+    """Adds MongoDB command durations to the running invocation"""
+
+    # Motor runs pymongo in worker threads with a copy of the caller's
+    # context, so the invocation is visible here
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        invocation = _current.get()
+        if invocation is not None:
+            invocation.db_ms += event.duration_micros / 1000
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+class CommandMetrics:
+    """Per-command latency histograms for the whole bot"""
+
+    def __init__(self):
+        self.commands: Dict[str, CommandStats] = {}
+        self.db_listener = _DatabaseTimer()
+
+    # ==================== INVOCATIONS ====================
+
+    def start(self, name: str, kind: str) -> Invocation:
+        """Begin timing a command in the current task"""
+        invocation = Invocation(name, kind)
+        _current.set(invocation)
+        return invocation
+
+    def finish(
+        self,
+        invocation: Invocation,
+        failed: bool = False,
+        deferred: Optional[bool] = None,
+    ):
+        """Record a finished command"""
+        stats = self.commands.get(invocation.name)
+        if stats is None:
+            stats = self.commands[invocation.name] = CommandStats(invocation.kind)
+        stats.calls += 1
+        if failed:
+            stats.errors += 1
+        stats.total.observe(invocation.elapsed_ms())
+        stats.http.observe(invocation.http_ms)
+        stats.db.observe(invocation.db_ms)
+        if invocation.first_response_ms is not None and deferred is not None:
+            (stats.defer if deferred else stats.response).observe(
+                invocation.first_response_ms
+            )
+        if _current.get() is invocation:
+            _current.set(None)
+
+    def finish_interaction(self, interaction: discord.Interaction, failed: bool):
+        """Record a slash command from the timing stored on its interaction"""
+        invocation = interaction.extras.pop("command_timing", None)
+        if invocation is None:
+            return
+        response_type = interaction.response.type
+        deferred = (
+            None if response_type is None else response_type in DEFERRED_RESPONSES
+        )
+        self.finish(invocation, failed=failed, deferred=deferred)
+
+    # ==================== HTTP ====================
+
+    def http_trace(self) -> aiohttp.TraceConfig:
+        """aiohttp trace hooks that time discord.py's API requests"""
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_end.append(self._on_request_end)
+        trace.on_request_exception.append(self._on_request_end)
+        return trace
+
+    @staticmethod
+    async def _on_request_start(_session, context, _params):
+        context.started = time.perf_counter()
+
+    @staticmethod
+    async def _on_request_end(_session, context, params):
+        invocation = _current.get()
+        if invocation is None:
+            return
+        invocation.http_ms += (time.perf_counter() - context.started) * 1000
+        if invocation.first_response_ms is None and params.url.path.endswith(
+            "/callback"
+        ):
+            invocation.first_response_ms = invocation.elapsed_ms()
+
+    # ==================== REPORTING ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-command latency summaries"""
+        commands: Dict[str, Any] = {}
+        for name, stats in sorted(self.commands.items()):
+            commands[name] = {
+                "type": stats.kind,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / stats.calls, 4),
+                "latency": stats.total.summary(),
+                "defer": stats.defer.summary(),
+                "response": stats.response.summary(),
+                "http": stats.http.summary(),
+                "db": stats.db.summary(),
+            }
+        return {
+            "invocations": sum(stats.calls for stats in self.commands.values()),
+            "errors": sum(stats.errors for stats in self.commands.values()),
+            "commands": commands,
+        }
+
+    def prometheus(self) -> str:
+        """Render every histogram in the Prometheus text exposition format"""
+        lines: List[str] = []
+        histograms = (
+            ("command_duration_seconds", "Total command latency", "total"),
+            ("command_defer_seconds", "Time until a deferred response", "defer"),
+            ("command_response_seconds", "Time until a direct response", "response"),
+            ("command_http_seconds", "Discord API time per command", "http"),
+            ("command_db_seconds", "MongoDB time per command", "db"),
+        )
+        for metric, description, attribute in histograms:
+            name = f"hearhear_{metric}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for command, stats in sorted(self.commands.items()):
+                histogram: LatencyHistogram = getattr(stats, attribute)
+                labels = f'command="{command}",type="{stats.kind}"'
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS_MS, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total_ms / 1000:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        for metric, description, attribute in (
+            ("commands_total", "Command invocations", "calls"),
+            ("command_errors_total", "Failed command invocations", "errors"),
+        ):
+            name = f"hearhear_{metric}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for command, stats in sorted(self.commands.items()):
+                labels = f'command="{command}",type="{stats.kind}"'
+                lines.append(f"{name}{{{labels}}} {getattr(stats, attribute)}")
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Command tree that times every slash command"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is discord.InteractionType.application_command:
+            command = interaction.command
+            name = command.qualified_name if command else "unknown"
+            interaction.extras["command_timing"] = self.client.command_metrics.start(
+                name, "slash"
+            )
+        return True
+
+    async def on_error(
+        self, interaction: discord.Interaction, error: app_commands.AppCommandError
+    ):
+        self.client.command_metrics.finish_interaction(interaction, failed=True)
+        # Hand over to the bot's slash command error handler
+        await self.client.on_app_command_error(interaction, error)
+
+
+# Shared command metrics for the bot
+command_metrics = CommandMetrics()
@@ -0,0 +1,228 @@
+"""
+Message Edit Coalescer
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Live displays (such as timers) push the state they want shown; the
+coalescer decides when that state actually reaches Discord. Each message
+has at most one edit in flight, intermediate states are dropped, and the
+update cadence slows down far from the deadline or when the channel is
+being rate limited.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Edits that take longer than this were most likely held back by a rate limit
+RATE_LIMITED_EDIT_SECONDS = 1.0
+
+# Ticks arrive slightly early or late; don't drop one for a few milliseconds
+CADENCE_SLACK = 0.1
+
+# Upper bound for the per-channel slow-down factor
+MAX_CHANNEL_PENALTY = 8.0
+
+
+def cadence_for(seconds_left: Optional[int]) -> float:
+    """Seconds between display edits for a countdown with this much time left"""
+    if seconds_left is None:
+        return 1.0
+    if seconds_left > 300:
+        return 15.0
+    if seconds_left > 60:
+        return 5.0
+    if seconds_left > 10:
+        return 2.0
+    return 1.0
+
+
+class _MessageSlot:
+    """Edit state of one message"""
+
+    __slots__ = (
+        "message",
+        "guild_id",
+        "channel_id",
+        "render",
+        "forced",
+        "last_sent",
+        "task",
+        "on_gone",
+    )
+
+    def __init__(self, message, guild_id, channel_id):
+        self.message = message
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.render: Optional[Callable[[], Dict[str, Any]]] = None
+        self.forced = False
+        self.last_sent = 0.0
+        self.task: Optional[asyncio.Task] = None
+        self.on_gone: Optional[Callable[[], Any]] = None
+
+
+class EditCoalescer:
+    """Rate-limit-aware edit queue with one slot per message"""
+
+    def __init__(self):
+        self._slots: Dict[int, _MessageSlot] = {}
+        self._penalty: Dict[int, float] = {}  # channel_id -> cadence multiplier
+        self._blocked_until: Dict[int, float] = {}  # channel_id -> monotonic time
+        self._guild_stats: Dict[Optional[int], list] = {}  # guild -> [sent, dropped]
+        self.failed: int = 0
+
+    def submit(
+        self,
+        message: discord.Message,
+        render: Callable[[], Dict[str, Any]],
+        *,
+        seconds_left: Optional[int] = None,
+        force: bool = False,
+        on_gone: Optional[Callable[[], Any]] = None,
+        guild_id: Optional[int] = None,
+    ):
+        """
+        Push the desired state of a message.
+
+        Args:
+            message: Message to edit
+            render: Returns the ``Message.edit`` keyword arguments, or None if
+                nothing changed; only called when an edit is about to be sent
+            seconds_left: Remaining countdown time, used to pick the cadence
+            force: Always deliver this state (pause, stop and finish screens)
+            on_gone: Called if the message turns out to be deleted
+            guild_id: Guild to account the edit to (defaults to the message's)
+        """
+        slot = self._slots.get(message.id)
+        if slot is None:
+            if guild_id is None and message.guild is not None:
+                guild_id = message.guild.id
+            slot = _MessageSlot(message, guild_id, message.channel.id)
+            self._slots[message.id] = slot
+        if on_gone is not None:
+            slot.on_gone = on_gone
+
+        now = time.monotonic()
+        if not force and not slot.forced:
+            interval = cadence_for(seconds_left) * self._penalty.get(
+                slot.channel_id, 1.0
+            )
+            blocked = self._blocked_until.get(slot.channel_id, 0.0) > now
+            if blocked or now - slot.last_sent < interval - CADENCE_SLACK:
+                self._count(slot.guild_id, suppressed=True)
+                return
+
+        if slot.render is not None:
+            # A newer state replaces the one still waiting behind an edit
+            self._count(slot.guild_id, suppressed=True)
+        slot.render = render
+        slot.forced = slot.forced or force
+
+        if slot.task is None or slot.task.done():
+            slot.task = asyncio.create_task(self._flush(slot))
+
+    def release(self, message_id: int):
+        """Forget a message once its final state has been delivered"""
+        slot = self._slots.get(message_id)
+        if slot is None:
+            return
+        if slot.task is None or slot.task.done():
+            del self._slots[message_id]
+        else:
+            slot.task.add_done_callback(lambda _: self._slots.pop(message_id, None))
+
+    async def _flush(self, slot: _MessageSlot):
+        """Send the latest state until nothing is pending"""
+        while slot.render is not None:
+            render, slot.render = slot.render, None
+            slot.forced = False
+
+            wait = self._blocked_until.get(slot.channel_id, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            kwargs = render()
+            if kwargs is None:
+                continue  # the display already shows this state
+
+            started = time.monotonic()
+            slot.last_sent = started
+            try:
+                await slot.message.edit(**kwargs)
+            except discord.NotFound:
+                self._slots.pop(slot.message.id, None)
+                if slot.on_gone:
+                    slot.on_gone()
+                return
+            except discord.HTTPException as e:
+                self.failed += 1
+                if e.status == 429:
+                    retry_after = getattr(e, "retry_after", None) or 5.0
+                    self._blocked_until[slot.channel_id] = (
+                        time.monotonic() + retry_after
+                    )
+                    self._slow_down(slot.channel_id)
+                    if slot.render is None:
+                        # Retry the same edit once the bucket resets
+                        slot.render = lambda kwargs=kwargs: kwargs
+                continue
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.failed += 1
+                logger.error("Error editing message %s: %s", slot.message.id, e)
+                continue
+
+            self._count(slot.guild_id, suppressed=False)
+            # discord.py waits out rate limits internally, so a slow edit means
+            # the channel's bucket is exhausted
+            if time.monotonic() - started > RATE_LIMITED_EDIT_SECONDS:
+                self._slow_down(slot.channel_id)
+            else:
+                self._recover(slot.channel_id)
+
+    def _slow_down(self, channel_id: int):
+        """Double the cadence of a rate-limited channel"""
+        penalty = self._penalty.get(channel_id, 1.0)
+        self._penalty[channel_id] = min(penalty * 2, MAX_CHANNEL_PENALTY)
+
+    def _recover(self, channel_id: int):
+        """Let a channel's cadence drift back to normal"""
+        penalty = self._penalty.get(channel_id)
+        if penalty is None:
+            return
+        penalty *= 0.75
+        if penalty <= 1.0:
+            self._penalty.pop(channel_id, None)
+            self._blocked_until.pop(channel_id, None)
+        else:
+            self._penalty[channel_id] = penalty
+
+    def _count(self, guild_id: Optional[int], suppressed: bool):
+        """Record a sent or suppressed edit for a guild"""
+        counts = self._guild_stats.get(guild_id)
+        if counts is None:
+            counts = self._guild_stats[guild_id] = [0, 0]
+        counts[1 if suppressed else 0] += 1
+
+    def get_guild_stats(self, guild_id: Optional[int]) -> Dict[str, int]:
+        """Return edits sent vs. suppressed for one guild"""
+        sent, suppressed = self._guild_stats.get(guild_id, (0, 0))
+        return {"sent": sent, "suppressed": suppressed}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return coalescer counters"""
+        sent = sum(counts[0] for counts in self._guild_stats.values())
+        suppressed = sum(counts[1] for counts in self._guild_stats.values())
+        return {
+            "messages": len(self._slots),
+            "edits_sent": sent,
+            "edits_suppressed": suppressed,
+            "edits_failed": self.failed,
+            "throttled_channels": len(self._penalty),
+            "guilds": len(self._guild_stats),
+        }
@@ -0,0 +1,350 @@
+"""
+Expiry Scheduler for Hear! Hear! Bot
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Persistent queue of jobs that must run at a fixed wall-clock time (such as
+deleting a self-destructing reaction role message, removing a temporary
+role or lifting a timed ban). Jobs are stored in MongoDB with an indexed
+``expires_at`` so they survive restarts, a single loop sleeps on a min-heap
+until the earliest deadline instead of one sleeping task per job, and
+finished jobs are removed from storage in batches. A job whose handler
+raises is retried with exponential backoff.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+from src.database.connection import MongoDatabase, database
+from src.database.models import COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Seconds finished jobs are collected before they are deleted in one batch
+DELETE_BATCH_DELAY = 1.0
+
+# Retry delays of failed jobs: 30s, 1m, 2m, ... capped at an hour
+RETRY_BASE_DELAY = 30.0
+RETRY_MAX_DELAY = 3600.0
+# Runs (first try included) before a failing job is dropped
+MAX_ATTEMPTS = 10
+
+
+def _timestamp(moment: datetime) -> float:
+    """POSIX timestamp of a naive UTC (or aware) datetime"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _stored(moment: datetime) -> datetime:
+    """A datetime as MongoDB stores it (millisecond precision)"""
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000)
+
+
+class ExpiryJob:
+    """One pending job"""
+
+    __slots__ = ("kind", "key", "expires_at", "data", "attempts", "_version")
+
+    def __init__(
+        self,
+        kind: str,
+        key: str,
+        expires_at: datetime,
+        data: dict,
+        attempts: int = 0,
+    ):
+        self.kind = kind
+        self.key = key
+        self.expires_at = expires_at
+        self.data = data
+        self.attempts = attempts  # failed runs so far
+        self._version = 0
+
+    @property
+    def id(self) -> str:
+        """Identifier of the job, unique across kinds"""
+        return f"{self.kind}:{self.key}"
+
+    def document(self) -> Dict[str, Any]:
+        """Serialize the job for storage"""
+        return {
+            "_id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "expires_at": self.expires_at,
+            "data": self.data,
+            "attempts": self.attempts,
+        }
+
+
+JobHandler = Callable[[ExpiryJob], Awaitable[Any]]
+
+
+class ExpiryScheduler:
+    """
+    Deadline queue drained by one background loop.
+
+    Features register a coroutine per job ``kind`` with ``register``; it is
+    awaited with the job once ``expires_at`` has passed, after which the job
+    is removed. A handler that raises is retried later, up to
+    ``MAX_ATTEMPTS`` runs. Scheduling a job with the same kind and key
+    replaces it.
+    """
+
+    def __init__(self, db: MongoDatabase):
+        self.db = db
+        self.jobs: Dict[str, ExpiryJob] = {}
+        self._handlers: Dict[str, JobHandler] = {}
+        self._heap: List[Tuple[float, int, ExpiryJob, int]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self._finished: Dict[str, datetime] = {}  # job id -> expires_at
+        self._delete_task: Optional[asyncio.Task] = None
+        self.completed: int = 0
+        self.failed: int = 0
+
+    async def _collection(self):
+        """Return the job collection, or None when offline"""
+        return await self.db.get_collection(COLLECTIONS["scheduled_jobs"])
+
+    def register(self, kind: str, handler: JobHandler):
+        """Set the coroutine that runs jobs of ``kind``"""
+        self._handlers[kind] = handler
+
+    def unregister(self, kind: str):
+        """Stop running jobs of ``kind`` (they stay queued)"""
+        self._handlers.pop(kind, None)
+
+    def get(self, kind: str, key: Any) -> Optional[ExpiryJob]:
+        """Return a pending job"""
+        return self.jobs.get(f"{kind}:{key}")
+
+    # ==================== LIFECYCLE ====================
+
+    async def load(self) -> int:
+        """Queue every stored job; call once before ``start``"""
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return 0
+            await collection.create_index("expires_at", name="expires_at")
+            documents = await collection.find({}).to_list(length=None)
+        except PyMongoError as exc:
+            logger.error("Failed to load scheduled jobs: %s", exc)
+            return 0
+
+        for document in documents:
+            self._queue(
+                ExpiryJob(
+                    document["kind"],
+                    document["key"],
+                    document["expires_at"],
+                    document.get("data") or {},
+                    document.get("attempts", 0),
+                )
+            )
+        if documents:
+            logger.info("⏳ Restored %d scheduled job(s)", len(documents))
+        return len(documents)
+
+    def start(self):
+        """Start draining the queue"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop; pending jobs stay stored for the next start"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        if self._delete_task and not self._delete_task.done():
+            self._delete_task.cancel()
+        await self._flush_deletes()
+
+    # ==================== JOBS ====================
+
+    async def schedule(
+        self,
+        kind: str,
+        key: Any,
+        expires_at: datetime,
+        data: Optional[dict] = None,
+        attempts: int = 0,
+    ) -> ExpiryJob:
+        """Queue (or reschedule) a job and persist it"""
+        job = ExpiryJob(kind, str(key), expires_at, data or {}, attempts)
+        self._queue(job)
+        self._finished.pop(job.id, None)
+        try:
+            collection = await self._collection()
+            if collection is not None:
+                await collection.replace_one(
+                    {"_id": job.id}, job.document(), upsert=True
+                )
+        except PyMongoError as exc:
+            logger.error("Failed to persist scheduled job %s: %s", job.id, exc)
+        return job
+
+    async def cancel(self, kind: str, key: Any) -> bool:
+        """Drop a pending job; returns False if there was none"""
+        job = self.jobs.pop(f"{kind}:{key}", None)
+        if job is None:
+            return False
+        job._version += 1
+        await self._delete(job)
+        return True
+
+    def _queue(self, job: ExpiryJob):
+        """Put a job into memory and the deadline heap"""
+        previous = self.jobs.get(job.id)
+        if previous is not None:
+            previous._version += 1
+        self.jobs[job.id] = job
+        entry = (_timestamp(job.expires_at), next(self._seq), job, job._version)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _delete(self, job: ExpiryJob):
+        """Remove a cancelled job from storage"""
+        try:
+            collection = await self._collection()
+            if collection is not None:
+                await collection.delete_one({"_id": job.id})
+        except PyMongoError as exc:
+            logger.error("Failed to delete scheduled job %s: %s", job.id, exc)
+
+    # ==================== LOOP ====================
+
+    async def _run(self):
+        """Sleep until the earliest deadline, then run everything due"""
+        while True:
+            try:
+                if not self._heap:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                        continue  # an earlier job was queued
+                    except asyncio.TimeoutError:
+                        pass
+
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job, version = heapq.heappop(self._heap)
+                    if version != job._version or self.jobs.get(job.id) is not job:
+                        continue
+                    task = asyncio.create_task(self._fire(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error in expiry scheduler loop: %s", e, exc_info=True)
+
+    async def _fire(self, job: ExpiryJob):
+        """Run one due job and forget it"""
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            # Leave it stored; it runs on a later start once a handler exists
+            logger.warning("No handler for scheduled job %s", job.id)
+            self.jobs.pop(job.id, None)
+            return
+
+        try:
+            await handler(job)
+            self.completed += 1
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.failed += 1
+            # Skip the retry if the handler rescheduled or cancelled the job
+            if self.jobs.get(job.id) is job and job.attempts + 1 < MAX_ATTEMPTS:
+                delay = min(RETRY_BASE_DELAY * 2**job.attempts, RETRY_MAX_DELAY)
+                logger.warning(
+                    "Scheduled job %s failed (retry in %ds): %s", job.id, delay, e
+                )
+                await self.schedule(
+                    job.kind,
+                    job.key,
+                    datetime.utcnow() + timedelta(seconds=delay),
+                    job.data,
+                    attempts=job.attempts + 1,
+                )
+                return
+            logger.error("Scheduled job %s failed: %s", job.id, e, exc_info=True)
+
+        if self.jobs.get(job.id) is job:
+            del self.jobs[job.id]
+            self._finished[job.id] = job.expires_at
+            self._schedule_deletes()
+
+    def _schedule_deletes(self):
+        """Start the delete batching window if it is not already open"""
+        if self._delete_task is None or self._delete_task.done():
+            self._delete_task = asyncio.create_task(self._delete_later())
+
+    async def _delete_later(self):
+        """Collect finished jobs for a moment, then delete them together"""
+        await asyncio.sleep(DELETE_BATCH_DELAY)
+        await asyncio.shield(self._flush_deletes())
+
+    async def _flush_deletes(self):
+        """Remove every finished job from storage with one ``delete_many``"""
+        if not self._finished:
+            return
+        finished, self._finished = self._finished, {}
+        # Match each job's own deadline, so a job rescheduled meanwhile is kept
+        try:
+            collection = await self._collection()
+            if collection is None:
+                raise PyMongoError("database unavailable")
+            await collection.delete_many(
+                {
+                    "$or": [
+                        {"_id": job_id, "expires_at": _stored(expires_at)}
+                        for job_id, expires_at in finished.items()
+                    ]
+                }
+            )
+        except PyMongoError as exc:
+            logger.error("Failed to delete %d finished job(s): %s", len(finished), exc)
+            for job_id, expires_at in finished.items():
+                if job_id not in self.jobs:
+                    self._finished.setdefault(job_id, expires_at)
+            if self._task is not None:
+                self._schedule_deletes()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return scheduler counters"""
+        kinds: Dict[str, int] = {}
+        for job in self.jobs.values():
+            kinds[job.kind] = kinds.get(job.kind, 0) + 1
+        return {
+            "pending": len(self.jobs),
+            "by_kind": kinds,
+            "running": len(self._running),
+            "awaiting_delete": len(self._finished),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+# Global expiry scheduler instance
+expiry_scheduler = ExpiryScheduler(database)
@@ -0,0 +1,106 @@
+"""
+Lazy Per-Guild Cache
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Holds one value per guild that is loaded from the database the first time
+the guild is used, instead of loading every guild's documents at startup.
+Only guilds seen by this process (and therefore on its shards) are ever
+loaded, and the least recently used guilds are evicted once the cache is
+full.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+from src.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyGuildCache(Generic[T]):
+    """
+    LRU of per-guild values with coalesced loading.
+
+    ``loader(guild_id)`` returns the value for a guild, or raises to signal
+    that it could not be loaded (nothing is cached then). ``on_evict`` is
+    called with ``(guild_id, value)`` when a cold guild is dropped.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[int], Awaitable[T]],
+        max_guilds: int,
+        on_evict: Optional[Callable[[int, T], Any]] = None,
+    ):
+        self.name = name
+        self.loader = loader
+        self.max_guilds = max_guilds
+        self.on_evict = on_evict
+        self._values: "OrderedDict[int, T]" = OrderedDict()
+        self._loading: SingleFlight[int, T] = SingleFlight()
+        self.loads: int = 0
+        self.evictions: int = 0
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def peek(self, guild_id: int) -> Optional[T]:
+        """Return a loaded value without loading or touching LRU order"""
+        return self._values.get(guild_id)
+
+    async def get(self, guild_id: int) -> T:
+        """Return a guild's value, loading it on first use"""
+        value = self._values.get(guild_id)
+        if value is not None:
+            self._values.move_to_end(guild_id)
+            return value
+
+        return await self._loading.run(guild_id, lambda: self._load(guild_id))
+
+    async def _load(self, guild_id: int) -> T:
+        """Run the loader and cache what it returns"""
+        value = await self.loader(guild_id)
+        self.loads += 1
+        self.put(guild_id, value)
+        return value
+
+    def put(self, guild_id: int, value: T):
+        """Store a guild's value, evicting cold guilds beyond the limit"""
+        self._values[guild_id] = value
+        self._values.move_to_end(guild_id)
+        while len(self._values) > self.max_guilds:
+            evicted_id, evicted = self._values.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted_id, evicted)
+
+    def discard(self, guild_id: int):
+        """Forget a guild so it is reloaded on next use"""
+        value = self._values.pop(guild_id, None)
+        if value is not None and self.on_evict is not None:
+            self.on_evict(guild_id, value)
+
+    def values(self):
+        """Loaded values, coldest first"""
+        return self._values.values()
+
+    def items(self):
+        """Loaded ``(guild_id, value)`` pairs, coldest first"""
+        return self._values.items()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        return {
+            "guilds": len(self._values),
+            "max_guilds": self.max_guilds,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
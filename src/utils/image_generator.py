@@ -2,22 +2,74 @@
 Image generation utilities for Hear! Hear! Bot
 Author: aldinn
 Email: kferdoush617@gmail.com
+
+The ``create_*`` methods render synchronously. Commands should use the
+``render_*`` coroutines, which run them on a bounded thread pool so Pillow's
+decode, layout and PNG encoding never block the event loop. Background
+templates are decoded and resized once, and fonts are loaded once per
+rendering thread.
 """
 
 from PIL import Image, ImageFont, ImageDraw
+import asyncio
 import io
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config.settings import Config
+from src.utils.command_metrics import LatencyHistogram
+
+# zlib level for PNG output: about the size of the default (6) in two thirds of the time
+PNG_COMPRESS_LEVEL = 3
+
+
+class RenderQueueFull(Exception):
+    """Raised when too many renders are already waiting"""
+
 
 class ImageGenerator:
     """Generates images for feedback and ballot displays"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        workers: int = Config.IMAGE_RENDER_WORKERS,
+        max_queue: int = Config.IMAGE_RENDER_QUEUE,
+    ):
         self.assets_path = Path(__file__).parent.parent.parent / "assets"
         self.fonts_path = self.assets_path / "fonts" / "segoe ui"
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._local = threading.local()  # per-thread font cache
+        self._backgrounds: Dict[Tuple[str, int, int], Optional[Image.Image]] = {}
+        self._backgrounds_lock = threading.Lock()
+        # Render metrics
+        self.in_flight = 0
+        self.waiting = 0
+        self.rendered = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_wait = LatencyHistogram()
+        self.render_times: Dict[str, LatencyHistogram] = {}
         
     def get_font(self, size=20, bold=False, italic=False):
-        """Get font with specified properties"""
+        """Get font with specified properties (cached per thread)"""
+        fonts = getattr(self._local, "fonts", None)
+        if fonts is None:
+            fonts = self._local.fonts = {}
+        key = (size, bold, italic)
+        font = fonts.get(key)
+        if font is None:
+            font = fonts[key] = self._load_font(size, bold, italic)
+        return font
+
+    def _load_font(self, size, bold, italic):
+        """Load a font file, falling back to Pillow's default font"""
         font_name = "regular.ttf"
         
         if bold and italic:
@@ -34,6 +86,25 @@ class ImageGenerator:
         except (OSError, IOError):
             # Fallback to default font
             return ImageFont.load_default()
+
+    def _background(self, name, size):
+        """Decoded and resized background template, or None if unavailable"""
+        key = (name, *size)
+        if key in self._backgrounds:
+            return self._backgrounds[key]
+        with self._backgrounds_lock:
+            if key not in self._backgrounds:
+                background = None
+                bg_path = self.assets_path / name
+                if bg_path.exists():
+                    try:
+                        with Image.open(bg_path) as bg_img:
+                            background = bg_img.resize(size)
+                            background.load()
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        background = None  # Use plain background
+                self._backgrounds[key] = background
+            return self._backgrounds[key]
     
     def create_feedback_image(self, round_name, oralist_name, score, feedback_text=""):
         """Create a feedback image"""
@@ -45,15 +116,10 @@ class ImageGenerator:
         draw = ImageDraw.Draw(img)
         
         # Load background template if available
-        bg_path = self.assets_path / "feedback.png"
-        if bg_path.exists():
-            try:
-                bg_img = Image.open(bg_path)
-                bg_img = bg_img.resize((width, height))
-                img.paste(bg_img, (0, 0))
-                draw = ImageDraw.Draw(img)
-            except Exception:
-                pass  # Use plain background
+        bg_img = self._background("feedback.png", (width, height))
+        if bg_img is not None:
+            img.paste(bg_img, (0, 0))
+            draw = ImageDraw.Draw(img)
         
         # Colors
         title_color = (33, 37, 41)
@@ -100,7 +166,7 @@ class ImageGenerator:
         
         # Convert to bytes
         img_bytes = io.BytesIO()
-        img.save(img_bytes, format='PNG')
+        img.save(img_bytes, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
         img_bytes.seek(0)
         
         return img_bytes
@@ -114,15 +180,10 @@ class ImageGenerator:
         draw = ImageDraw.Draw(img)
         
         # Load ballot background if available
-        bg_path = self.assets_path / "ballot.png"
-        if bg_path.exists():
-            try:
-                bg_img = Image.open(bg_path)
-                bg_img = bg_img.resize((width, height))
-                img.paste(bg_img, (0, 0))
-                draw = ImageDraw.Draw(img)
-            except Exception:
-                pass
+        bg_img = self._background("ballot.png", (width, height))
+        if bg_img is not None:
+            img.paste(bg_img, (0, 0))
+            draw = ImageDraw.Draw(img)
         
         # Colors
         title_color = (33, 37, 41)
@@ -161,7 +222,7 @@ class ImageGenerator:
         
         # Convert to bytes
         img_bytes = io.BytesIO()
-        img.save(img_bytes, format='PNG')
+        img.save(img_bytes, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
         img_bytes.seek(0)
         
         return img_bytes
@@ -171,16 +232,23 @@ class ImageGenerator:
         words = text.split()
         lines = []
         current_line = []
+        # Measure each word once instead of re-measuring the growing line
+        space_width = font.getlength(' ')
+        line_width = 0
         
         for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = font.getbbox(test_line)
-            if bbox[2] - bbox[0] <= max_width:
+            word_width = font.getlength(word)
+            test_width = word_width
+            if current_line:
+                test_width += line_width + space_width
+            if test_width <= max_width:
                 current_line.append(word)
+                line_width = test_width
             else:
                 if current_line:
                     lines.append(' '.join(current_line))
                     current_line = [word]
+                    line_width = word_width
                 else:
                     # Word is too long, add it anyway
                     lines.append(word)
@@ -190,5 +258,102 @@ class ImageGenerator:
         
         return lines
 
+    # ==================== ASYNC RENDERING ====================
+
+    async def render_feedback(self, round_name, oralist_name, score, feedback_text=""):
+        """Render a feedback image off the event loop"""
+        return await self._render(
+            "feedback",
+            self.create_feedback_image,
+            round_name,
+            oralist_name,
+            score,
+            feedback_text,
+        )
+
+    async def render_ballot(self, motion, teams_data, judges_data=None):
+        """Render a ballot image off the event loop"""
+        return await self._render(
+            "ballot", self.create_ballot_image, motion, teams_data, judges_data
+        )
+
+    async def render_ballots(self, ballots: Iterable[Dict[str, Any]]) -> List[Any]:
+        """
+        Render many ballots (e.g. a whole round) in parallel.
+
+        Each ballot is a dict with ``motion``, ``teams_data`` and optional
+        ``judges_data``. Results keep the input order; a ballot that failed
+        to render is returned as its exception.
+        """
+        return await asyncio.gather(
+            *(
+                self.render_ballot(
+                    ballot["motion"], ballot["teams_data"], ballot.get("judges_data")
+                )
+                for ballot in ballots
+            ),
+            return_exceptions=True,
+        )
+
+    async def _render(self, kind: str, render: Callable[..., Any], *args):
+        """Queue a render for the pool, at most ``workers`` at a time"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="image-render"
+            )
+            self._slots = asyncio.Semaphore(self.workers)
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull(f"{self.waiting} image renders already waiting")
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.queue_wait.observe((time.perf_counter() - queued) * 1000)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, render, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        histogram = self.render_times.get(kind)
+        if histogram is None:
+            histogram = self.render_times[kind] = LatencyHistogram()
+        histogram.observe((time.perf_counter() - started) * 1000)
+        self.rendered += 1
+        return result
+
+    def close(self):
+        """Stop the render threads once queued renders finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return render pool counters and per-kind render times"""
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.summary(),
+            "render": {
+                kind: histogram.summary()
+                for kind, histogram in self.render_times.items()
+            },
+        }
+
 # Global image generator instance
 image_generator = ImageGenerator()
@@ -0,0 +1,229 @@
+"""
+Invite Tracker
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Works out which invite a new member used. The invite list of each tracked
+guild is fetched once and then kept current from invite create/delete
+events. A join is attributed from that state when only one invite could
+have been used; otherwise the invites are re-fetched, and joins that land
+within a short window share that one fetch.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+import discord
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# An invite deleted this soon before a join, right at its use limit, was
+# most likely used up by that join
+EXHAUSTED_INVITE_SECONDS = 10.0
+
+
+class TrackedInvite:
+    """Use count and owner of one invite"""
+
+    __slots__ = ("code", "uses", "max_uses", "inviter", "expires_at")
+
+    def __init__(self, invite: discord.Invite):
+        self.code = invite.code
+        self.uses = invite.uses or 0
+        self.max_uses = invite.max_uses or 0
+        self.inviter = invite.inviter
+        self.expires_at: Optional[datetime] = invite.expires_at
+
+    def usable(self) -> bool:
+        """Whether the invite can still bring members in"""
+        if self.max_uses and self.uses >= self.max_uses:
+            return False
+        return self.expires_at is None or self.expires_at > datetime.now(timezone.utc)
+
+
+class _PendingRefetch:
+    """Joins of one guild waiting for the same invite fetch"""
+
+    __slots__ = ("joins", "future")
+
+    def __init__(self, future: asyncio.Future):
+        self.joins = 0
+        self.future = future
+
+
+class InviteTracker:
+    """Per-guild invite state for join attribution"""
+
+    def __init__(
+        self,
+        debounce: float = Config.INVITE_REFETCH_DELAY,
+        concurrency: int = Config.INVITE_WARMUP_CONCURRENCY,
+    ):
+        self.debounce = debounce
+        self.concurrency = concurrency
+        self._guilds: Dict[int, Dict[str, TrackedInvite]] = {}
+        self._exhausted: Dict[int, Deque[tuple]] = {}  # (monotonic, invite)
+        self._pending: Dict[int, _PendingRefetch] = {}
+        self.fetches: int = 0
+        self.resolved_from_state: int = 0
+        self.resolved_by_fetch: int = 0
+        self.unresolved: int = 0
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._guilds
+
+    # ==================== STATE ====================
+
+    async def load(self, guild: discord.Guild) -> bool:
+        """Fetch a guild's invites and start tracking it"""
+        invites = await self._fetch(guild)
+        if invites is None:
+            return False
+        self._guilds[guild.id] = invites
+        return True
+
+    async def warm_up(self, guilds: Iterable[discord.Guild]) -> int:
+        """Load several guilds concurrently, a few requests at a time"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def load_one(guild: discord.Guild) -> bool:
+            async with semaphore:
+                return await self.load(guild)
+
+        results = await asyncio.gather(*(load_one(guild) for guild in guilds))
+        return sum(results)
+
+    def forget(self, guild_id: int):
+        """Stop tracking a guild"""
+        self._guilds.pop(guild_id, None)
+        self._exhausted.pop(guild_id, None)
+
+    def on_create(self, invite: discord.Invite):
+        """Record a new invite of a tracked guild"""
+        invites = self._guilds.get(getattr(invite.guild, "id", None))
+        if invites is not None:
+            invites[invite.code] = TrackedInvite(invite)
+
+    def on_delete(self, invite: discord.Invite):
+        """Drop a deleted invite, remembering it if it was used up"""
+        guild_id = getattr(invite.guild, "id", None)
+        invites = self._guilds.get(guild_id)
+        if invites is None:
+            return
+        tracked = invites.pop(invite.code, None)
+        if tracked is not None and tracked.max_uses:
+            if tracked.uses + 1 >= tracked.max_uses:
+                exhausted = self._exhausted.setdefault(guild_id, deque(maxlen=10))
+                exhausted.append((time.monotonic(), tracked))
+
+    async def _fetch(self, guild: discord.Guild) -> Optional[Dict[str, TrackedInvite]]:
+        """Fetch every invite of a guild, or None without permission"""
+        self.fetches += 1
+        try:
+            invites = await guild.invites()
+        except discord.Forbidden:
+            return None  # No permission to view invites
+        except discord.HTTPException as e:
+            logger.warning("Failed to fetch invites of %s: %s", guild.id, e)
+            return None
+        return {invite.code: TrackedInvite(invite) for invite in invites}
+
+    # ==================== ATTRIBUTION ====================
+
+    async def resolve(self, guild: discord.Guild) -> Optional[TrackedInvite]:
+        """Return the invite a member who just joined most likely used"""
+        invites = self._guilds.get(guild.id)
+        if invites is None:
+            # Tracking was just enabled; start from the next join
+            await self.load(guild)
+            return None
+
+        invite = self._from_state(guild, invites)
+        if invite is not None:
+            self.resolved_from_state += 1
+            return invite
+
+        invite = await self._refetch(guild)
+        if invite is None:
+            self.unresolved += 1
+        else:
+            self.resolved_by_fetch += 1
+        return invite
+
+    def _from_state(
+        self, guild: discord.Guild, invites: Dict[str, TrackedInvite]
+    ) -> Optional[TrackedInvite]:
+        """Attribute a join without a fetch when it is unambiguous"""
+        if guild.id in self._pending:
+            return None  # other joins are already waiting for a fetch
+
+        exhausted = self._exhausted.get(guild.id)
+        now = time.monotonic()
+        while exhausted:
+            deleted_at, invite = exhausted.popleft()
+            if now - deleted_at <= EXHAUSTED_INVITE_SECONDS:
+                invite.uses += 1
+                return invite
+
+        # Vanity URLs and discovery bring members in without a listed invite
+        if guild.vanity_url_code or "DISCOVERABLE" in guild.features:
+            return None
+        usable = [invite for invite in invites.values() if invite.usable()]
+        if len(usable) != 1:
+            return None
+        usable[0].uses += 1
+        return usable[0]
+
+    async def _refetch(self, guild: discord.Guild) -> Optional[TrackedInvite]:
+        """Diff a fresh invite list, shared by joins within the debounce window"""
+        pending = self._pending.get(guild.id)
+        if pending is None:
+            pending = _PendingRefetch(asyncio.get_running_loop().create_future())
+            self._pending[guild.id] = pending
+            asyncio.create_task(self._run_refetch(guild, pending))
+        pending.joins += 1
+        return await asyncio.shield(pending.future)
+
+    async def _run_refetch(self, guild: discord.Guild, pending: _PendingRefetch):
+        """Fetch once after the window and settle every waiting join"""
+        result: Optional[TrackedInvite] = None
+        try:
+            await asyncio.sleep(self.debounce)
+            del self._pending[guild.id]
+            previous = self._guilds.get(guild.id, {})
+            current = await self._fetch(guild)
+            if current is None:
+                return
+            self._guilds[guild.id] = current
+
+            used: List[TrackedInvite] = [
+                invite
+                for code, invite in current.items()
+                if invite.uses > getattr(previous.get(code), "uses", 0)
+            ]
+            # Only a single invite explains every join in the window
+            if len(used) == 1:
+                result = used[0]
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Invite refetch for %s failed: %s", guild.id, e)
+        finally:
+            self._pending.pop(guild.id, None)
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return tracker counters"""
+        return {
+            "guilds": len(self._guilds),
+            "invites": sum(len(invites) for invites in self._guilds.values()),
+            "fetches": self.fetches,
+            "resolved_from_state": self.resolved_from_state,
+            "resolved_by_fetch": self.resolved_by_fetch,
+            "unresolved": self.unresolved,
+        }
@@ -0,0 +1,201 @@
+"""
+Member Join Pipeline
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+A member join used to wake four cogs, each of which fetched its own
+settings and called ``add_roles`` on its own. Now a single listener builds
+one ``JoinContext`` with every per-guild join setting, lets each cog add
+the roles it wants, applies them in one ``add_roles`` call and then runs
+the remaining side effects (welcome message, role prompt, join log)
+concurrently.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Role providers add roles to the context (and may be coroutines); effects
+# run after roles are applied
+RoleProvider = Callable[["JoinContext"], Any]
+JoinEffect = Callable[["JoinContext"], Awaitable[Any]]
+
+
+class JoinContext:
+    """Everything the join handlers of one member need"""
+
+    __slots__ = (
+        "member",
+        "guild",
+        "settings",
+        "config",
+        "logging_config",
+        "language",
+        "roles",
+        "reasons",
+        "applied",
+    )
+
+    def __init__(
+        self,
+        member: discord.Member,
+        settings: Optional[Dict[str, Any]],
+        config: Optional[Dict[str, Any]],
+        logging_config: Optional[Dict[str, Any]],
+        language: str,
+    ):
+        self.member = member
+        self.guild = member.guild
+        self.settings = settings  # legacy ``guilds`` document
+        self.config = config  # ``guild_configs`` document
+        self.logging_config = logging_config
+        self.language = language
+        self.roles: Dict[int, discord.Role] = {}
+        self.reasons: List[str] = []
+        self.applied: List[discord.Role] = []
+
+    def add_role(self, role_id: Optional[int], reason: str) -> bool:
+        """Queue a role for the member if it exists and the bot can assign it"""
+        if not role_id or role_id in self.roles:
+            return False
+        role = self.guild.get_role(role_id)
+        if role is None or role.is_default() or role.managed:
+            return False
+        if role >= self.guild.me.top_role:
+            return False
+        self.roles[role.id] = role
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+        return True
+
+
+class JoinPipeline:
+    """Fan-out dispatcher for ``on_member_join``"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._providers: Dict[str, RoleProvider] = {}
+        self._effects: Dict[str, JoinEffect] = {}
+        self.joins: int = 0
+        self.role_calls: int = 0
+        self.failures: int = 0
+        self.total_seconds: float = 0.0
+
+    def register(
+        self,
+        name: str,
+        roles: Optional[RoleProvider] = None,
+        effect: Optional[JoinEffect] = None,
+    ):
+        """
+        Register a cog's join handlers under ``name``.
+
+        Args:
+            name: Owner of the handlers; registering again replaces them
+            roles: Called (or awaited) with the context to add roles via
+                ``add_role``
+            effect: Coroutine run after roles were applied
+        """
+        self.unregister(name)
+        if roles is not None:
+            self._providers[name] = roles
+        if effect is not None:
+            self._effects[name] = effect
+
+    def unregister(self, name: str):
+        """Remove a cog's join handlers"""
+        self._providers.pop(name, None)
+        self._effects.pop(name, None)
+
+    async def build_context(self, member: discord.Member) -> JoinContext:
+        """Load every join setting of the member's guild at once"""
+        cache = self.bot.guild_settings
+        guild_id = member.guild.id
+        settings, config, logging_config, language = await asyncio.gather(
+            cache.get("guilds", guild_id),
+            cache.get("guild_configs", guild_id),
+            cache.get("logging_configs", guild_id),
+            cache.get_language(guild_id),
+        )
+        return JoinContext(member, settings, config, logging_config, language)
+
+    async def handle(self, member: discord.Member):
+        """Run the whole join pipeline for one member"""
+        started = time.perf_counter()
+        self.joins += 1
+        context = await self.build_context(member)
+
+        for name, provider in list(self._providers.items()):
+            try:
+                result = provider(context)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.failures += 1
+                logger.error("Join role handler %s failed: %s", name, exc)
+
+        await self._apply_roles(context)
+
+        effects: List[Tuple[str, Awaitable[Any]]] = [
+            (name, effect(context)) for name, effect in list(self._effects.items())
+        ]
+        results = await asyncio.gather(
+            *(coro for _, coro in effects), return_exceptions=True
+        )
+        for (name, _), result in zip(effects, results):
+            if isinstance(result, Exception):
+                self.failures += 1
+                logger.error(
+                    "Join handler %s failed for %s: %s",
+                    name,
+                    member,
+                    result,
+                    exc_info=result,
+                )
+
+        self.total_seconds += time.perf_counter() - started
+
+    async def _apply_roles(self, context: JoinContext):
+        """Give the member every queued role in a single request"""
+        member_roles = {role.id for role in context.member.roles}
+        roles = [role for role in context.roles.values() if role.id not in member_roles]
+        if not roles:
+            return
+
+        self.role_calls += 1
+        try:
+            await context.member.add_roles(*roles, reason="; ".join(context.reasons))
+            context.applied = roles
+            logger.info(
+                "Assigned %d join role(s) to %s in %s",
+                len(roles),
+                context.member,
+                context.guild,
+            )
+        except discord.Forbidden:
+            self.failures += 1
+            logger.warning(
+                "Cannot assign join roles in %s - insufficient permissions",
+                context.guild,
+            )
+        except discord.HTTPException as exc:
+            self.failures += 1
+            logger.error("Error assigning join roles to %s: %s", context.member, exc)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pipeline counters"""
+        return {
+            "joins": self.joins,
+            "role_calls": self.role_calls,
+            "failures": self.failures,
+            "handlers": sorted(set(self._providers) | set(self._effects)),
+            "avg_ms": (
+                round(self.total_seconds / self.joins * 1000, 3) if self.joins else 0.0
+            ),
+        }
@@ -2,110 +2,293 @@
 Language and localization utilities
 Author: aldinn
 Email: kferdoush617@gmail.com
+
+The motion bank is loaded lazily: local files are read on first use, and
+Google Sheets are fetched with aiohttp in a background task that refreshes
+them periodically (conditional requests with ETag / Last-Modified). A
+refresh builds a complete new dataset and swaps it in at once, so motion
+commands never wait on the network or see a half-loaded bank. Each
+language is held in an indexed ``MotionStore`` (see motion_store.py), and
+every load or refresh is saved as a snapshot that the next start reuses
+while its source is unchanged (see motion_snapshot.py).
 """
 
-import random
-from pathlib import Path
+import asyncio
 import csv
+import logging
+import time
 from io import StringIO
-import requests
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
 from config.settings import Config
+from src.utils.motion_snapshot import file_fingerprint, load_snapshot, save_snapshot
+from src.utils.motion_store import MotionStore
+
+logger = logging.getLogger(__name__)
+
+# language -> indexed motions
+MotionData = Dict[str, MotionStore]
+
+# Column names that may hold topic tags; tags continue in the columns after
+TOPIC_COLUMNS = ("topics", "topic", "tags")
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
 
 
 class LanguageManager:
     """Manages language support and motion generation"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        refresh_interval: int = Config.MOTIONS_REFRESH_INTERVAL,
+        snapshot_path: str = Config.MOTIONS_SNAPSHOT_PATH,
+    ):
         self.supported_languages = ["english", "bangla"]
-        # motions[language] -> list of entries: { 'text': str, 'info': Optional[str] }
-        self.motions = {}
-        self.load_motions()
+        self.motions: MotionData = {}
+        self.source: Optional[str] = None  # "csv", "sheets" or "txt"
+        self.refresh_interval = refresh_interval
+        self.snapshot_path = PROJECT_ROOT / snapshot_path if snapshot_path else None
+        self.from_snapshot = False
+        self._loaded = False
+        # url -> (etag, last modified, rows) of the last successful fetch
+        self._validators: Dict[str, Tuple[str, str, list]] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refreshes: int = 0
+        self.not_modified: int = 0
+        self.refresh_failures: int = 0
+        self.last_refresh: Optional[float] = None
+
+    # ==================== LOADING ====================
+
+    def ensure_loaded(self):
+        """Load the local motion files the first time motions are needed"""
+        if not self._loaded:
+            self.load_motions()
 
     def load_motions(self):
-        """Load motions from local CSVs (English.csv, Bangla.csv) if present, else fallback to Google Sheets or txt."""
-        project_root = Path(__file__).parent.parent.parent
+        """Load motions from local CSVs (English.csv, Bangla.csv), else the txt files."""
         csv_files = {
-            "english": project_root / "data" / "English.csv",
-            "bangla": project_root / "data" / "Bangla.csv",
+            "english": PROJECT_ROOT / "data" / "English.csv",
+            "bangla": PROJECT_ROOT / "data" / "Bangla.csv",
         }
-        loaded_any = False
+        fingerprint = file_fingerprint(csv_files.values())
+        if fingerprint and self._restore_snapshot("csv", fingerprint):
+            return
+        if not fingerprint and any(self._sheet_urls()):
+            # Start from the last fetched sheets; the refresh revalidates them
+            if self._restore_snapshot("sheets", self._sheet_urls()):
+                return
+
+        motions: MotionData = {}
         for lang, path in csv_files.items():
             if path.exists():
-                with open(path, "r", encoding="utf-8") as f:
-                    reader = csv.DictReader(f)
-                    motions = []
-                    for row in reader:
-                        motion = (row.get("MOTION") or "").strip()
-                        info = (
-                            row.get("INFO SLIDE (IF APPLICABLE)") or ""
-                        ).strip() or None
-                        if motion:
-                            motions.append({"text": motion, "info": info})
-                    self.motions[lang] = motions
-                    loaded_any = True
-        if loaded_any:
-            return
-        # Fallback to Google Sheets or txt as before
-        combined = getattr(Config, "MOTIONS_CSV_URL_COMBINED", None)
-        en_url = getattr(Config, "MOTIONS_CSV_URL_ENGLISH", None)
-        bn_url = getattr(Config, "MOTIONS_CSV_URL_BANGLA", None)
-        if combined:
-            try:
-                data = self._fetch_csv(combined)
-                self._load_from_combined_csv(data)
-                loaded_any = any(
-                    self.motions.get(lang) for lang in self.supported_languages
-                )
-            except requests.exceptions.RequestException as e:
-                print(f"⚠️ Failed to fetch combined CSV: {e}")
-            except ValueError as e:
-                print(f"⚠️ Failed to parse combined CSV: {e}")
-        if not loaded_any and (en_url or bn_url):
-            try:
-                if en_url:
-                    en_data = self._fetch_csv(en_url)
-                    self.motions["english"] = self._extract_motions_from_simple_csv(
-                        en_data
-                    )
-                if bn_url:
-                    bn_data = self._fetch_csv(bn_url)
-                    self.motions["bangla"] = self._extract_motions_from_simple_csv(
-                        bn_data
-                    )
-                loaded_any = any(
-                    self.motions.get(lang) for lang in self.supported_languages
-                )
-            except requests.exceptions.RequestException as e:
-                print(f"⚠️ Failed to fetch per-language CSVs: {e}")
-            except ValueError as e:
-                print(f"⚠️ Failed to parse per-language CSVs: {e}")
-        if not loaded_any:
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    rows = list(csv.reader(f))
+                motions[lang] = self._load_local_csv(rows)
+
+        source = "csv"
+        if not motions:
+            # Placeholder until the sheets (if configured) have been fetched
+            source = "txt"
             for language in self.supported_languages:
-                file_path = project_root / "data" / f"{language}.txt"
+                file_path = PROJECT_ROOT / "data" / f"{language}.txt"
                 if file_path.exists():
+                    store = MotionStore()
                     with open(file_path, "r", encoding="utf-8") as f:
-                        self.motions[language] = [
-                            {"text": line.strip(), "info": None}
-                            for line in f.readlines()
-                            if line.strip()
-                        ]
+                        for line in f:
+                            if line.strip():
+                                store.add(line.strip())
+                    motions[language] = store
                 else:
-                    self.motions[language] = []
-
-    def _fetch_csv(self, url: str) -> list[list[str]]:
-        """Fetch CSV data from a URL and return rows as list of lists"""
-        headers = {"User-Agent": "HearHearBot/2.0 (language manager)"}
-        resp = requests.get(url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        # Google Sheets exported CSV is UTF-8 by default
-        content = resp.text
-        reader = csv.reader(StringIO(content))
-        return [row for row in reader]
-
-    def _load_from_combined_csv(self, rows: list[list[str]]):
+                    motions[language] = MotionStore()
+
+        self._swap(motions, source)
+        if source == "csv":
+            self._save_snapshot("csv", fingerprint, {"motions": motions})
+
+    def _restore_snapshot(self, source: str, fingerprint: Any) -> bool:
+        """Swap in a current snapshot of ``source``; False if there is none"""
+        if self.snapshot_path is None:
+            return False
+        snapshot = load_snapshot(self.snapshot_path, fingerprint, source)
+        if snapshot is None:
+            return False
+        _, payload = snapshot
+        self._validators = payload.get("validators", {})
+        self._swap(payload["motions"], source)
+        self.from_snapshot = True
+        return True
+
+    def _save_snapshot(self, source: str, fingerprint: Any, payload: Dict[str, Any]):
+        """Write the current bank for the next start"""
+        if self.snapshot_path is not None:
+            save_snapshot(self.snapshot_path, source, fingerprint, payload)
+
+    def _swap(self, motions: MotionData, source: str):
+        """Replace the whole motion bank in one step"""
+        self.motions = motions
+        self.source = source
+        self._loaded = True
+
+    def _sheet_urls(self) -> Tuple[str, str, str]:
+        """Configured Google Sheets CSV URLs (combined, English, Bangla)"""
+        return (
+            getattr(Config, "MOTIONS_CSV_URL_COMBINED", None) or "",
+            getattr(Config, "MOTIONS_CSV_URL_ENGLISH", None) or "",
+            getattr(Config, "MOTIONS_CSV_URL_BANGLA", None) or "",
+        )
+
+    # ==================== BACKGROUND REFRESH ====================
+
+    def start(self):
+        """Start loading motions, and refreshing the sheets, in the background"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        """Read local files off the event loop, then keep the sheets current"""
+        await asyncio.to_thread(self.ensure_loaded)
+        # Local CSVs take precedence over the sheets, as before
+        if self.source == "csv" or not any(self._sheet_urls()):
+            return
+        while True:
+            await self.refresh()
+            if self.refresh_interval <= 0:
+                return
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the sheets and swap in the new motion bank if they changed.
+
+        Returns:
+            True if a new dataset was swapped in
+        """
+        combined, en_url, bn_url = self._sheet_urls()
+        motions: MotionData = {}
+        changed = False
+        try:
+            if combined:
+                rows, changed = await self._fetch_csv(combined)
+                motions = await asyncio.to_thread(self._load_from_combined_csv, rows)
+            if not any(motions.get(lang) for lang in self.supported_languages):
+                motions = {}
+                for language, url in (("english", en_url), ("bangla", bn_url)):
+                    if url:
+                        rows, url_changed = await self._fetch_csv(url)
+                        changed = changed or url_changed
+                        motions[language] = await asyncio.to_thread(
+                            self._extract_motions_from_simple_csv, rows
+                        )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.refresh_failures += 1
+            logger.warning("⚠️ Failed to fetch motion sheets: %s", e)
+            return False
+        except ValueError as e:
+            self.refresh_failures += 1
+            logger.warning("⚠️ Failed to parse motion sheets: %s", e)
+            return False
+
+        self.last_refresh = time.time()
+        if not any(motions.get(lang) for lang in self.supported_languages):
+            return False
+        if not changed and self.source == "sheets":
+            self.not_modified += 1
+            return False
+
+        self._swap(motions, "sheets")
+        self.from_snapshot = False
+        self.refreshes += 1
+        await asyncio.to_thread(
+            self._save_snapshot,
+            "sheets",
+            self._sheet_urls(),
+            {"motions": motions, "validators": dict(self._validators)},
+        )
+        logger.info(
+            "📚 Motion bank refreshed: %s",
+            ", ".join(f"{lang} {len(store)}" for lang, store in motions.items()),
+        )
+        return True
+
+    async def _fetch_csv(self, url: str) -> Tuple[list[list[str]], bool]:
+        """
+        Fetch CSV data from a URL as a list of rows.
+
+        Returns:
+            The rows and whether they changed since the last fetch
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15),
+                headers={"User-Agent": "HearHearBot/2.0 (language manager)"},
+            )
+
+        headers = {}
+        etag, last_modified, cached_rows = self._validators.get(url, ("", "", []))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._session.get(url, headers=headers) as resp:
+            if resp.status == 304 and url in self._validators:
+                return cached_rows, False
+            resp.raise_for_status()
+            # Google Sheets exported CSV is UTF-8 by default
+            content = await resp.text(encoding="utf-8")
+            rows = await asyncio.to_thread(lambda: list(csv.reader(StringIO(content))))
+            changed = rows != cached_rows
+            self._validators[url] = (
+                resp.headers.get("ETag", ""),
+                resp.headers.get("Last-Modified", ""),
+                rows,
+            )
+            return rows, changed
+
+    async def close(self):
+        """Stop refreshing and close the HTTP session"""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    # ==================== PARSING ====================
+
+    def _load_local_csv(self, rows: list[list[str]]) -> MotionStore:
+        """Parse data/<Language>.csv: MOTION, INFO SLIDE (IF APPLICABLE) and Topics"""
+        store = MotionStore()
+        if not rows:
+            return store
+        header = [h.strip().upper() for h in rows[0]]
+        if "MOTION" not in header:
+            return store
+        motion_idx = header.index("MOTION")
+        info_idx = (
+            header.index("INFO SLIDE (IF APPLICABLE)")
+            if "INFO SLIDE (IF APPLICABLE)" in header
+            else None
+        )
+        topics_idx = _topics_column([h.lower() for h in header])
+        for row in rows[1:]:
+            motion = (row[motion_idx] if motion_idx < len(row) else "").strip()
+            if not motion:
+                continue
+            info = (
+                row[info_idx] if info_idx is not None and info_idx < len(row) else ""
+            ).strip() or None
+            store.add(motion, info, _row_topics(row, topics_idx))
+        return store
+
+    def _load_from_combined_csv(self, rows: list[list[str]]) -> MotionData:
         """Parse a combined CSV with headers including 'language', 'motion' and optional 'info'/'info slide'"""
+        motions: MotionData = {}
         if not rows:
-            return
+            return motions
         # Detect header row
         header = [h.strip().lower() for h in rows[0]]
         data_rows = rows[1:] if header else rows
@@ -127,6 +310,7 @@ class LanguageManager:
                 break
             except ValueError:
                 info_idx = None
+        topics_idx = _topics_column(header)
 
         # If no header or columns unmatched, attempt heuristic: two columns [language, motion]
         if lang_idx is None or motion_idx is None:
@@ -139,8 +323,8 @@ class LanguageManager:
                 info = None
                 if len(row) >= 3:
                     info = (row[1] or "").strip() or None
-                self._maybe_add_motion(language, motion, info)
-            return
+                self._maybe_add_motion(motions, language, motion, info)
+            return motions
 
         for row in data_rows:
             if not row:
@@ -158,11 +342,14 @@ class LanguageManager:
             info = (
                 row[info_idx] if info_idx is not None and info_idx < len(row) else ""
             ).strip() or None
-            self._maybe_add_motion(language, motion, info)
+            self._maybe_add_motion(
+                motions, language, motion, info, _row_topics(row, topics_idx)
+            )
+        return motions
 
-    def _extract_motions_from_simple_csv(self, rows: list[list[str]]) -> list[dict]:
+    def _extract_motions_from_simple_csv(self, rows: list[list[str]]) -> MotionStore:
         """Parse a simple CSV; motion is the first non-empty cell; optional info in a column named 'info' or 'info slide' if present"""
-        motions: list[dict] = []
+        motions = MotionStore()
         if not rows:
             return motions
         # Check if first row is a header with 'motion'
@@ -173,6 +360,7 @@ class LanguageManager:
             else 0
         )
         info_idx = None
+        topics_idx = None
         if start_idx == 1:
             for name in ("info slide", "info"):
                 try:
@@ -180,6 +368,7 @@ class LanguageManager:
                     break
                 except ValueError:
                     info_idx = None
+            topics_idx = _topics_column(header)
         for row in rows[start_idx:]:
             if not row:
                 continue
@@ -189,10 +378,17 @@ class LanguageManager:
             if info_idx is not None and info_idx < len(row):
                 info = (row[info_idx] or "").strip() or None
             if text:
-                motions.append({"text": text, "info": info})
+                motions.add(text, info, _row_topics(row, topics_idx))
         return motions
 
-    def _maybe_add_motion(self, language: str, motion: str, info: str | None = None):
+    def _maybe_add_motion(
+        self,
+        motions: MotionData,
+        language: str,
+        motion: str,
+        info: str | None = None,
+        topics: List[str] | None = None,
+    ):
         if not language or not motion:
             return
         # Normalize language keys to supported names
@@ -202,49 +398,108 @@ class LanguageManager:
         elif language in ("bangla", "bn", "bengali", "bangla/bengali"):
             key = "bangla"
         if key and key in self.supported_languages:
-            self.motions.setdefault(key, []).append({"text": motion, "info": info})
+            if key not in motions:
+                motions[key] = MotionStore()
+            motions[key].add(motion, info, topics or ())
+
+    # ==================== MOTIONS ====================
 
     def get_random_motion(self, language="english"):
         """Get a random motion in the specified language"""
-        if language not in self.motions or not self.motions[language]:
+        entry = self.get_random_motion_entry(language)
+        if entry is None:
             return "No motions available for this language."
-
-        entry = random.choice(self.motions[language])
         # Backward compatibility: return the text string
-        return entry.get("text") if isinstance(entry, dict) else str(entry)
+        return entry["text"]
+
+    def get_random_motion_entry(self, language="english", topic=None):
+        """Return a random motion entry with keys: text, info, topics. None if unavailable."""
+        self.ensure_loaded()
+        store = self.motions.get(language)
+        if store is None:
+            return None
+        motion_id = store.random_id(topic)
+        return store.entry(motion_id) if motion_id is not None else None
 
-    def get_random_motion_entry(self, language="english"):
-        """Return a random motion entry with keys: text, info. None if unavailable."""
-        items = self.motions.get(language) or []
-        if not items:
+    def get_motion_entry(self, language, motion_id):
+        """Return the motion with a given id (as drawn from a deck), or None"""
+        self.ensure_loaded()
+        store = self.motions.get(language)
+        if store is None or not 0 <= motion_id < len(store):
             return None
-        entry = random.choice(items)
-        if isinstance(entry, dict):
-            return {"text": entry.get("text"), "info": entry.get("info")}
-        # For legacy formats
-        return {"text": str(entry), "info": None}
+        return store.entry(motion_id)
+
+    def search_motions(self, language, query, limit=10):
+        """Return up to ``limit`` motion entries containing every word of a query"""
+        self.ensure_loaded()
+        store = self.motions.get(language)
+        if store is None:
+            return []
+        return [store.entry(motion_id) for motion_id in store.search(query, limit)]
+
+    def get_topics(self, language):
+        """Get the topic tags of a language's motions"""
+        self.ensure_loaded()
+        store = self.motions.get(language)
+        return store.topic_names() if store is not None else []
 
     def get_available_languages(self):
         """Get list of available languages"""
+        self.ensure_loaded()
         return [lang for lang in self.supported_languages if self.motions.get(lang)]
 
     def add_motion(self, language, motion, info=None):
         """Add a new motion to a language. Accepts motion text and optional info slide."""
+        self.ensure_loaded()
         if language not in self.motions:
-            self.motions[language] = []
+            self.motions[language] = MotionStore()
+        topics = ()
         if isinstance(motion, dict):
             text = motion.get("text")
             info_val = motion.get("info")
+            topics = motion.get("topics") or ()
         else:
             text = str(motion) if motion is not None else None
             info_val = info
         if text:
-            self.motions[language].append({"text": text, "info": info_val})
+            self.motions[language].add(text, info_val, topics)
 
     def get_motion_count(self, language):
         """Get the number of motions for a language"""
-        return len(self.motions.get(language, []))
+        self.ensure_loaded()
+        store = self.motions.get(language)
+        return len(store) if store is not None else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return motion bank counters"""
+        return {
+            "loaded": self._loaded,
+            "source": self.source,
+            "from_snapshot": self.from_snapshot,
+            "motions": {
+                lang: store.get_stats() for lang, store in self.motions.items()
+            },
+            "refreshes": self.refreshes,
+            "not_modified": self.not_modified,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh": self.last_refresh,
+        }
+
+
+def _topics_column(header: List[str]) -> Optional[int]:
+    """Index of the first topic column of a lowercased header row"""
+    for name in TOPIC_COLUMNS:
+        if name in header:
+            return header.index(name)
+    return None
+
+
+def _row_topics(row: List[str], topics_idx: Optional[int]) -> List[str]:
+    """Non-empty topic cells from the topic column to the end of the row"""
+    if topics_idx is None:
+        return []
+    return [cell.strip() for cell in row[topics_idx:] if cell and cell.strip()]
 
 
-# Global language manager instance
+# Global language manager instance (loads nothing until first use)
 language_manager = LanguageManager()
@@ -0,0 +1,199 @@
+"""
+Log Dispatcher
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Server log embeds are queued per channel and sent in batches of up to ten
+embeds per message instead of one message each, so bulk deletes, role
+sweeps and raids don't run every log channel into Discord's rate limits.
+Each channel queue is bounded; when it is full, ordinary entries are
+dropped first so moderation logs still get through.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import discord
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Discord limits for one message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS = 6000
+
+
+class _ChannelQueue:
+    """Pending log embeds of one channel"""
+
+    __slots__ = ("channel", "priority", "normal", "ready", "task")
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.priority: Deque[discord.Embed] = deque()
+        self.normal: Deque[discord.Embed] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.priority) + len(self.normal)
+
+    def take_batch(self) -> List[discord.Embed]:
+        """Pop the embeds for the next message, priority entries first"""
+        batch: List[discord.Embed] = []
+        characters = 0
+        for queue in (self.priority, self.normal):
+            while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+                size = len(queue[0])
+                if batch and characters + size > MAX_EMBED_CHARACTERS:
+                    return batch
+                batch.append(queue.popleft())
+                characters += size
+        return batch
+
+
+class LogDispatcher:
+    """
+    Per-channel batching queue for log embeds.
+
+    ``submit`` never waits for Discord: an embed is queued and the channel's
+    flush task sends it together with everything else that arrives within
+    ``window`` seconds. A full batch or a priority embed flushes at once.
+    """
+
+    def __init__(
+        self,
+        window: float = Config.LOG_BATCH_WINDOW,
+        max_queue: int = Config.LOG_QUEUE_SIZE,
+    ):
+        self.window = window
+        self.max_queue = max_queue
+        self._queues: Dict[int, _ChannelQueue] = {}
+        self.submitted: int = 0
+        self.messages_sent: int = 0
+        self.embeds_sent: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+        self.max_depth: int = 0
+        self._draining = False
+
+    def submit(
+        self,
+        channel: discord.abc.Messageable,
+        embed: discord.Embed,
+        priority: bool = False,
+    ) -> bool:
+        """
+        Queue a log embed for a channel.
+
+        Returns:
+            False if the embed was dropped because the queue was full
+        """
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = _ChannelQueue(channel)
+        queue.channel = channel
+        self.submitted += 1
+
+        if len(queue) >= self.max_queue:
+            # Shed the oldest ordinary entry; only a priority entry may
+            # push out another priority entry
+            if queue.normal:
+                queue.normal.popleft()
+            elif priority:
+                queue.priority.popleft()
+            else:
+                self.dropped += 1
+                return False
+            self.dropped += 1
+
+        (queue.priority if priority else queue.normal).append(embed)
+        self.max_depth = max(self.max_depth, len(queue))
+        if priority or len(queue) >= MAX_EMBEDS_PER_MESSAGE:
+            queue.ready.set()
+        if queue.task is None or queue.task.done():
+            queue.task = asyncio.create_task(self._flush(queue))
+        return True
+
+    async def _flush(self, queue: _ChannelQueue):
+        """Send a channel's queue in batches until it is empty"""
+        while len(queue):
+            if not queue.ready.is_set() and not self._draining:
+                try:
+                    await asyncio.wait_for(queue.ready.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+            queue.ready.clear()
+
+            while len(queue):
+                batch = queue.take_batch()
+                if not await self._send(queue, batch):
+                    break
+                if self._draining or queue.priority:
+                    continue
+                if len(queue) < MAX_EMBEDS_PER_MESSAGE:
+                    break  # let the next window fill up
+
+        if self._queues.get(queue.channel.id) is queue and not len(queue):
+            del self._queues[queue.channel.id]
+
+    async def _send(self, queue: _ChannelQueue, batch: List[discord.Embed]) -> bool:
+        """Send one batch; returns False if the channel is unusable"""
+        try:
+            # discord.py waits out rate limits here, which is the backpressure
+            # that lets the queue absorb bursts
+            await queue.channel.send(embeds=batch)
+            self.messages_sent += 1
+            self.embeds_sent += len(batch)
+            return True
+        except (discord.Forbidden, discord.NotFound) as e:
+            # The channel is gone or closed to us; drop everything queued
+            self.dropped += len(batch) + len(queue)
+            queue.priority.clear()
+            queue.normal.clear()
+            logger.warning("Dropping logs for channel %s: %s", queue.channel.id, e)
+            return False
+        except discord.HTTPException as e:
+            self.failed += 1
+            self.dropped += len(batch)
+            logger.error("Failed to send logs to %s: %s", queue.channel.id, e)
+            return True
+
+    async def drain(self, timeout: float = 5.0):
+        """Flush every queue immediately (used on shutdown)"""
+        self._draining = True
+        tasks = []
+        for queue in list(self._queues.values()):
+            queue.ready.set()
+            if queue.task is not None and not queue.task.done():
+                tasks.append(queue.task)
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def queue_depth(self, channel_id: Optional[int] = None) -> int:
+        """Embeds waiting for one channel, or for all channels"""
+        if channel_id is not None:
+            queue = self._queues.get(channel_id)
+            return len(queue) if queue is not None else 0
+        return sum(len(queue) for queue in self._queues.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return dispatcher counters"""
+        return {
+            "channels": len(self._queues),
+            "queued": self.queue_depth(),
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "messages_sent": self.messages_sent,
+            "embeds_sent": self.embeds_sent,
+            "embeds_per_message": (
+                round(self.embeds_sent / self.messages_sent, 2)
+                if self.messages_sent
+                else 0.0
+            ),
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
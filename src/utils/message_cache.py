@@ -0,0 +1,127 @@
+"""
+Message Cache for Logging
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Keeps the recent messages of guilds with message logging enabled so that
+edits and deletes can still be logged after discord.py's own message cache
+has dropped them. The cache is bounded globally and per guild, and both
+limits evict the least recently seen message in O(1).
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import discord
+
+
+class CachedMessage:
+    """The parts of a message the message logs need"""
+
+    __slots__ = (
+        "id",
+        "guild_id",
+        "channel_id",
+        "author_id",
+        "content",
+        "created_at",
+        "attachments",
+        "embeds",
+    )
+
+    def __init__(self, message: discord.Message):
+        self.id = message.id
+        self.guild_id = message.guild.id
+        self.channel_id = message.channel.id
+        self.author_id = message.author.id
+        self.content = message.content
+        self.created_at: datetime = message.created_at
+        self.attachments: Tuple[str, ...] = tuple(
+            attachment.url for attachment in message.attachments
+        )
+        self.embeds = len(message.embeds)
+
+
+class MessageCache:
+    """
+    Bounded LRU of ``CachedMessage`` entries.
+
+    One ordered dict keeps the global recency order and one per guild keeps
+    that guild's order, so a busy guild pushes out its own oldest messages
+    once it reaches ``per_guild`` instead of evicting everyone else's.
+    """
+
+    def __init__(self, max_messages: int, per_guild: int):
+        self.max_messages = max_messages
+        self.per_guild = per_guild
+        self._messages: "OrderedDict[int, CachedMessage]" = OrderedDict()
+        self._guilds: Dict[int, "OrderedDict[int, None]"] = {}
+        self.stored: int = 0
+        self.evictions: int = 0
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def add(self, message: discord.Message) -> CachedMessage:
+        """Cache a message, evicting the oldest ones beyond the limits"""
+        entry = CachedMessage(message)
+        self._forget(entry.id)
+        self._messages[entry.id] = entry
+        guild = self._guilds.setdefault(entry.guild_id, OrderedDict())
+        guild[entry.id] = None
+        self.stored += 1
+
+        if len(guild) > self.per_guild:
+            self._evict(next(iter(guild)))
+        if len(self._messages) > self.max_messages:
+            self._evict(next(iter(self._messages)))
+        return entry
+
+    def get(self, message_id: int) -> Optional[CachedMessage]:
+        """Return a cached message"""
+        return self._messages.get(message_id)
+
+    def pop(self, message_id: int) -> Optional[CachedMessage]:
+        """Remove and return a cached message"""
+        return self._forget(message_id)
+
+    def drop_guild(self, guild_id: int) -> int:
+        """Forget every cached message of a guild"""
+        guild = self._guilds.pop(guild_id, None)
+        if not guild:
+            return 0
+        for message_id in guild:
+            self._messages.pop(message_id, None)
+        return len(guild)
+
+    def _evict(self, message_id: int):
+        """Drop a message because a limit was reached"""
+        if self._forget(message_id) is not None:
+            self.evictions += 1
+
+    def _forget(self, message_id: int) -> Optional[CachedMessage]:
+        """Remove a message from the global and guild orders"""
+        entry = self._messages.pop(message_id, None)
+        if entry is None:
+            return None
+        guild = self._guilds.get(entry.guild_id)
+        if guild is not None:
+            guild.pop(message_id, None)
+            if not guild:
+                del self._guilds[entry.guild_id]
+        return entry
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        return {
+            "messages": len(self._messages),
+            "guilds": len(self._guilds),
+            "max_messages": self.max_messages,
+            "per_guild": self.per_guild,
+            "stored": self.stored,
+            "evictions": self.evictions,
+        }
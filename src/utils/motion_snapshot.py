@@ -0,0 +1,150 @@
+"""
+Motion Bank Snapshots
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Saves the parsed and indexed motion bank to a versioned binary file so the
+next start can skip CSV parsing and index building. A snapshot records
+where its motions came from: the size and modification time of local
+files, or the sheet URLs with their ETag / Last-Modified validators. It is
+only used while that fingerprint still matches, and a checksum guards
+against truncated or corrupted files. Snapshots are written to a temporary
+file and renamed into place, so readers never see a partial file.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"HHMOTIONS"
+# Bump whenever MotionStore or the snapshot layout changes
+SNAPSHOT_VERSION = 2
+
+
+def file_fingerprint(paths: Iterable[Path]) -> Tuple[Tuple[str, int, int], ...]:
+    """Name, size and mtime of the local motion files that exist"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        fingerprint.append((path.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def save_snapshot(path: Path, source: str, fingerprint: Any, payload: Any) -> bool:
+    """
+    Write a snapshot atomically.
+
+    Args:
+        source: Where the motions came from ("csv", "sheets" or "txt")
+        fingerprint: Value that must match for the snapshot to be reused
+        payload: The motion bank (and anything else needed to restore it)
+    """
+    started = time.perf_counter()
+    try:
+        body = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        header = pickle.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "source": source,
+                "fingerprint": fingerprint,
+                "created_at": time.time(),
+                "sha256": hashlib.sha256(body).hexdigest(),
+                "size": len(body),
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(SNAPSHOT_MAGIC)
+                f.write(len(header).to_bytes(4, "big"))
+                f.write(header)
+                f.write(body)
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+    except (OSError, pickle.PicklingError) as e:
+        logger.warning("⚠️ Could not write motion snapshot %s: %s", path, e)
+        return False
+    logger.debug(
+        "Motion snapshot written (%d bytes, %.1f ms)",
+        len(body),
+        (time.perf_counter() - started) * 1000,
+    )
+    return True
+
+
+def read_header(data: bytes) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Parse a snapshot header; returns it with the offset of the body"""
+    if not data.startswith(SNAPSHOT_MAGIC):
+        return None
+    offset = len(SNAPSHOT_MAGIC)
+    size = int.from_bytes(data[offset : offset + 4], "big")
+    offset += 4
+    header = pickle.loads(data[offset : offset + size])
+    if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+        return None
+    return header, offset + size
+
+
+def load_snapshot(
+    path: Path, fingerprint: Any = None, source: Optional[str] = None
+) -> Optional[Tuple[Dict[str, Any], Any]]:
+    """
+    Read a snapshot if it is current.
+
+    Args:
+        fingerprint: Required fingerprint (None accepts any)
+        source: Required source (None accepts any)
+
+    Returns:
+        The header and payload, or None if the snapshot is missing, stale,
+        from another version or damaged
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning("⚠️ Could not read motion snapshot %s: %s", path, e)
+        return None
+
+    try:
+        parsed = read_header(data)
+        if parsed is None:
+            return None
+        header, offset = parsed
+        if source is not None and header.get("source") != source:
+            return None
+        if fingerprint is not None and header.get("fingerprint") != fingerprint:
+            return None
+        body = memoryview(data)[offset:]
+        if len(body) != header.get("size") or hashlib.sha256(
+            body
+        ).hexdigest() != header.get("sha256"):
+            logger.warning("⚠️ Motion snapshot %s is damaged; ignoring it", path)
+            return None
+        return header, pickle.loads(body)
+    except (
+        pickle.UnpicklingError,
+        EOFError,
+        AttributeError,
+        ImportError,
+        TypeError,
+        ValueError,
+    ) as e:
+        # Written by an incompatible version of the code
+        logger.info("Ignoring motion snapshot %s: %s", path, e)
+        return None
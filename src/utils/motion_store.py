@@ -0,0 +1,176 @@
+"""
+Motion Store
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Column-oriented storage for one language's motions. Text, info slides and
+topic tags are kept in parallel lists indexed by motion id, with topic
+strings and topic tuples interned so repeated tags share one object. Two
+inverted indexes map topic tags and motion words to sorted ``array('I')``
+posting lists of motion ids, so topic draws and word searches touch only
+the motions that match instead of scanning the bank.
+"""
+
+import bisect
+import random
+import re
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Words too common in motions to narrow a search
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "as",
+        "be",
+        "by",
+        "for",
+        "in",
+        "is",
+        "it",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "this",
+        "to",
+        "th",
+        "thb",
+        "thbt",
+        "thr",
+        "thp",
+        "thw",
+        "house",
+        "would",
+        "believes",
+    }
+)
+
+# ``\w`` alone splits Bangla words at vowel signs and the virama
+_WORD = re.compile(r"[\w\u0980-\u09FF]+")
+# Zero-width (non-)joiners only change how a Bangla word is rendered
+_JOINERS = str.maketrans("", "", "\u200c\u200d")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased search words of a text, without stopwords"""
+    text = unicodedata.normalize("NFC", text.lower()).translate(_JOINERS)
+    return [
+        word for word in _WORD.findall(text) if len(word) > 1 and word not in STOPWORDS
+    ]
+
+
+class MotionStore:
+    """Motions of one language with topic and word indexes"""
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self.infos: List[Optional[str]] = []
+        self.topics: List[Tuple[str, ...]] = []
+        # lowercase topic / word -> ascending motion ids
+        self._topic_index: Dict[str, array] = {}
+        self._word_index: Dict[str, array] = {}
+        # Interned topic names (lowercase -> display name) and topic tuples
+        self._topic_names: Dict[str, str] = {}
+        self._topic_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(
+        self, text: str, info: Optional[str] = None, topics: Iterable[str] = ()
+    ) -> int:
+        """Append a motion and index it; returns its id"""
+        motion_id = len(self.texts)
+        names: List[str] = []
+        for topic in topics:
+            topic = topic.strip()
+            if not topic:
+                continue
+            key = topic.lower()
+            name = self._topic_names.setdefault(key, topic)
+            if name not in names:
+                names.append(name)
+                self._topic_index.setdefault(key, array("I")).append(motion_id)
+        tags = tuple(names)
+        tags = self._topic_tuples.setdefault(tags, tags)
+
+        self.texts.append(text)
+        self.infos.append(info or None)
+        self.topics.append(tags)
+        for word in set(tokenize(text)):
+            self._word_index.setdefault(word, array("I")).append(motion_id)
+        return motion_id
+
+    def entry(self, motion_id: int) -> Dict[str, Any]:
+        """Return a motion as a dict with keys: text, info, topics"""
+        return {
+            "text": self.texts[motion_id],
+            "info": self.infos[motion_id],
+            "topics": list(self.topics[motion_id]),
+        }
+
+    # ==================== TOPICS ====================
+
+    def topic_names(self) -> List[str]:
+        """Display names of every topic, sorted"""
+        return sorted(self._topic_names.values(), key=str.lower)
+
+    def with_topic(self, topic: str) -> Sequence[int]:
+        """Ids of the motions tagged with a topic (case-insensitive)"""
+        return self._topic_index.get(topic.strip().lower(), ())
+
+    def random_id(self, topic: Optional[str] = None) -> Optional[int]:
+        """A random motion id, optionally limited to one topic"""
+        candidates: Sequence[int] = (
+            self.with_topic(topic) if topic else range(len(self.texts))
+        )
+        if not candidates:
+            return None
+        return candidates[random.randrange(len(candidates))]
+
+    # ==================== SEARCH ====================
+
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """
+        Ids of motions containing every word of a query, in bank order.
+
+        Posting lists are intersected starting from the shortest one, so the
+        cost follows the rarest word rather than the size of the bank.
+        """
+        words = set(tokenize(query))
+        if not words:
+            return []
+        postings = [self._word_index.get(word) for word in words]
+        if any(posting is None for posting in postings):
+            return []
+        postings.sort(key=len)
+
+        candidates: Sequence[int] = postings[0]
+        for posting in postings[1:]:
+            if len(posting) > len(candidates) * 8:
+                # Probe a much longer list instead of walking it
+                candidates = [m for m in candidates if _contains(posting, m)]
+            else:
+                candidates = sorted(set(candidates).intersection(posting))
+            if not candidates:
+                return []
+        return list(candidates[:limit])
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return store sizes"""
+        return {
+            "motions": len(self.texts),
+            "topics": len(self._topic_index),
+            "indexed_words": len(self._word_index),
+        }
+
+
+def _contains(posting: array, motion_id: int) -> bool:
+    """Binary search a sorted posting list"""
+    index = bisect.bisect_left(posting, motion_id)
+    return index < len(posting) and posting[index] == motion_id
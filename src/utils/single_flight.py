@@ -0,0 +1,69 @@
+"""
+Coalesced Loads
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Runs at most one load per key at a time: callers that ask for a key while
+its load is under way wait for that load instead of starting another.
+Cancelling the caller that leads a load only cancels that caller; the
+others are woken up and one of them takes the load over.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _LoadAbandoned(Exception):
+    """Set on a shared load whose leading caller was cancelled"""
+
+
+class SingleFlight(Generic[K, V]):
+    """Per-key in-flight loads shared by concurrent callers"""
+
+    def __init__(self):
+        self._inflight: Dict[K, "asyncio.Future[V]"] = {}
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: K, load: Callable[[], Awaitable[V]]) -> V:
+        """
+        Return the result of ``load()``, or of the load already running for
+        ``key``. A failed load raises its exception in every caller.
+        """
+        while True:
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except _LoadAbandoned:
+                # The load we joined was cancelled; run it ourselves
+                continue
+
+        future: "asyncio.Future[V]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await load()
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; let the others retry
+            future.set_exception(_LoadAbandoned())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so failures nobody else awaited are not reported
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,415 @@
+"""
+Tabbycat API Client
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Asynchronous Tabbycat REST client built on aiohttp. Keeps one pooled
+keep-alive session per Tabbycat site so commands never block the event loop
+while waiting on the tab server, and caches GET responses per tournament with
+TTL expiry, ETag/Last-Modified revalidation and request coalescing.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+def select_current_round(rounds: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the first non-completed round, or the last round if all are done"""
+    for round_data in rounds:
+        if not round_data.get("completed", False):
+            return round_data
+    return rounds[-1] if rounds else None
+
+
+def round_url_for(round_data: Dict[str, Any], tournament_url: str) -> Optional[str]:
+    """Return the API URL of a round object"""
+    round_url = round_data.get("url") or round_data.get("links", {}).get("pairings")
+    if not round_url and round_data.get("id") is not None:
+        round_url = f"{tournament_url}rounds/{round_data['id']}"
+    return round_url
+
+
+class TabbycatError(Exception):
+    """Raised when a Tabbycat request fails or returns an unexpected response"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class _FetchAbandoned(Exception):
+    """Set on a shared fetch whose leading request was cancelled"""
+
+
+@dataclass
+class CachedResponse:
+    """A cached Tabbycat response body with its validators"""
+
+    data: Any
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ResponseCache:
+    """
+    Bounded in-memory store for Tabbycat responses.
+
+    Entries are keyed by ``(url, token)`` so every tournament (and every
+    guild's token) gets its own slot. Expired entries are kept so their
+    validators can be used for conditional requests; the least recently used
+    entry is evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+        self.coalesced: int = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        """Return the entry for ``key`` (fresh or stale) if present"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        key: Tuple[str, str],
+        data: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CachedResponse:
+        """Store a response and return its entry"""
+        entry = CachedResponse(
+            data=data,
+            expires_at=time.monotonic() + self.ttl,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, prefix: str) -> int:
+        """Drop every entry whose URL starts with ``prefix``"""
+        stale = [key for key in self._entries if key[0].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class TabbycatClient:
+    """
+    Pooled asynchronous client for the Tabbycat v1 API.
+
+    One ``aiohttp.ClientSession`` is kept per Tabbycat site (scheme + host),
+    so repeated commands reuse keep-alive connections. Each session's
+    connector caps concurrent connections to that host, and every request is
+    bounded by a total/connect timeout.
+
+    Cached GETs are served from memory while fresh. Once stale they are
+    revalidated with If-None-Match / If-Modified-Since, and concurrent
+    identical requests share a single upstream fetch.
+    """
+
+    def __init__(
+        self,
+        timeout: float = Config.TABBYCAT_REQUEST_TIMEOUT,
+        connect_timeout: float = Config.TABBYCAT_CONNECT_TIMEOUT,
+        max_connections_per_host: int = Config.TABBYCAT_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout: float = Config.TABBYCAT_KEEPALIVE_TIMEOUT,
+        cache_ttl: float = Config.TABBYCAT_CACHE_TTL,
+        cache_max_entries: int = Config.TABBYCAT_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            timeout: Total timeout per request in seconds
+            connect_timeout: Timeout for establishing a connection in seconds
+            max_connections_per_host: Concurrent connection cap per Tabbycat site
+            keepalive_timeout: Seconds an idle pooled connection is kept open
+            cache_ttl: Seconds a cached response is served without revalidation
+            cache_max_entries: Maximum number of cached responses
+        """
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._lock = asyncio.Lock()
+        self.cache = ResponseCache(cache_ttl, cache_max_entries)
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+        self.request_count: int = 0
+        self.error_count: int = 0
+
+    @staticmethod
+    def normalize_site(url: str) -> str:
+        """Return the Tabbycat site root for a user-supplied URL"""
+        return url.strip().rstrip("/")
+
+    @staticmethod
+    def _site_key(url: str) -> str:
+        """Return the scheme + host key used to pool sessions"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    @staticmethod
+    def auth_headers(token: str) -> Dict[str, str]:
+        """Build the Tabbycat token authorization header"""
+        return {"Authorization": f"Token {token}"}
+
+    async def _get_session(self, url: str) -> aiohttp.ClientSession:
+        """Return the pooled session for the site that serves ``url``"""
+        key = self._site_key(url)
+        session = self._sessions.get(key)
+        if session is not None and not session.closed:
+            return session
+
+        async with self._lock:
+            session = self._sessions.get(key)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit_per_host=self.max_connections_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300,
+                )
+                session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=self.timeout,
+                    headers={"Accept": "application/json"},
+                    raise_for_status=False,
+                )
+                self._sessions[key] = session
+                logger.debug("Opened Tabbycat session for %s", key)
+            return session
+
+    async def get_json(self, url: str, token: str, *, use_cache: bool = True) -> Any:
+        """
+        Perform an authenticated GET and decode the JSON body.
+
+        Args:
+            url: Absolute API URL
+            token: Tabbycat API token
+            use_cache: Serve and store the response through the response cache
+
+        Raises:
+            TabbycatError: On network errors, timeouts, non-200 responses or
+                invalid JSON.
+        """
+        if not use_cache:
+            _, data, _ = await self._fetch(url, token)
+            return data
+
+        key = (url, token)
+        while True:
+            entry = self.cache.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self.cache.hits += 1
+                return entry.data
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.cache.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except _FetchAbandoned:
+                # The request we joined was cancelled; fetch it ourselves
+                continue
+
+        self.cache.misses += 1
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await self._refresh(key, entry)
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; let the others retry
+            future.set_exception(_FetchAbandoned())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so failures nobody else awaited are not reported
+            future.exception()
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(
+        self, key: Tuple[str, str], entry: Optional[CachedResponse]
+    ) -> Any:
+        """Fetch ``key`` upstream, revalidating ``entry`` when it has validators"""
+        url, token = key
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        status, data, response_headers = await self._fetch(url, token, headers)
+        if status == 304 and entry is not None:
+            self.cache.revalidations += 1
+            data = entry.data
+
+        # A 304 may omit validators; keep the ones we revalidated with
+        self.cache.put(
+            key,
+            data,
+            etag=response_headers.get("ETag") or headers.get("If-None-Match"),
+            last_modified=response_headers.get("Last-Modified")
+            or headers.get("If-Modified-Since"),
+        )
+        return data
+
+    async def _fetch(
+        self, url: str, token: str, extra_headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Any, Dict[str, Optional[str]]]:
+        """
+        Perform a single upstream GET.
+
+        Returns:
+            Tuple of (status, decoded JSON or None for 304, response headers)
+        """
+        session = await self._get_session(url)
+        headers = self.auth_headers(token)
+        if extra_headers:
+            headers.update(extra_headers)
+        self.request_count += 1
+
+        try:
+            async with session.get(url, headers=headers) as response:
+                response_headers = {
+                    "ETag": response.headers.get("ETag"),
+                    "Last-Modified": response.headers.get("Last-Modified"),
+                }
+                if response.status == 304 and extra_headers:
+                    return response.status, None, response_headers
+                if response.status != 200:
+                    raise TabbycatError(
+                        f"Tabbycat returned status {response.status} for {url}",
+                        status=response.status,
+                    )
+                try:
+                    data = await response.json(content_type=None)
+                except ValueError as exc:
+                    raise TabbycatError(f"Invalid JSON from {url}: {exc}") from exc
+                return response.status, data, response_headers
+
+        except aiohttp.ClientError as exc:
+            self.error_count += 1
+            raise TabbycatError(f"Network error contacting {url}: {exc}") from exc
+        except asyncio.TimeoutError as exc:
+            self.error_count += 1
+            raise TabbycatError(f"Timed out contacting {url}") from exc
+        except TabbycatError:
+            self.error_count += 1
+            raise
+
+    async def get_tournaments(self, site: str, token: str) -> List[Dict[str, Any]]:
+        """List tournaments hosted on a Tabbycat site"""
+        return await self.get_json(
+            f"{self.normalize_site(site)}/api/v1/tournaments", token, use_cache=False
+        )
+
+    async def get_teams(self, tournament_url: str, token: str) -> List[Dict[str, Any]]:
+        """List teams (with speakers) of a tournament"""
+        return await self.get_json(f"{tournament_url}teams", token)
+
+    async def get_adjudicators(
+        self, tournament_url: str, token: str
+    ) -> List[Dict[str, Any]]:
+        """List adjudicators of a tournament"""
+        return await self.get_json(f"{tournament_url}adjudicators", token)
+
+    async def get_venues(self, tournament_url: str, token: str) -> List[Dict[str, Any]]:
+        """List venues of a tournament"""
+        return await self.get_json(f"{tournament_url}venues", token)
+
+    async def get_rounds(self, tournament_url: str, token: str) -> List[Dict[str, Any]]:
+        """List rounds of a tournament"""
+        return await self.get_json(f"{tournament_url}rounds", token)
+
+    async def get_pairings(self, round_url: str, token: str) -> List[Dict[str, Any]]:
+        """List pairings (debates) of a round"""
+        return await self.get_json(f"{round_url.rstrip('/')}/pairings", token)
+
+    async def get_standings(
+        self, tournament_url: str, token: str
+    ) -> List[Dict[str, Any]]:
+        """Fetch team standings of a tournament"""
+        return await self.get_json(f"{tournament_url}standings", token)
+
+    def get_validator(self, url: str, token: str) -> Optional[str]:
+        """
+        Return the ETag (or Last-Modified) of the cached response for ``url``.
+
+        Used as a change cursor: an unchanged validator means the upstream
+        resource has not changed since it was last seen.
+        """
+        entry = self.cache.get((url, token))
+        if entry is None:
+            return None
+        return entry.etag or entry.last_modified
+
+    def invalidate_tournament(self, tournament_url: str) -> int:
+        """Drop every cached response belonging to a tournament"""
+        return self.cache.invalidate(tournament_url)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return client and cache statistics"""
+        return {
+            "sites": len(self._sessions),
+            "requests": self.request_count,
+            "errors": self.error_count,
+            "cache": self.cache.get_stats(),
+        }
+
+    async def close(self):
+        """Close every pooled session and drop cached responses"""
+        self.cache.clear()
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+        if sessions:
+            logger.info("🔌 Closed %d Tabbycat session(s)", len(sessions))
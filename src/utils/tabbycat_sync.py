@@ -0,0 +1,300 @@
+"""
+Tabbycat Background Sync Engine
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Periodically mirrors each connected tournament's teams, adjudicators,
+rounds, current-round pairings and venues into the tournament store.
+Every resource carries a cursor (its ETag / Last-Modified validator); a
+resource whose validator has not moved is skipped, and changed resources
+are diffed against the stored snapshot so only deltas are written.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+from config.settings import Config
+from src.utils.tabbycat_client import (
+    TabbycatClient,
+    TabbycatError,
+    round_url_for,
+    select_current_round,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TabbycatSyncEngine:
+    """
+    Runs one background sync task per connected tournament.
+
+    Each task syncs its tournament, then sleeps for the tournament's
+    ``sync_interval`` (or the global ``TABBYCAT_SYNC_INTERVAL``). Failures
+    back off exponentially up to ``TABBYCAT_SYNC_MAX_BACKOFF``.
+    """
+
+    def __init__(
+        self,
+        bot,
+        client: TabbycatClient,
+        store,
+        interval: float = Config.TABBYCAT_SYNC_INTERVAL,
+        max_backoff: float = Config.TABBYCAT_SYNC_MAX_BACKOFF,
+    ):
+        """
+        Initialize the sync engine.
+
+        Args:
+            bot: The Discord bot instance
+            client: Shared Tabbycat client
+            store: Tournament store to write snapshots into
+            interval: Default seconds between syncs of one tournament
+            max_backoff: Upper bound in seconds for the retry delay after errors
+        """
+        self.bot = bot
+        self.client = client
+        self.store = store
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._starter: Optional[asyncio.Task] = None
+        self.sync_count: int = 0
+        self.skipped_count: int = 0
+        self.error_count: int = 0
+
+    def start(self):
+        """Schedule every stored tournament owned by this process"""
+        if self._starter is None or self._starter.done():
+            self._starter = self.bot.loop.create_task(self._schedule_existing())
+
+    async def _schedule_existing(self):
+        """Wait for the gateway, then schedule tournaments for local guilds"""
+        await self.bot.wait_until_ready()
+        guild_ids = await self.store.get_synced_guild_ids()
+
+        # Only sync guilds served by this process's shards
+        local = [gid for gid in guild_ids if self.bot.get_guild(gid) is not None]
+        for guild_id in local:
+            self.schedule(guild_id)
+
+        if local:
+            logger.info("🔄 Tabbycat sync scheduled for %d tournament(s)", len(local))
+
+    def schedule(self, guild_id: int):
+        """Start (or restart) the sync task of a guild's tournament"""
+        self.unschedule(guild_id)
+        self._tasks[guild_id] = asyncio.create_task(self._run(guild_id))
+
+    def unschedule(self, guild_id: int):
+        """Stop the sync task of a guild's tournament"""
+        task = self._tasks.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def stop(self):
+        """Cancel every sync task"""
+        if self._starter and not self._starter.done():
+            self._starter.cancel()
+        for guild_id in list(self._tasks):
+            self.unschedule(guild_id)
+
+    async def _run(self, guild_id: int):
+        """Sync loop for one tournament"""
+        failures = 0
+        while True:
+            tournament = await self.store.get_tournament(guild_id)
+            if not tournament:
+                self._tasks.pop(guild_id, None)
+                return
+
+            interval = tournament.get("sync_interval") or self.interval
+            try:
+                await self.sync_tournament(guild_id)
+                failures = 0
+                delay = interval
+            except asyncio.CancelledError:
+                raise
+            except (TabbycatError, PyMongoError) as exc:
+                failures += 1
+                self.error_count += 1
+                delay = min(interval * 2**failures, self.max_backoff)
+                logger.warning(
+                    "Tabbycat sync failed for guild %s (retry in %ds): %s",
+                    guild_id,
+                    delay,
+                    exc,
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                failures += 1
+                self.error_count += 1
+                delay = min(interval * 2**failures, self.max_backoff)
+                logger.error(
+                    "Unexpected error syncing guild %s: %s",
+                    guild_id,
+                    exc,
+                    exc_info=True,
+                )
+
+            await asyncio.sleep(delay)
+
+    async def _fetch(
+        self,
+        name: str,
+        url: str,
+        token: str,
+        cursors: Dict[str, Any],
+        new_cursors: Dict[str, Any],
+    ) -> Tuple[Any, bool]:
+        """
+        Fetch a resource and compare its validator with the stored cursor.
+
+        Returns:
+            Tuple of (data, changed since the last sync)
+        """
+        data = await self.client.get_json(url, token)
+        validator = self.client.get_validator(url, token)
+        new_cursors[name] = validator
+        changed = validator is None or cursors.get(name) != validator
+        if not changed:
+            self.skipped_count += 1
+        return data, changed
+
+    @staticmethod
+    async def _persist(
+        write: Awaitable[Any],
+        names: Tuple[str, ...],
+        new_cursors: Dict[str, Any],
+        failed: List[str],
+    ) -> Any:
+        """
+        Run a store write; if it fails, drop the resources' new cursors so
+        the next sync sees them as changed and writes them again.
+
+        Returns:
+            The write's result, or None if it failed
+        """
+        try:
+            return await write
+        except PyMongoError:
+            for name in names:
+                new_cursors.pop(name, None)
+            failed.extend(names)
+            return None
+
+    async def sync_tournament(self, guild_id: int) -> Dict[str, Tuple[int, int]]:
+        """
+        Sync one tournament now.
+
+        Returns:
+            Mapping of resource -> (documents written, documents deleted)
+
+        Raises:
+            TabbycatError: If a resource could not be fetched
+            PyMongoError: If a resource could not be saved; the cursors of
+                the other resources are still recorded
+        """
+        tournament = await self.store.get_tournament(guild_id)
+        if not tournament:
+            return {}
+
+        tournament_url = tournament["tournament"]
+        token = tournament["token"]
+        cursors = (tournament.get("sync") or {}).get("cursors", {})
+        new_cursors: Dict[str, Any] = {}
+        changes: Dict[str, Tuple[int, int]] = {}
+        failed: List[str] = []
+
+        teams, teams_changed = await self._fetch(
+            "teams", f"{tournament_url}teams", token, cursors, new_cursors
+        )
+        adjudicators, adjudicators_changed = await self._fetch(
+            "adjudicators", f"{tournament_url}adjudicators", token, cursors, new_cursors
+        )
+        if teams_changed or adjudicators_changed:
+            await self._persist(
+                self.store.replace_participants(guild_id, teams, adjudicators),
+                ("teams", "adjudicators"),
+                new_cursors,
+                failed,
+            )
+
+        venues, venues_changed = await self._fetch(
+            "venues", f"{tournament_url}venues", token, cursors, new_cursors
+        )
+        if venues_changed:
+            delta = await self._persist(
+                self.store.apply_snapshot(guild_id, "venues", venues),
+                ("venues",),
+                new_cursors,
+                failed,
+            )
+            if delta is not None:
+                changes["venues"] = delta
+
+        rounds, rounds_changed = await self._fetch(
+            "rounds", f"{tournament_url}rounds", token, cursors, new_cursors
+        )
+        if rounds_changed:
+            delta = await self._persist(
+                self.store.apply_snapshot(guild_id, "rounds", rounds),
+                ("rounds",),
+                new_cursors,
+                failed,
+            )
+            if delta is not None:
+                changes["rounds"] = delta
+
+        current_round = select_current_round(rounds)
+        round_url = (
+            round_url_for(current_round, tournament_url) if current_round else None
+        )
+        if round_url:
+            cursor_name = f"pairings:{current_round.get('id')}"
+            pairings, pairings_changed = await self._fetch(
+                cursor_name,
+                f"{round_url.rstrip('/')}/pairings",
+                token,
+                cursors,
+                new_cursors,
+            )
+            if pairings_changed:
+                delta = await self._persist(
+                    self.store.apply_snapshot(
+                        guild_id, "pairings", pairings, round_id=current_round.get("id")
+                    ),
+                    (cursor_name,),
+                    new_cursors,
+                    failed,
+                )
+                if delta is not None:
+                    changes["pairings"] = delta
+
+        await self.store.update_sync_state(
+            guild_id,
+            {
+                "cursors": new_cursors,
+                "last_synced_at": datetime.utcnow(),
+                "changes": {name: list(delta) for name, delta in changes.items()},
+            },
+        )
+        if failed:
+            raise PyMongoError(f"could not save {', '.join(failed)}")
+        self.sync_count += 1
+
+        if any(written or deleted for written, deleted in changes.values()):
+            logger.info("🔄 Tabbycat sync for guild %s: %s", guild_id, changes)
+        return changes
+
+    def get_status(self) -> Dict[str, Any]:
+        """Return sync engine statistics"""
+        return {
+            "tournaments": len(self._tasks),
+            "interval": self.interval,
+            "syncs": self.sync_count,
+            "unchanged_resources": self.skipped_count,
+            "errors": self.error_count,
+        }
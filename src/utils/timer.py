@@ -2,116 +2,354 @@
 Timer utilities for Hear! Hear! Bot
 Author: aldinn
 Email: kferdoush617@gmail.com
+
+All debate timers share one scheduler. Timers hold a monotonic deadline
+instead of a counter that is decremented every second, and the next event
+of every running timer (display tick, milestone or finish) sits in a single
+deadline heap. One background loop sleeps until the earliest event is due,
+so wakeups no longer grow with the number of running timers.
 """
 
 import asyncio
+import heapq
+import itertools
+import logging
+import math
 import time
-from datetime import datetime, timedelta
-
-class TimerManager:
-    """Manages debate timers and timing functions"""
-    
-    def __init__(self):
-        self.active_timers = {}  # Format: {user_id_channel_id: status}
-        self.timer_tasks = {}    # Store asyncio tasks for cleanup
-    
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds-left marks that trigger a channel notification
+MILESTONES = (300, 180, 60, 30, 10, 5, 3, 2, 1)
+
+# Events due within this many seconds of each other are handled in one wakeup
+BATCH_WINDOW = 0.05
+
+# Rounding slack when turning a remaining duration into whole seconds
+TICK_TOLERANCE = 0.1
+
+
+class ScheduledTimer:
+    """State of one running or paused timer"""
+
+    __slots__ = (
+        "key",
+        "guild_id",
+        "channel_id",
+        "user_id",
+        "duration",
+        "deadline",
+        "paused_remaining",
+        "handler",
+        "lang",
+        "message",
+        "view",
+        "renderer",
+        "owner_mention",
+        "channel_mention",
+        "_version",
+        "fired",
+    )
+
+    def __init__(
+        self,
+        key: str,
+        guild_id: Optional[int],
+        channel_id: int,
+        user_id: int,
+        duration: float,
+        handler: Any,
+        lang: str = "en",
+        owner_mention: str = "",
+        channel_mention: str = "",
+    ):
+        self.key = key
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.user_id = user_id
+        self.duration = duration
+        self.deadline = time.monotonic() + duration
+        self.paused_remaining: Optional[float] = None
+        self.handler = handler
+        self.lang = lang
+        self.message = None
+        self.view = None
+        self.renderer = None
+        self.owner_mention = owner_mention
+        self.channel_mention = channel_mention
+        self._version = 0
+        self.fired: set = set()  # milestones already announced
+
+    @property
+    def paused(self) -> bool:
+        """Whether the countdown is currently frozen"""
+        return self.paused_remaining is not None
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """Seconds left on the timer, derived from its deadline"""
+        if self.paused_remaining is not None:
+            return self.paused_remaining
+        if now is None:
+            now = time.monotonic()
+        return max(0.0, self.deadline - now)
+
+    def seconds_left(self, now: Optional[float] = None) -> int:
+        """Whole seconds left, as shown on the display"""
+        return max(0, math.ceil(self.remaining(now) - TICK_TOLERANCE))
+
+    def progress(self, now: Optional[float] = None) -> float:
+        """Elapsed fraction of the timer between 0 and 1"""
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, 1 - self.remaining(now) / self.duration))
+
+
+class TimerScheduler:
+    """
+    Drives every active timer from a single tick loop.
+
+    Handlers attached to timers receive ``on_tick(timer, seconds_left)`` once
+    per displayed second, ``on_milestone(timer, seconds_left)`` for each mark
+    in ``MILESTONES`` and ``on_finish(timer)`` when the deadline passes.
+    ``on_tick`` is a plain method that only records the desired display
+    state; the other two are coroutines run as their own tasks so a slow
+    Discord request never delays other timers.
+
+    When a ``store`` is attached, every state change is checkpointed through
+    ``store.save(timer)`` and finished or stopped timers are dropped with
+    ``store.remove(key)``.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.active_timers: Dict[str, ScheduledTimer] = {}
+        self._heap: List[Tuple[float, int, ScheduledTimer, int]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._callbacks: set = set()
+        self.wakeups: int = 0
+        self.events_fired: int = 0
+
+    # ------------------------------------------------------------------
+    # Helpers kept from the original timer manager
+    # ------------------------------------------------------------------
+
     def create_timer_key(self, user_id, channel_id):
         """Create a unique timer key"""
         return f"{user_id}_{channel_id}"
-    
+
     def is_timer_active(self, user_id, channel_id):
         """Check if a timer is active for user in channel"""
-        key = self.create_timer_key(user_id, channel_id)
-        return key in self.active_timers
-    
-    def start_timer(self, user_id, channel_id):
-        """Start a timer for user in channel"""
-        key = self.create_timer_key(user_id, channel_id)
-        self.active_timers[key] = {
-            'start_time': time.time(),
-            'user_id': user_id,
-            'channel_id': channel_id,
-            'active': True
-        }
-    
-    def stop_timer(self, user_id, channel_id):
-        """Stop a timer and return elapsed time"""
-        key = self.create_timer_key(user_id, channel_id)
-        if key in self.active_timers:
-            timer_data = self.active_timers[key]
-            elapsed = time.time() - timer_data['start_time']
-            del self.active_timers[key]
-            
-            # Clean up any associated tasks
-            if key in self.timer_tasks:
-                self.timer_tasks[key].cancel()
-                del self.timer_tasks[key]
-            
-            return elapsed
-        return None
-    
-    def get_elapsed_time(self, user_id, channel_id):
-        """Get elapsed time for active timer"""
-        key = self.create_timer_key(user_id, channel_id)
-        if key in self.active_timers:
-            return time.time() - self.active_timers[key]['start_time']
-        return None
-    
+        return self.create_timer_key(user_id, channel_id) in self.active_timers
+
     def format_time(self, seconds):
         """Format seconds into MM:SS format"""
         if seconds is None:
             return "00:00"
-        
+
         minutes = int(seconds // 60)
         seconds = int(seconds % 60)
         return f"{minutes:02d}:{seconds:02d}"
-    
-    def get_time_string(self, seconds):
-        """Get formatted time string with additional info"""
-        if seconds is None:
-            return "No active timer"
-        
-        formatted_time = self.format_time(seconds)
-        
-        # Add warnings for common debate time limits
-        if seconds >= 420:  # 7 minutes
-            return f"{formatted_time} ⚠️ (Over time!)"
-        elif seconds >= 360:  # 6 minutes
-            return f"{formatted_time} ⏰ (Approaching time limit)"
-        else:
-            return formatted_time
-    
-    async def auto_stop_timer(self, user_id, channel_id, duration):
-        """Automatically stop timer after specified duration"""
-        key = self.create_timer_key(user_id, channel_id)
-        
-        try:
-            await asyncio.sleep(duration)
-            if key in self.active_timers:
-                self.stop_timer(user_id, channel_id)
-        except asyncio.CancelledError:
-            pass  # Timer was manually stopped
-    
-    def start_auto_timer(self, user_id, channel_id, duration):
-        """Start a timer that automatically stops after duration"""
-        self.start_timer(user_id, channel_id)
-        key = self.create_timer_key(user_id, channel_id)
-        
-        # Create auto-stop task
-        task = asyncio.create_task(self.auto_stop_timer(user_id, channel_id, duration))
-        self.timer_tasks[key] = task
-    
+
     def get_active_timers_count(self):
         """Get number of active timers"""
         return len(self.active_timers)
-    
-    def cleanup_timers(self):
-        """Clean up all timers and tasks"""
-        for task in self.timer_tasks.values():
-            task.cancel()
-        
+
+    def get(self, key: str) -> Optional[ScheduledTimer]:
+        """Return the active timer stored under ``key``"""
+        return self.active_timers.get(key)
+
+    # ------------------------------------------------------------------
+    # Timer lifecycle
+    # ------------------------------------------------------------------
+
+    def add(self, timer: ScheduledTimer, checkpoint: bool = True) -> ScheduledTimer:
+        """Register a timer and schedule its first event"""
+        self.active_timers[timer.key] = timer
+        self._ensure_running()
+        if not timer.paused:
+            # Fire straight away so a starting mark (e.g. 5 minutes) is announced
+            self._push(timer, time.monotonic(), immediate=True)
+        if checkpoint:
+            self._checkpoint(timer)
+        return timer
+
+    def pause(self, key: str) -> Optional[ScheduledTimer]:
+        """Freeze a running timer; returns None if it is not running"""
+        timer = self.active_timers.get(key)
+        if timer is None or timer.paused:
+            return None
+        timer.paused_remaining = timer.remaining()
+        timer._version += 1  # drops the queued heap entry
+        self._checkpoint(timer)
+        return timer
+
+    def resume(self, key: str) -> Optional[ScheduledTimer]:
+        """Continue a paused timer; returns None if it is not paused"""
+        timer = self.active_timers.get(key)
+        if timer is None or not timer.paused:
+            return None
+        now = time.monotonic()
+        timer.deadline = now + timer.paused_remaining
+        timer.paused_remaining = None
+        self._push(timer, now)
+        self._checkpoint(timer)
+        return timer
+
+    def extend(self, key: str, seconds: float) -> Optional[ScheduledTimer]:
+        """Add time to a timer, re-arming any milestones it moves back over"""
+        timer = self.active_timers.get(key)
+        if timer is None:
+            return None
+        timer.duration += seconds
+        if timer.paused:
+            timer.paused_remaining += seconds
+        else:
+            timer.deadline += seconds
+        left = timer.seconds_left()
+        timer.fired = {mark for mark in timer.fired if mark > left}
+        if not timer.paused:
+            self._push(timer, time.monotonic())
+        self._checkpoint(timer)
+        return timer
+
+    def cancel(self, key: str) -> Optional[ScheduledTimer]:
+        """Remove a timer without firing its finish event"""
+        timer = self.active_timers.pop(key, None)
+        if timer is not None:
+            timer._version += 1
+            self._forget(key)
+        return timer
+
+    def cleanup_timers(self) -> int:
+        """Drop every timer; returns how many were active"""
+        keys = list(self.active_timers)
+        for key in keys:
+            self.cancel(key)
+        self._heap.clear()
+        return len(keys)
+
+    def stop(self):
+        """
+        Stop the tick loop.
+
+        Timers are left in the store so they can be restored on the next
+        start.
+        """
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
         self.active_timers.clear()
-        self.timer_tasks.clear()
+        self._heap.clear()
+
+    def _checkpoint(self, timer: ScheduledTimer):
+        """Queue a checkpoint of the timer's current state"""
+        if self.store is not None:
+            self.store.save(timer)
+
+    def _forget(self, key: str):
+        """Queue removal of a timer's checkpoint"""
+        if self.store is not None:
+            self.store.remove(key)
+
+    # ------------------------------------------------------------------
+    # Tick loop
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self):
+        """Start the tick loop on first use"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def _push(self, timer: ScheduledTimer, now: float, immediate: bool = False):
+        """Queue the next event of a running timer"""
+        timer._version += 1
+        left = timer.remaining(now)
+        if immediate or left <= TICK_TOLERANCE:
+            fire_at = now
+        else:
+            # Next whole-second boundary of the countdown
+            fire_at = timer.deadline - (timer.seconds_left(now) - 1)
+        entry = (fire_at, next(self._seq), timer, timer._version)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        """Sleep until the earliest deadline, then fire everything due"""
+        while True:
+            try:
+                if not self._heap:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                delay = self._heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                        continue  # an earlier event was queued
+                    except asyncio.TimeoutError:
+                        pass
+
+                self.wakeups += 1
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now + BATCH_WINDOW:
+                    _, _, timer, version = heapq.heappop(self._heap)
+                    if version != timer._version or timer.key not in self.active_timers:
+                        continue
+                    self._fire(timer, now)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error("Error in timer scheduler loop: %s", e, exc_info=True)
+
+    def _fire(self, timer: ScheduledTimer, now: float):
+        """Dispatch the events of one due timer and queue its next one"""
+        left = timer.seconds_left(now)
+
+        if left <= 0:
+            self.active_timers.pop(timer.key, None)
+            timer._version += 1
+            self._forget(timer.key)
+            self.dispatch(timer.handler.on_finish(timer))
+            return
+
+        try:
+            timer.handler.on_tick(timer, left)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Error updating timer %s: %s", timer.key, e)
+
+        if left in MILESTONES and left not in timer.fired:
+            timer.fired.add(left)
+            self.dispatch(timer.handler.on_milestone(timer, left))
+
+        self._push(timer, now)
+
+    def dispatch(self, coro) -> asyncio.Task:
+        """Run a handler callback in the background"""
+        self.events_fired += 1
+        task = asyncio.create_task(coro)
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+        return task
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return scheduler counters"""
+        paused = sum(1 for timer in self.active_timers.values() if timer.paused)
+        return {
+            "active": len(self.active_timers),
+            "paused": paused,
+            "queued_events": len(self._heap),
+            "wakeups": self.wakeups,
+            "events_fired": self.events_fired,
+        }
+
 
-# Global timer manager instance
-timer_manager = TimerManager()
+# Global timer scheduler instance
+timer_scheduler = TimerScheduler()
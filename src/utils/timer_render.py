@@ -0,0 +1,173 @@
+"""
+Timer Embed Rendering
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Shared rendering for timer displays. Everything that never changes while a
+timer runs (owner, channel, titles) is built once per timer, the 21 possible
+progress bars and the colour/status bands are precomputed at import time,
+and each tick only touches the embed parts whose value actually changed.
+"""
+
+import functools
+from typing import NamedTuple, Optional
+
+import discord
+
+TIMER_GIF = "https://cdn.discordapp.com/emojis/755774680633016380.gif"
+FINISH_GIF = "https://tenor.com/view/wrap-it-up-kowalski-game-awards-finish-already-penguin-gif-9878765111777341683"
+
+CONTROLS_FOOTER = "Use the buttons below to control your timer!"
+
+BAR_LENGTH = 20
+
+# Every progress bar a timer can show, indexed by filled blocks
+PROGRESS_BARS = tuple(
+    "█" * filled + "░" * (BAR_LENGTH - filled) for filled in range(BAR_LENGTH + 1)
+)
+
+
+class Band(NamedTuple):
+    """Colour and status shown for a range of remaining time"""
+
+    color: int
+    status: str
+    footer: str
+    thumbnail: Optional[str]
+
+
+# (exclusive lower bound in seconds, band), checked from the top
+BANDS = (
+    (300, Band(0x00FF00, "🟢 **RUNNING**", CONTROLS_FOOTER, None)),
+    (60, Band(0xFFFF00, "🟡 **RUNNING**", CONTROLS_FOOTER, None)),
+    (30, Band(0xFF8800, "🟠 **HURRY UP!**", CONTROLS_FOOTER, None)),
+)
+FINAL_BAND = Band(
+    0xFF0000, "🔴 **FINAL COUNTDOWN!**", "⚡ Time is running out! ⚡", TIMER_GIF
+)
+
+
+def band_for(seconds_left: int) -> Band:
+    """Return the display band for the remaining time"""
+    for threshold, band in BANDS:
+        if seconds_left > threshold:
+            return band
+    return FINAL_BAND
+
+
+def progress_bar(progress: float) -> str:
+    """Return the precomputed bar for an elapsed fraction"""
+    filled = int(progress * BAR_LENGTH)
+    return PROGRESS_BARS[min(BAR_LENGTH, max(0, filled))]
+
+
+@functools.lru_cache(maxsize=8192)
+def clock(seconds_left: int, icon: str = "⏱️") -> str:
+    """Return the code-block clock shown as the embed description"""
+    return f"```\n{icon}  {seconds_left // 60:02d}:{seconds_left % 60:02d}  {icon}\n```"
+
+
+class TimerRenderer:
+    """
+    Live embed of one timer.
+
+    ``render`` mutates a single embed in place and reports whether anything
+    visible changed, so unchanged ticks cost neither an allocation nor an
+    edit.
+    """
+
+    __slots__ = (
+        "owner_mention",
+        "channel_mention",
+        "embed",
+        "_paused",
+        "_seconds",
+        "_band",
+        "_bar",
+    )
+
+    def __init__(self, owner_mention: str, channel_mention: str):
+        self.owner_mention = owner_mention
+        self.channel_mention = channel_mention
+        self.embed: Optional[discord.Embed] = None
+        self._paused: Optional[bool] = None
+        self._seconds: Optional[int] = None
+        self._band: Optional[Band] = None
+        self._bar: Optional[str] = None
+
+    def _base(self, title: str, description: str, color: int) -> discord.Embed:
+        """Build an embed carrying the static owner/status/channel fields"""
+        embed = discord.Embed(title=title, description=description, color=color)
+        embed.add_field(name="👤 Timer Owner", value=self.owner_mention, inline=True)
+        embed.add_field(name="🎯 Status", value="\u200b", inline=True)
+        embed.add_field(name="📍 Channel", value=self.channel_mention, inline=True)
+        return embed
+
+    def render(
+        self, seconds_left: int, progress: float, paused: bool
+    ) -> Optional[discord.Embed]:
+        """
+        Bring the live embed up to date.
+
+        Returns:
+            The embed if any part of it changed, otherwise None
+        """
+        if paused != self._paused:
+            self._paused = paused
+            self._seconds = self._band = self._bar = None
+            if paused:
+                self.embed = self._base("⏸️ Timer Paused", "", 0x808080)
+                self.embed.set_field_at(
+                    1, name="🎯 Status", value="⏸️ **PAUSED**", inline=True
+                )
+                self.embed.set_footer(text="Click Resume to continue the timer!")
+            else:
+                self.embed = self._base("⏰ Interactive Timer", "", 0x00FF00)
+                self.embed.add_field(name="📊 Progress", value="\u200b", inline=False)
+
+        embed = self.embed
+        changed = False
+
+        if seconds_left != self._seconds:
+            self._seconds = seconds_left
+            embed.description = clock(seconds_left, "⏸️" if paused else "⏱️")
+            changed = True
+
+        if paused:
+            return embed if changed else None
+
+        band = band_for(seconds_left)
+        if band is not self._band:
+            self._band = band
+            embed.color = band.color
+            embed.set_field_at(1, name="🎯 Status", value=band.status, inline=True)
+            embed.set_footer(text=band.footer)
+            embed.set_thumbnail(url=band.thumbnail)
+            changed = True
+
+        bar = progress_bar(progress)
+        if bar is not self._bar:
+            self._bar = bar
+            embed.set_field_at(3, name="📊 Progress", value=bar, inline=False)
+            changed = True
+
+        return embed if changed else None
+
+    def start_embed(self, seconds_left: int) -> discord.Embed:
+        """Build the embed sent when a timer starts"""
+        embed = self._base(
+            "⏰ Interactive Timer Started!", clock(seconds_left), 0x00FF00
+        )
+        embed.set_field_at(1, name="🎯 Status", value="🟢 **RUNNING**", inline=True)
+        embed.set_footer(text=CONTROLS_FOOTER)
+        embed.set_thumbnail(url=TIMER_GIF)
+        return embed
+
+    def final_embed(self) -> discord.Embed:
+        """Build the embed shown once a timer has finished"""
+        embed = self._base("🎉 Timer Completed!", "```\n🚨  00:00  🚨\n```", 0xFF0000)
+        embed.set_field_at(1, name="🎯 Status", value="✅ **FINISHED!**", inline=True)
+        embed.add_field(name="🎊 Result", value="**TIME'S UP!** 🎉", inline=False)
+        embed.set_footer(text="Timer completed successfully!")
+        embed.set_image(url=f"{FINISH_GIF}.gif")
+        return embed
@@ -0,0 +1,105 @@
+"""
+Write-Behind Batches
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Collects changes to keyed documents for a short window and hands them to
+one write callback together, so a burst of changes costs one round trip.
+A batch that fails to save is kept (unless newer changes replaced it) and
+retried with exponential backoff.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Longest wait before retrying a failed flush (the delay doubles per failure)
+FLUSH_RETRY_MAX_DELAY = 300.0
+
+
+class WriteBehind(Generic[K, V]):
+    """
+    Debounced batch writer.
+
+    ``write(changes)`` persists a ``key -> value`` batch and raises
+    ``PyMongoError`` when it could not. ``mark`` records a change and opens
+    a ``delay`` second window if none is open.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[Dict[K, V]], Awaitable[Any]],
+        delay: float,
+    ):
+        self.name = name
+        self.write = write
+        self.delay = delay
+        self.pending: Dict[K, V] = {}  # changes waiting to be written
+        self._flush_task: Optional[asyncio.Task] = None
+        self._failures: int = 0  # flushes failed in a row
+        self.flush_count: int = 0
+        self.write_count: int = 0
+
+    def mark(self, key: K, value: V):
+        """Record a change; it is written with the next flush"""
+        self.pending[key] = value
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start the debounce window if it is not already open"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        """Collect changes for ``delay`` seconds, then write them at once"""
+        delay = self.delay
+        if self._failures:
+            delay = min(max(delay, 1.0) * 2**self._failures, FLUSH_RETRY_MAX_DELAY)
+        await asyncio.sleep(delay)
+        # Changes made during the write (or a failed write) open a new window
+        self._flush_task = None
+        # Shutdown cancels the debounce, never a write already under way
+        await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """Write every pending change with one call to ``write``"""
+        if not self.pending:
+            return
+
+        changes, self.pending = self.pending, {}
+        try:
+            await self.write(changes)
+            self.flush_count += 1
+            self.write_count += len(changes)
+            self._failures = 0
+        except PyMongoError as exc:
+            logger.error("Failed to save %d %s: %s", len(changes), self.name, exc)
+            # Keep the changes for the next flush unless newer ones arrived
+            for key, value in changes.items():
+                self.pending.setdefault(key, value)
+            self._failures += 1
+            self._schedule_flush()
+
+    async def close(self):
+        """Flush outstanding changes before shutdown"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()  # No retries once shut down
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return batch counters"""
+        return {
+            "pending": len(self.pending),
+            "flushes": self.flush_count,
+            "writes": self.write_count,
+        }
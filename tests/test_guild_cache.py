@@ -0,0 +1,76 @@
+"""
+Lazy Guild Cache Tests
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Checks coalesced loading, failed loads and LRU eviction of LazyGuildCache
+with a slow in-process loader.
+"""
+
+import asyncio
+import unittest
+
+from src.utils.guild_cache import LazyGuildCache
+
+LOAD_DELAY = 0.2
+
+
+class LazyGuildCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = 0
+        self.fail = False
+        self.evicted = []
+        self.cache = LazyGuildCache(
+            "test",
+            self.load,
+            max_guilds=2,
+            on_evict=lambda guild_id, value: self.evicted.append(guild_id),
+        )
+
+    async def load(self, guild_id: int):
+        self.calls += 1
+        await asyncio.sleep(LOAD_DELAY)
+        if self.fail:
+            raise ConnectionError("MongoDB connection unavailable")
+        return {"guild_id": guild_id}
+
+    async def test_concurrent_gets_share_one_load(self):
+        results = await asyncio.gather(*(self.cache.get(1) for _ in range(10)))
+        self.assertTrue(all(result == {"guild_id": 1} for result in results))
+        self.assertEqual(self.calls, 1)
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        leader = asyncio.create_task(self.cache.get(1))
+        await asyncio.sleep(LOAD_DELAY / 4)
+        waiters = [asyncio.create_task(self.cache.get(1)) for _ in range(3)]
+        await asyncio.sleep(LOAD_DELAY / 4)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        self.assertTrue(leader.cancelled())
+        self.assertTrue(all(result == {"guild_id": 1} for result in results))
+        # One waiter took over the load and the others joined it
+        self.assertEqual(self.calls, 2)
+        self.assertIn(1, self.cache)
+
+    async def test_failed_load_is_not_cached(self):
+        self.fail = True
+        with self.assertRaises(ConnectionError):
+            await self.cache.get(1)
+        self.assertNotIn(1, self.cache)
+
+        self.fail = False
+        self.assertEqual(await self.cache.get(1), {"guild_id": 1})
+        self.assertEqual(self.calls, 2)
+
+    async def test_least_recently_used_guild_is_evicted(self):
+        await self.cache.get(1)
+        await self.cache.get(2)
+        await self.cache.get(1)
+        await self.cache.get(3)
+        self.assertEqual(self.evicted, [2])
+        self.assertEqual(len(self.cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
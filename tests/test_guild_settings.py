@@ -0,0 +1,72 @@
+"""
+Guild Settings Cache Tests
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Runs the settings cache against an in-memory collection with a slow
+``find_one`` and checks that concurrent misses share one load.
+"""
+
+import asyncio
+import unittest
+
+from src.database.guild_settings import GuildSettingsCache
+
+LOAD_DELAY = 0.2
+
+
+class SlowCollection:
+    """Collection whose ``find_one`` takes ``LOAD_DELAY`` seconds"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.reads = 0
+
+    async def find_one(self, query):
+        self.reads += 1
+        await asyncio.sleep(LOAD_DELAY)
+        return self.documents.get(query["_id"])
+
+
+class StubDatabase:
+    """Always-connected database serving one collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_connected(self):
+        return True
+
+    async def get_collection(self, name):
+        return self.collection
+
+
+class GuildSettingsCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.collection = SlowCollection({"1": {"_id": "1", "language": "bn"}})
+        self.cache = GuildSettingsCache(StubDatabase(self.collection), ttl=60)
+
+    async def test_concurrent_misses_share_one_load(self):
+        results = await asyncio.gather(
+            *(self.cache.get("language", 1) for _ in range(10))
+        )
+        self.assertTrue(all(result["language"] == "bn" for result in results))
+        self.assertEqual(self.collection.reads, 1)
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        leader = asyncio.create_task(self.cache.get("language", 1))
+        await asyncio.sleep(LOAD_DELAY / 4)
+        waiters = [asyncio.create_task(self.cache.get("language", 1)) for _ in range(3)]
+        await asyncio.sleep(LOAD_DELAY / 4)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        self.assertTrue(leader.cancelled())
+        self.assertTrue(all(result["language"] == "bn" for result in results))
+        # One waiter took over the load and the others joined it
+        self.assertEqual(self.collection.reads, 2)
+        self.assertEqual(self.cache.peek("language", 1)["language"], "bn")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Tabbycat Client Tests
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Runs the client against a local aiohttp stub server with a slow endpoint
+and checks that the event loop keeps serving other work while requests
+are waiting on the tab server.
+"""
+
+import asyncio
+import time
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.utils.tabbycat_client import TabbycatClient, TabbycatError
+
+SLOW_DELAY = 0.3
+CONCURRENT_REQUESTS = 20
+# Worst scheduling delay tolerated for a 10 ms heartbeat
+MAX_LOOP_LAG = 0.1
+
+
+class LoopMonitor:
+    """Measures how late a periodic heartbeat wakes up"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.max_lag = 0.0
+        self.beats = 0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - started - self.interval
+            self.max_lag = max(self.max_lag, lag)
+            self.beats += 1
+
+    def __enter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+
+
+class TabbycatClientTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = 0
+        app = web.Application()
+        app.router.add_get("/api/v1/tournaments", self.slow)
+        app.router.add_get("/api/v1/tournaments/t/teams", self.slow)
+        app.router.add_get("/api/v1/tournaments/t/standings", self.forbidden)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.site = str(self.server.make_url("/")).rstrip("/")
+        self.tournament_url = f"{self.site}/api/v1/tournaments/t/"
+        self.client = TabbycatClient(timeout=5, connect_timeout=2)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def slow(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(SLOW_DELAY)
+        return web.json_response([{"slug": "t", "name": "Test Open"}])
+
+    async def forbidden(self, request: web.Request) -> web.Response:
+        return web.Response(status=403)
+
+    async def test_loop_stays_responsive_during_concurrent_requests(self):
+        started = time.perf_counter()
+        with LoopMonitor() as monitor:
+            results = await asyncio.gather(
+                *(
+                    self.client.get_tournaments(self.site, "token")
+                    for _ in range(CONCURRENT_REQUESTS)
+                )
+            )
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(self.requests, CONCURRENT_REQUESTS)
+        self.assertTrue(all(result[0]["slug"] == "t" for result in results))
+        self.assertLess(monitor.max_lag, MAX_LOOP_LAG)
+        # The heartbeat kept running the whole time the requests waited
+        self.assertGreater(monitor.beats, elapsed / monitor.interval / 2)
+        # Requests overlapped instead of running one after another
+        self.assertLess(elapsed, CONCURRENT_REQUESTS * SLOW_DELAY / 2)
+
+    async def test_session_is_pooled_per_site(self):
+        await self.client.get_tournaments(self.site, "token")
+        await self.client.get_teams(self.tournament_url, "token")
+        self.assertEqual(self.client.get_stats()["sites"], 1)
+
+    async def test_concurrent_cached_requests_share_one_fetch(self):
+        with LoopMonitor() as monitor:
+            await asyncio.gather(
+                *(
+                    self.client.get_teams(self.tournament_url, "token")
+                    for _ in range(CONCURRENT_REQUESTS)
+                )
+            )
+        self.assertEqual(self.requests, 1)
+        self.assertLess(monitor.max_lag, MAX_LOOP_LAG)
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        leader = asyncio.create_task(
+            self.client.get_teams(self.tournament_url, "token")
+        )
+        await asyncio.sleep(SLOW_DELAY / 6)
+        waiters = [
+            asyncio.create_task(self.client.get_teams(self.tournament_url, "token"))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(SLOW_DELAY / 6)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        self.assertTrue(leader.cancelled())
+        self.assertTrue(all(result[0]["slug"] == "t" for result in results))
+        # One waiter took over the fetch and the others joined it
+        self.assertEqual(self.requests, 2)
+
+    async def test_error_status_raises_tabbycat_error(self):
+        with self.assertRaises(TabbycatError) as raised:
+            await self.client.get_standings(self.tournament_url, "token")
+        self.assertEqual(raised.exception.status, 403)
+
+    async def test_timeout_raises_tabbycat_error(self):
+        client = TabbycatClient(timeout=SLOW_DELAY / 3, connect_timeout=1)
+        try:
+            with LoopMonitor() as monitor:
+                with self.assertRaises(TabbycatError):
+                    await client.get_tournaments(self.site, "token")
+            self.assertLess(monitor.max_lag, MAX_LOOP_LAG)
+        finally:
+            await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
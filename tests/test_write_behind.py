@@ -0,0 +1,62 @@
+"""
+Write-Behind Batch Tests
+Author: aldinn
+Email: kferdoush617@gmail.com
+
+Checks that changes are batched into one write and that a failed batch is
+retried on its own instead of waiting for the next change.
+"""
+
+import asyncio
+import unittest
+
+from pymongo.errors import PyMongoError
+
+from src.utils.write_behind import WriteBehind
+
+DELAY = 0.01
+
+
+class WriteBehindTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.batches = []
+        self.failures_left = 0
+        self.writer = WriteBehind("test change(s)", self.write, DELAY)
+
+    async def write(self, changes):
+        if self.failures_left:
+            self.failures_left -= 1
+            raise PyMongoError("database unavailable")
+        self.batches.append(dict(changes))
+
+    async def test_changes_in_one_window_share_one_write(self):
+        for key in range(5):
+            self.writer.mark(key, key * 10)
+        self.writer.mark(0, "latest")
+        await asyncio.sleep(DELAY * 10)
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(self.batches[0][0], "latest")
+        self.assertEqual(self.writer.get_stats()["writes"], 5)
+
+    async def test_failed_flush_is_retried_without_new_changes(self):
+        self.failures_left = 1
+        self.writer.mark("a", 1)
+        # First try after DELAY fails; the retry waits max(DELAY, 1s) * 2
+        await asyncio.sleep(2.5)
+
+        self.assertEqual(self.batches, [{"a": 1}])
+        self.assertEqual(self.writer.get_stats()["pending"], 0)
+
+    async def test_newer_change_wins_over_a_failed_batch(self):
+        self.failures_left = 1
+        self.writer.pending["a"] = 1
+        await self.writer.flush()
+        self.writer.mark("a", 2)
+        await self.writer.close()
+
+        self.assertEqual(self.batches, [{"a": 2}])
+
+
+if __name__ == "__main__":
+    unittest.main()
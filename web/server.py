@@ -118,6 +118,8 @@ class WebServer:
             self.app.router.add_get("/stats", self.stats)
             self.app.router.add_get("/commands", self.commands)
             self.app.router.add_get("/api/stats", self.api_stats)
+            if Config.ENABLE_METRICS:
+                self.app.router.add_get("/metrics", self.metrics)
             self.app.router.add_get("/health", self.health)
             self.app.router.add_get("/invite", self.invite)
 
@@ -681,6 +683,8 @@ class WebServer:
         """JSON API for bot statistics"""
         try:
             stats = self.get_bot_stats()
+            if self.bot and hasattr(self.bot, "command_metrics"):
+                stats["commands"] = self.bot.command_metrics.get_stats()
             return web.json_response(stats)
         except Exception as e:
             logger.error("Error in API stats: %s", e)
@@ -688,6 +692,16 @@ class WebServer:
                 {"error": "Failed to retrieve statistics"}, status=500
             )
 
+    async def metrics(self, _request: Request) -> Response:
+        """Command latency histograms in the Prometheus text format"""
+        if not self.bot or not hasattr(self.bot, "command_metrics"):
+            return web.Response(status=503, text="metrics unavailable\n")
+        return web.Response(
+            text=self.bot.command_metrics.prometheus(),
+            content_type="text/plain",
+            charset="utf-8",
+        )
+
     async def invite(self, _request: Request) -> Response:
         """Bot invitation page with proper invite URL"""
         try: